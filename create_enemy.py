@@ -8,6 +8,9 @@ import json
 import os
 from typing import Dict, List, Optional, Any
 
+from starrail.utils.enemy_dedup import build_alias_table, combat_hash
+from starrail.utils.enemy_table import table_path_for, write_enemy_table
+
 
 class EnemyConfigProcessor:
     """敌人配置处理器"""
@@ -183,6 +186,8 @@ class EnemyConfigProcessor:
             'max_toughness': final_stats.get('Stance', 100),
             'side': 'enemy'
         }
+        # 战斗等价哈希：哈希相同的敌人战斗完全相同
+        enemy_data['combat_hash'] = combat_hash(enemy_data)
         
         return enemy_data
     
@@ -210,6 +215,25 @@ class EnemyConfigProcessor:
         except Exception as e:
             print(f"❌ 保存失败: {e}")
     
+    def save_enemy_table(self, enemies: List[Dict], json_path: str):
+        """保存敌人数值的定长二进制表（含 ID 索引），供加载时 mmap 共享，需在 JSON 保存之后调用"""
+        try:
+            table_path = table_path_for(json_path)
+            write_enemy_table(enemies, table_path, json_path)
+            print(f"💾 敌人二进制表已保存到: {table_path}")
+        except Exception as e:
+            print(f"❌ 二进制表保存失败: {e}")
+    
+    def save_enemy_aliases(self, enemies: List[Dict], output_path: str):
+        """保存战斗等价敌人的别名表（规范敌人ID -> 哈希与别名ID列表）"""
+        try:
+            aliases = build_alias_table(enemies)
+            with open(output_path, 'w', encoding='utf-8') as f:
+                json.dump(aliases.to_dict(), f, ensure_ascii=False, indent=2)
+            print(f"💾 敌人别名表已保存到: {output_path}（{len(aliases)} 个敌人，{aliases.distinct_count} 个战斗等价组）")
+        except Exception as e:
+            print(f"❌ 别名表保存失败: {e}")
+    
     def generate_enemy_summary(self, enemies: List[Dict]) -> Dict:
         """生成敌人统计摘要"""
         summary = {
@@ -304,6 +328,8 @@ def main():
         # 保存处理后的数据
         output_path = os.path.join(base_path, 'data/processed_enemies.json')
         processor.save_processed_enemies(enemies, output_path)
+        processor.save_enemy_table(enemies, output_path)
+        processor.save_enemy_aliases(enemies, os.path.join(base_path, 'data/enemy_aliases.json'))
         
         # 保存统计摘要
         summary_path = os.path.join(base_path, 'data/enemy_summary.json')
@@ -2,18 +2,23 @@
 import os
 import json
 import copy
+import argparse
+import contextlib
 
 # 确保项目根目录在sys.path中，以便正确导入
 import sys
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from starrail.utils.data_loader import load_all_game_data
+from starrail.utils.data_loader import load_all_game_data, load_game_data_for_config
 from starrail.core.character import Character
 from starrail.core.enemy import Enemy
 from starrail.core.battle import Battle
 from starrail.core.skills.skill_manager import SkillManager
 from starrail.core.skills.skill import get_skill_instance
 from starrail.core.ai_strategies import seele_smart_ai, natasha_smart_ai, bronya_simple_ai # 引入AI策略
+from starrail.utils.log_sink import log_to_file
+from starrail.engine.sampling_profiler import SamplingProfiler, DEFAULT_INTERVAL
+from starrail.engine.memory_profiler import MemoryProfiler
 
 def setup_battle_from_config(config_path: str, game_data: dict) -> Battle:
     """
@@ -24,7 +29,12 @@ def setup_battle_from_config(config_path: str, game_data: dict) -> Battle:
     # 1. 加载战斗配置
     with open(config_path, 'r', encoding='utf-8') as f:
         config = json.load(f)
+    return setup_battle_from_dict(config, game_data)
 
+def setup_battle_from_dict(config: dict, game_data: dict) -> Battle:
+    """
+    根据战斗配置（与配置文件格式相同的字典）和游戏数据创建战斗实例。
+    """
     # 2. 初始化技能管理器 (全局唯一)
     skill_manager = SkillManager(game_data['skills'])
     
@@ -72,7 +82,7 @@ def setup_battle_from_config(config_path: str, game_data: dict) -> Battle:
         
         # 绑定技能管理器和AI
         character.skill_manager = skill_manager
-        character.ai_strategy = ai_strategy_map.get(char_id, lambda c: random.choice(c.skills)) # 分配AI，若无特定AI则随机
+        character.ai_strategy = ai_strategy_map.get(char_id) # 分配AI，若无特定AI则在行动时随机选择技能
         
         # 初始化HP
         character.hp = character.get_max_hp()
@@ -115,6 +125,21 @@ def setup_battle_from_config(config_path: str, game_data: dict) -> Battle:
     return battle
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="崩坏：星穹铁道战斗模拟器")
+    parser.add_argument("--log-file", help="将战斗日志异步写入该文件（以 .gz 结尾时压缩）")
+    parser.add_argument("--sample-profile", metavar="PATH", help="开启采样分析，并将折叠调用栈写入该文件（可用于生成火焰图）")
+    parser.add_argument("--sample-interval", type=float, default=DEFAULT_INTERVAL, help="采样间隔（秒）")
+    parser.add_argument("--memory-report", action="store_true", help="用 tracemalloc 分析数据加载、战斗创建与战斗运行各阶段的内存")
+    parser.add_argument("--load-all", action="store_true", help="加载全部游戏数据（默认只加载战斗配置引用到的角色、光锥、技能与遗器）")
+    args = parser.parse_args()
+    profiler = SamplingProfiler(args.sample_interval) if args.sample_profile else None
+    if profiler:
+        profiler.start()
+    memory = MemoryProfiler() if args.memory_report else None
+    if memory:
+        memory.start()
+    memory_phase = memory.phase if memory else lambda name: contextlib.nullcontext()
+
     try:
         # 定义数据文件路径
         data_folder = os.path.join(os.path.dirname(__file__), 'data')
@@ -125,19 +150,39 @@ if __name__ == '__main__':
             print(f"❌ 错误: 配置文件 '{config_file}' 不存在。")
             print("请先运行 visual_selector.py 生成配置文件。")
         else:
-            # 加载所有游戏数据
-            all_game_data = load_all_game_data(data_folder)
+            # 加载游戏数据（默认只加载配置引用到的部分）
+            if args.load_all:
+                with memory_phase("load_all_game_data"):
+                    all_game_data = load_all_game_data(data_folder)
+            else:
+                with open(config_file, 'r', encoding='utf-8') as f:
+                    config = json.load(f)
+                with memory_phase("load_game_data_for_config"):
+                    all_game_data = load_game_data_for_config(data_folder, config)
             
             # 从配置创建战斗
-            battle_instance = setup_battle_from_config(config_file, all_game_data)
+            with memory_phase("setup_battle_from_config"):
+                battle_instance = setup_battle_from_config(config_file, all_game_data)
             
             # 运行战斗模拟
             print("\n" + "="*50)
             print("⚔️ 战斗模拟开始！")
             print("="*50 + "\n")
-            battle_instance.run()
+            if args.log_file:
+                print(f"📝 战斗日志将写入: {args.log_file}")
+            with log_to_file(args.log_file) if args.log_file else contextlib.nullcontext(), memory_phase("Battle.run"):
+                battle_instance.run()
 
     except Exception as e:
         print(f"\n❌ 模拟器运行时发生严重错误: {e}")
         import traceback
-        traceback.print_exc()
\ No newline at end of file
+        traceback.print_exc()
+    finally:
+        if memory:
+            memory.stop()
+            print(memory.report())
+        if profiler:
+            profiler.stop()
+            profiler.write_collapsed(args.sample_profile)
+            print(profiler.report())
+            print(f"🔥 折叠调用栈已写入: {args.sample_profile}")
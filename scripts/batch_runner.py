@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量战斗模拟 - 按配置文件批量运行战斗并输出统计结果
+
+示例:
+    python scripts/batch_runner.py --battles 200 --mode antithetic
+    python scripts/batch_runner.py --battles 200 --compare --metric turns --streams crit,target,ai
+    python scripts/batch_runner.py --battles 500 --max-turns 4 --event dies:Natasha --crit-bias enemy=0.6 --target-bias Natasha=5
+"""
+
+import sys
+import os
+import argparse
+import contextlib
+import time
+from typing import Optional
+
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from starrail.utils.data_loader import load_all_game_data
+from starrail.engine.batch_runner import run_batch, SAMPLING_MODES, METRICS
+from starrail.engine.importance_sampling import ImportanceBias, run_importance_sampling, unit_dies, crit_kill
+from starrail.engine.sampling_profiler import SamplingProfiler, DEFAULT_INTERVAL
+from starrail.engine.memory_profiler import MemoryProfiler
+from main_simulator import setup_battle_from_config
+
+
+def print_estimate(mode: str, estimate: dict, elapsed: float):
+    print(f"📊 [{mode}] 场数: {estimate['battles']}  重复组: {estimate['groups']}  耗时: {elapsed:.2f}s")
+    print(f"   估计值: {estimate['mean']:.4f} ± {estimate['std_error']:.4f} (普通MC标准误: {estimate['mc_std_error']:.4f})")
+    print(f"   方差缩减: {estimate['variance_reduction']:.2f}x  等效普通MC场数: {estimate['effective_battles']:.0f}")
+
+
+def parse_event(spec: str):
+    """解析事件描述: dies:<单位> 或 crit-kill:<攻击者>:<目标>[:<暴击次数>]"""
+    kind, _, rest = spec.partition(":")
+    parts = rest.split(":")
+    if kind == "dies" and len(parts) == 1:
+        return unit_dies(parts[0])
+    if kind == "crit-kill" and len(parts) in (2, 3):
+        return crit_kill(parts[0], parts[1], int(parts[2]) if len(parts) == 3 else 3)
+    raise ValueError(f"无法解析事件: {spec}")
+
+
+def parse_bias(items) -> dict:
+    """解析 NAME=VALUE 形式的偏置参数"""
+    result = {}
+    for item in items or []:
+        name, _, value = item.partition("=")
+        result[name] = float(value)
+    return result
+
+
+def print_importance_estimate(estimate: dict, elapsed: float):
+    print(f"🎯 [重要性采样] 场数: {estimate['battles']}  事件发生: {estimate['hits']}  耗时: {elapsed:.2f}s")
+    print(f"   概率: {estimate['probability']:.6g} ± {estimate['std_error']:.3g}")
+    print(f"   有效样本量: {estimate['effective_sample_size']:.1f}  等效普通MC场数: {estimate['mc_equivalent_battles']:.0f}")
+    if estimate['effective_sample_size'] < 0.1 * estimate['battles']:
+        print("⚠️  有效样本量过低，权重分布过于集中，标准误可能不可靠，请减弱偏置。")
+
+
+def main():
+    args = parse_args()
+    profiler = SamplingProfiler(args.sample_interval, all_threads=args.workers > 1) if args.sample_profile else None
+    if profiler:
+        profiler.start()
+    memory = MemoryProfiler() if args.memory_report else None
+    if memory:
+        memory.start()
+    try:
+        return run(args, memory)
+    finally:
+        if memory:
+            memory.stop()
+            print(memory.report())
+        if profiler:
+            profiler.stop()
+            profiler.write_collapsed(args.sample_profile)
+            print(profiler.report())
+            print(f"🔥 折叠调用栈已写入: {args.sample_profile}")
+
+
+def parse_args():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    parser = argparse.ArgumentParser(description="批量战斗模拟")
+    parser.add_argument("--config", default=os.path.join(root, "data", "visual_config.json"), help="战斗配置文件")
+    parser.add_argument("--data", default=os.path.join(root, "data"), help="游戏数据目录")
+    parser.add_argument("--battles", type=int, default=100, help="战斗场数")
+    parser.add_argument("--mode", choices=SAMPLING_MODES, default="mc", help="暴击采样模式")
+    parser.add_argument("--compare", action="store_true", help="依次运行所有采样模式并对比")
+    parser.add_argument("--metric", choices=sorted(METRICS), default="damage", help="统计指标")
+    parser.add_argument("--streams", default="crit", help="应用方差缩减采样的随机流，逗号分隔 (crit,target,ai)")
+    parser.add_argument("--replicates", type=int, default=10, help="分层/QMC 模式的独立重复组数")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    parser.add_argument("--max-turns", type=int, default=10, help="每场战斗的最大回合数")
+    parser.add_argument("--workers", type=int, default=1, help="并发运行的线程数")
+    parser.add_argument("--sample-profile", metavar="PATH", help="开启采样分析，并将折叠调用栈写入该文件（可用于生成火焰图）")
+    parser.add_argument("--sample-interval", type=float, default=DEFAULT_INTERVAL, help="采样间隔（秒）")
+    parser.add_argument("--metrics", action="store_true", help="输出引擎计数器报告")
+    parser.add_argument("--memory-report", action="store_true", help="用 tracemalloc 分析各阶段内存，并检查多场战斗间的内存增长")
+    parser.add_argument("--log-dir", help="将每场战斗的完整日志写入该目录")
+    parser.add_argument("--compress-logs", action="store_true", help="以 gzip 压缩战斗日志")
+    parser.add_argument("--event", help="重要性采样的目标事件: dies:<单位> 或 crit-kill:<攻击者>:<目标>[:<暴击次数>]")
+    parser.add_argument("--crit-bias", action="append", metavar="NAME=RATE", help="偏置暴击率（单位名或阵营名），可重复")
+    parser.add_argument("--target-bias", action="append", metavar="NAME=WEIGHT", help="偏置目标选择权重（单位名或阵营名），可重复")
+    args = parser.parse_args()
+    if (args.crit_bias or args.target_bias) and not args.event:
+        parser.error("--crit-bias / --target-bias 只用于重要性采样，需要同时指定 --event")
+    return args
+
+
+def run(args, memory: Optional[MemoryProfiler] = None):
+    if not os.path.exists(args.config):
+        print(f"❌ 错误: 配置文件 '{args.config}' 不存在。")
+        return 1
+    memory_phase = memory.phase if memory else lambda name, detail=True: contextlib.nullcontext()
+    if memory and args.workers > 1:
+        print("⚠️  tracemalloc 无法区分并发战斗的分配，内存分析模式下改为单线程运行。")
+        args.workers = 1
+
+    print("📂 正在加载游戏数据...")
+    with open(os.devnull, 'w', encoding='utf-8') as devnull, contextlib.redirect_stdout(devnull), \
+            memory_phase("load_all_game_data"):
+        game_data = load_all_game_data(args.data)
+
+    created = []
+
+    def factory():
+        # 单线程运行时，创建下一场战斗之前上一场已经结束
+        if memory and created:
+            memory.record_battle()
+        created.append(True)
+        with memory_phase("setup_battle_from_config", detail=False):
+            return setup_battle_from_config(args.config, game_data)
+
+    def batch_finished():
+        if memory and created:
+            memory.record_battle(last=True)
+        created.clear()
+
+    if args.event:
+        bias = ImportanceBias(crit_rates=parse_bias(args.crit_bias), target_weights=parse_bias(args.target_bias))
+        start = time.perf_counter()
+        with memory_phase("run_importance_sampling"):
+            result = run_importance_sampling(factory, args.battles, parse_event(args.event), bias,
+                                             seed=args.seed, max_turns=args.max_turns)
+        batch_finished()
+        print_importance_estimate(result.estimate(), time.perf_counter() - start)
+        return 0
+
+    modes = SAMPLING_MODES if args.compare else (args.mode,)
+    for mode in modes:
+        log_dir = os.path.join(args.log_dir, mode) if args.log_dir and args.compare else args.log_dir
+        start = time.perf_counter()
+        with memory_phase(f"run_batch[{mode}]"):
+            result = run_batch(factory, args.battles, mode=mode, seed=args.seed,
+                               replicates=args.replicates, streams=args.streams.split(","),
+                               max_turns=args.max_turns, log_dir=log_dir, compress_logs=args.compress_logs,
+                               workers=args.workers)
+        batch_finished()
+        print_estimate(mode, result.estimate(args.metric), time.perf_counter() - start)
+        if args.metrics:
+            print(result.metrics.report())
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
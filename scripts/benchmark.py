@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+引擎基准测试 - 测量基础操作的耗时（微基准）与每秒战斗场数、启动耗时、峰值内存（场景基准），
+并可与 benchmarks/baseline.json 中的基线比较
+
+示例:
+    python scripts/benchmark.py
+    python scripts/benchmark.py --suite micro --filter get_current_stats --repeats 10
+    python scripts/benchmark.py --output bench.json
+    python scripts/benchmark.py --check --tolerance 0.3 --metric-tolerance battle.battles_per_sec=0.1 --noise-sigmas 2
+    python scripts/benchmark.py --update-baseline   # 改动性能的提交需同时重新录制基线
+"""
+
+import sys
+import os
+import argparse
+import contextlib
+
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from starrail.utils.data_loader import load_all_game_data
+from starrail.engine.benchmark import (
+    BenchmarkFixture, MICRO_BENCHMARKS, SCENARIOS, DEFAULT_REPEATS, DEFAULT_MIN_TIME, DEFAULT_RELIC_COUNT,
+    DEFAULT_SCENARIO_BATTLES, DEFAULT_SCENARIO_REPEATS, DEFAULT_TOLERANCE, DEFAULT_NOISE_SIGMAS, run_micro_benchmarks, run_scenarios, build_report,
+    report_to_json, load_report, compare_reports, format_comparison,
+)
+from main_simulator import setup_battle_from_config
+
+
+def print_result(result):
+    print(f"  {result.name:<40} {result.median * 1e6:>12.2f}µs  (最快 {result.best * 1e6:.2f}µs, ±{result.stdev * 1e6:.2f}µs, {result.iterations}次×{result.repeats}轮)")
+
+
+def print_scenario(result):
+    print(f"  {result.name:<40} {result.value:>12.3f}{result.unit}")
+
+
+def parse_tolerances(items) -> dict:
+    """解析 NAME=VALUE 形式的单项容差"""
+    result = {}
+    for item in items or []:
+        name, _, value = item.rpartition("=")
+        result[name] = float(value)
+    return result
+
+
+def main():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    parser = argparse.ArgumentParser(description="引擎微基准测试")
+    parser.add_argument("--config", default=os.path.join(root, "data", "visual_config.json"), help="战斗配置文件")
+    parser.add_argument("--data", default=os.path.join(root, "data"), help="游戏数据目录")
+    parser.add_argument("--suite", choices=("micro", "scenario", "all"), default="all", help="运行的基准类别")
+    parser.add_argument("--filter", help="只运行名称包含该字符串的基准（场景基准按场景名匹配）")
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS, help="每项基准的重复轮数")
+    parser.add_argument("--min-time", type=float, default=DEFAULT_MIN_TIME, help="每轮的最短耗时（秒）")
+    parser.add_argument("--relic-count", type=int, default=DEFAULT_RELIC_COUNT, help="load_relics 基准使用的遗器数量")
+    parser.add_argument("--battles", type=int, default=DEFAULT_SCENARIO_BATTLES, help="吞吐量场景每轮运行的战斗场数")
+    parser.add_argument("--scenario-repeats", type=int, default=DEFAULT_SCENARIO_REPEATS, help="场景基准的重复轮数")
+    parser.add_argument("--output", help="将 JSON 结果写入该文件")
+    parser.add_argument("--json", action="store_true", help="以 JSON 格式输出到标准输出")
+    parser.add_argument("--baseline", default=os.path.join(root, "benchmarks", "baseline.json"), help="基线文件")
+    parser.add_argument("--check", action="store_true", help="与基线比较，有指标退化超过容差时以非零状态退出")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="允许的相对退化幅度（如 0.15 表示 15%%）")
+    parser.add_argument("--metric-tolerance", action="append", metavar="NAME=VALUE", help="为单个指标指定容差，可重复（覆盖基线中的设置）")
+    parser.add_argument("--noise-sigmas", type=float, default=DEFAULT_NOISE_SIGMAS,
+                        help="噪声下限为基线标准差的多少倍，变差不超过它时不判定退化")
+    parser.add_argument("--update-baseline", action="store_true", help="用本次结果覆盖基线文件")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.config):
+        print(f"❌ 错误: 配置文件 '{args.config}' 不存在。")
+        return 1
+    names = []
+    if args.suite in ("micro", "all"):
+        names = [name for name in MICRO_BENCHMARKS if not args.filter or args.filter in name]
+    scenario_names = []
+    if args.suite in ("scenario", "all"):
+        scenario_names = [name for name in SCENARIOS if not args.filter or args.filter in name]
+    if not names and not scenario_names:
+        print(f"❌ 没有名称包含 '{args.filter}' 的基准。")
+        return 1
+    if args.check and not os.path.exists(args.baseline):
+        print(f"❌ 基线文件 '{args.baseline}' 不存在，请先使用 --update-baseline 生成。")
+        return 1
+
+    with open(os.devnull, 'w', encoding='utf-8') as devnull, contextlib.redirect_stdout(devnull):
+        game_data = load_all_game_data(args.data)
+    fixture = BenchmarkFixture(lambda: setup_battle_from_config(args.config, game_data), args.data, args.relic_count,
+                               args.config)
+    results, scenarios = [], []
+    try:
+        if names:
+            if not args.json:
+                print(f"⏱️  运行 {len(names)} 项微基准（每项 {args.repeats} 轮，耗时为每次调用的中位数）...")
+            results = run_micro_benchmarks(fixture, names, args.repeats, args.min_time,
+                                           progress=None if args.json else print_result)
+        if scenario_names:
+            if not args.json:
+                print(f"⏱️  运行场景基准: {', '.join(scenario_names)}（吞吐量每轮 {args.battles} 场）...")
+            scenarios = run_scenarios(fixture, scenario_names, args.scenario_repeats, args.battles,
+                                      progress=None if args.json else print_scenario)
+    finally:
+        fixture.close()
+
+    # 重新录制基线时沿用旧基线中的单项容差（旧基线格式不符时不沿用）
+    baseline = {}
+    if (args.check or args.update_baseline) and os.path.exists(args.baseline):
+        try:
+            baseline = load_report(args.baseline)
+        except ValueError:
+            if args.check:
+                raise
+    report = build_report(results, scenarios, baseline.get("tolerances"))
+    text = report_to_json(report)
+    if args.json:
+        print(text)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+        if not args.json:
+            print(f"💾 结果已写入: {args.output}")
+
+    status = 0
+    if args.check:
+        comparisons = compare_reports(baseline, report, args.tolerance, parse_tolerances(args.metric_tolerance),
+                                      args.noise_sigmas)
+        print(f"\n📏 与基线比较: {args.baseline}")
+        print(format_comparison(comparisons, args.tolerance))
+        regressions = [c for c in comparisons if c.regressed]
+        if regressions:
+            print(f"\n❌ {len(regressions)} 项指标退化超过容差: {', '.join(c.name for c in regressions)}")
+            status = 1
+        else:
+            print("\n✅ 所有指标均在容差范围内。")
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+        print(f"💾 基线已更新: {args.baseline}")
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+游戏数据内存占用报告 - 比较压缩加载（字符串驻留 + 共享弱点/抗性结构）与原样加载的常驻内存
+
+每种加载方式在独立的子进程中运行，避免两次加载互相共享已驻留的字符串。
+报告 tracemalloc 统计的存活内存与进程常驻内存（RSS）的增量，并按 --workers 估算并行工作进程的总节省。
+
+示例:
+    python scripts/data_footprint.py
+    python scripts/data_footprint.py --workers 8
+"""
+
+import sys
+import os
+import argparse
+import contextlib
+import gc
+import json
+import subprocess
+import tracemalloc
+
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from starrail.engine.memory_profiler import _format_size, resident_memory
+
+MODES = ("plain", "compact")
+
+
+def parse_args():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    parser = argparse.ArgumentParser(description="比较压缩加载与原样加载的游戏数据内存占用")
+    parser.add_argument("--data", default=os.path.join(root, "data"), help="游戏数据目录")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="估算总节省时的并行工作进程数")
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def measure(data_path: str, compact: bool) -> dict:
+    """在当前进程中加载一次游戏数据，返回存活内存与常驻内存增量（字节）"""
+    from starrail.utils.data_loader import load_all_game_data
+    gc.collect()
+    rss_before = resident_memory()
+    tracemalloc.start()
+    with open(os.devnull, 'w', encoding='utf-8') as devnull, contextlib.redirect_stdout(devnull):
+        game_data = load_all_game_data(data_path, compact=compact)
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    rss_after = resident_memory()
+    return {
+        "retained": retained,
+        "peak": peak,
+        "rss": rss_after - rss_before if rss_before is not None and rss_after is not None else None,
+        "enemies": len(game_data['enemies']),
+    }
+
+
+def run_child(data_path: str, mode: str) -> dict:
+    output = subprocess.run([sys.executable, os.path.abspath(__file__), "--data", data_path, "--child", mode],
+                            check=True, capture_output=True, text=True).stdout
+    return json.loads(output)
+
+
+def main():
+    args = parse_args()
+    if args.child:
+        print(json.dumps(measure(args.data, args.child == "compact")))
+        return 0
+
+    print("📂 正在子进程中分别加载游戏数据...")
+    results = {mode: run_child(args.data, mode) for mode in MODES}
+    plain, compact = results["plain"], results["compact"]
+    print(f"🧠 游戏数据内存占用（{plain['enemies']} 个敌人）")
+    for mode in MODES:
+        result = results[mode]
+        rss = _format_size(result["rss"]) if result["rss"] is not None else "不可用"
+        print(f"  ▶ {mode:<8} 存活 {_format_size(result['retained'])}, 峰值 {_format_size(result['peak'])}, 常驻内存增量 {rss}")
+    saved = plain["retained"] - compact["retained"]
+    print(f"✅ 压缩加载节省存活内存 {_format_size(saved)}（{saved / plain['retained']:.1%}）")
+    if plain["rss"] is not None and compact["rss"] is not None:
+        rss_saved = plain["rss"] - compact["rss"]
+        print(f"✅ 节省常驻内存 {_format_size(rss_saved)}，{args.workers} 个并行工作进程共节省约 "
+              f"{_format_size(rss_saved * args.workers)}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+差分校验 - 同一场战斗分别按参考路径与优化路径运行，逐条比较事件流并报告第一处分歧
+
+示例:
+    python scripts/differential_check.py --battles 20
+    python scripts/differential_check.py --random-teams --battles 200 --seed 7
+"""
+
+import sys
+import os
+import argparse
+import contextlib
+import random
+import time
+
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from starrail.utils.data_loader import load_all_game_data
+from starrail.engine.differential import COMBAT_PATHS, DEFAULT_CONTEXT, DEFAULT_REL_TOL, check_battle, random_battle_config
+from main_simulator import setup_battle_from_config, setup_battle_from_dict
+
+
+def parse_args():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    parser = argparse.ArgumentParser(description="参考路径与优化路径的差分校验")
+    parser.add_argument("--config", default=os.path.join(root, "data", "visual_config.json"), help="战斗配置文件")
+    parser.add_argument("--data", default=os.path.join(root, "data"), help="游戏数据目录")
+    parser.add_argument("--battles", type=int, default=20, help="校验的战斗场数")
+    parser.add_argument("--seed", type=int, default=0, help="起始随机种子，第 i 场使用 seed + i")
+    parser.add_argument("--max-turns", type=int, default=10, help="每场战斗的最大回合数")
+    parser.add_argument("--random-teams", action="store_true", help="每场战斗随机组队并随机挑选敌人，忽略 --config")
+    parser.add_argument("--reference", choices=sorted(COMBAT_PATHS), default="reference", help="作为基准的战斗路径")
+    parser.add_argument("--candidate", choices=sorted(COMBAT_PATHS), default="optimized", help="被校验的战斗路径")
+    parser.add_argument("--rel-tol", type=float, default=DEFAULT_REL_TOL, help="浮点数比较的相对容差")
+    parser.add_argument("--context", type=int, default=DEFAULT_CONTEXT, help="分歧报告中列出的之前事件条数")
+    parser.add_argument("--keep-going", action="store_true", help="发现分歧后继续校验剩余战斗")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if not args.random_teams and not os.path.exists(args.config):
+        print(f"❌ 错误: 配置文件 '{args.config}' 不存在。")
+        return 1
+
+    print("📂 正在加载游戏数据...")
+    with open(os.devnull, 'w', encoding='utf-8') as devnull, contextlib.redirect_stdout(devnull):
+        game_data = load_all_game_data(args.data)
+
+    team_rng = random.Random(args.seed)
+    failures = 0
+    events = 0
+    start = time.perf_counter()
+    for i in range(args.battles):
+        seed = args.seed + i
+        if args.random_teams:
+            config = random_battle_config(game_data, team_rng)
+            factory = lambda config=config: setup_battle_from_dict(config, game_data)
+            label = " / ".join(m['name'] for m in config['team']) + " vs " + " / ".join(e['name'] for e in config['enemies'])
+        else:
+            factory = lambda: setup_battle_from_config(args.config, game_data)
+            label = os.path.basename(args.config)
+        try:
+            divergence, count = check_battle(factory, seed, args.reference, args.candidate, args.max_turns,
+                                             args.rel_tol, args.context)
+        except Exception as e:
+            failures += 1
+            print(f"💥 第 {i + 1} 场战斗（种子 {seed}, {label}）运行出错: {type(e).__name__}: {e}")
+            if not args.keep_going:
+                break
+            continue
+        events += count
+        if divergence is not None:
+            failures += 1
+            print(f"⚔️  第 {i + 1} 场战斗: {label}")
+            print(divergence.format())
+            if not args.keep_going:
+                break
+
+    elapsed = time.perf_counter() - start
+    if failures:
+        print(f"❌ 差分校验失败: {failures} 场战斗不一致或出错（耗时 {elapsed:.2f}s）")
+        return 1
+    print(f"✅ {args.battles} 场战斗的 {args.reference} / {args.candidate} 事件流完全一致，"
+          f"共 {events} 条事件（耗时 {elapsed:.2f}s）")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+黄金战斗记录 - 录制固定种子参考战斗的规范化记录，或重放校验引擎是否仍能复现
+
+示例:
+    python scripts/golden_transcripts.py                # 校验 benchmarks/golden 中的全部记录
+    python scripts/golden_transcripts.py --record       # 重新录制（确认行为变化符合预期后再使用）
+    python scripts/golden_transcripts.py --scenario kits_seed0 --scenario light_cone_23001
+"""
+
+import sys
+import os
+import argparse
+import contextlib
+import glob
+import json
+import time
+
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from starrail.utils.data_loader import load_all_game_data
+from starrail.engine.golden import (DEFAULT_DECIMALS, build_scenarios, load_transcript, missing_coverage,
+                                    record_transcript, replay_transcript, save_transcript)
+from main_simulator import setup_battle_from_dict
+
+COVERAGE_LABELS = {"characters": "技能组", "light_cones": "光锥", "relic_sets": "遗器套装"}
+
+
+def parse_args():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    parser = argparse.ArgumentParser(description="录制或校验黄金战斗记录")
+    parser.add_argument("--dir", default=os.path.join(root, "benchmarks", "golden"), help="战斗记录目录")
+    parser.add_argument("--config", default=os.path.join(root, "data", "visual_config.json"), help="生成场景所用的基础战斗配置")
+    parser.add_argument("--data", default=os.path.join(root, "data"), help="游戏数据目录")
+    parser.add_argument("--record", action="store_true", help="重新录制全部场景并覆盖已有记录")
+    parser.add_argument("--scenario", action="append", help="只处理指定场景，可重复")
+    parser.add_argument("--decimals", type=int, default=DEFAULT_DECIMALS, help="录制时数值保留的小数位数")
+    parser.add_argument("--max-turns", type=int, default=10, help="录制时每场战斗的最大回合数")
+    return parser.parse_args()
+
+
+def record(args, game_data) -> int:
+    if not os.path.exists(args.config):
+        print(f"❌ 错误: 配置文件 '{args.config}' 不存在。")
+        return 1
+    with open(args.config, encoding='utf-8') as f:
+        base_config = json.load(f)
+    scenarios = build_scenarios(game_data, base_config, args.data, max_turns=args.max_turns)
+    if args.scenario:
+        scenarios = [s for s in scenarios if s.name in args.scenario]
+    for scenario in scenarios:
+        transcript = record_transcript(scenario, game_data, setup_battle_from_dict, args.decimals)
+        save_transcript(os.path.join(args.dir, f"{scenario.name}.json"), transcript)
+        print(f"📝 {scenario.name}: {len(transcript['events'])} 条事件  ({scenario.description})")
+    print(f"✅ 已录制 {len(scenarios)} 份战斗记录到 {args.dir}")
+    return 0
+
+
+def check(args, game_data) -> int:
+    paths = sorted(glob.glob(os.path.join(args.dir, "*.json")))
+    if not paths:
+        print(f"❌ 错误: {args.dir} 中没有战斗记录，请先使用 --record 录制。")
+        return 1
+    transcripts = [load_transcript(path) for path in paths]
+    selected = [t for t in transcripts if not args.scenario or t["scenario"] in args.scenario]
+    failures = 0
+    for transcript in selected:
+        mismatch = replay_transcript(transcript, game_data, setup_battle_from_dict)
+        if mismatch is not None:
+            failures += 1
+            print(mismatch.format())
+        else:
+            print(f"✅ {transcript['scenario']}: {len(transcript['events'])} 条事件一致")
+
+    missing = missing_coverage(transcripts)
+    for key, values in missing.items():
+        print(f"⚠️  以下{COVERAGE_LABELS[key]}没有战斗记录覆盖: {', '.join(values)}（使用 --record 重新录制）")
+    if failures or missing:
+        print(f"❌ 黄金记录校验失败: {failures} 份记录无法复现，{sum(len(v) for v in missing.values())} 项未覆盖")
+        return 1
+    return 0
+
+
+def main():
+    args = parse_args()
+    print("📂 正在加载游戏数据...")
+    with open(os.devnull, 'w', encoding='utf-8') as devnull, contextlib.redirect_stdout(devnull):
+        game_data = load_all_game_data(args.data)
+    start = time.perf_counter()
+    code = record(args, game_data) if args.record else check(args, game_data)
+    print(f"⏱️  耗时 {time.perf_counter() - start:.2f}s")
+    return code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
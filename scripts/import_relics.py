@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+遗器存档增量导入 - 与上次导入比较，报告新增、删除与变化的遗器，可持续监视存档
+
+示例:
+    python scripts/import_relics.py                      # 导入一次并报告相对上次导入的变化
+    python scripts/import_relics.py --watch              # 持续监视存档，重新导出后自动增量导入
+    python scripts/import_relics.py --save path/to/fribbels-optimizer-save.json --watch --interval 5
+"""
+
+import sys
+import os
+import argparse
+import time
+
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from starrail.utils.relic_importer import RelicChanges, RelicImporter
+
+SLOTS = ("Head", "Hands", "Body", "Feet", "PlanarSphere", "LinkRope")
+
+
+def parse_args():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    parser = argparse.ArgumentParser(description="增量导入 fribbels 遗器存档")
+    parser.add_argument("--save", default=os.path.join(root, "data", "fribbels-optimizer-save.json"), help="遗器存档文件")
+    parser.add_argument("--watch", action="store_true", help="持续监视存档，变化时自动增量导入")
+    parser.add_argument("--interval", type=float, default=2.0, help="监视时检查存档的间隔（秒）")
+    parser.add_argument("--verbose", action="store_true", help="列出每件变化的遗器")
+    return parser.parse_args()
+
+
+def report(importer: RelicImporter, changes: RelicChanges, verbose: bool):
+    print(f"🔄 {changes.summary()}，当前共 {len(importer.relics)} 件遗器")
+    if verbose:
+        for label, ids in (("➕", changes.added), ("➖", changes.removed), ("✏️ ", changes.changed)):
+            for relic_id in ids:
+                relic = importer.relics.get(relic_id)
+                detail = f"{relic.set_name} {relic.slot}" if relic is not None else ""
+                print(f"  {label} {relic_id} {detail}")
+
+
+def main():
+    args = parse_args()
+    if not os.path.exists(args.save):
+        print(f"❌ 错误: 遗器存档 '{args.save}' 不存在。")
+        return 1
+    importer = RelicImporter(args.save)
+    start = time.perf_counter()
+    changes = importer.refresh()
+    print(f"📂 已导入 {len(importer.relics)} 件遗器（{time.perf_counter() - start:.3f}s），相对上次导入: {changes.summary()}")
+    counts = ", ".join(f"{slot} {len(importer.manager.get_relics_by_slot(slot))}" for slot in SLOTS)
+    print(f"   按部位: {counts}")
+    if args.verbose and changes:
+        report(importer, changes, args.verbose)
+    if args.watch:
+        print(f"👀 正在监视 {args.save}（每 {args.interval}s 检查一次，Ctrl+C 退出）")
+        try:
+            importer.watch(args.interval, lambda c: report(importer, c, args.verbose))
+        except KeyboardInterrupt:
+            print("👋 已停止监视")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
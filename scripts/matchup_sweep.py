@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+敌人对战扫描 - 用战斗配置中的队伍依次对战每个敌人（一场一个敌人），汇总胜负、回合数与我方伤害
+
+战斗等价（战斗相关字段完全相同）的敌人默认只模拟一次，结果复制给同组的其他敌人；
+--no-dedupe 时逐个模拟，可用于对比两种方式的结果与耗时。
+
+示例:
+    python scripts/matchup_sweep.py --rank BigBoss
+    python scripts/matchup_sweep.py --weakness Fire --limit 200 --output sweep.json
+    python scripts/matchup_sweep.py --rank Elite --no-dedupe
+"""
+
+import sys
+import os
+import argparse
+import json
+import time
+
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from starrail.utils.data_loader import load_enemies_by_id, load_game_data_for_config, select_enemy_templates
+from starrail.utils.enemy_dedup import build_alias_table
+from starrail.engine.matchup import enemy_config, run_matchups
+from main_simulator import setup_battle_from_dict
+
+
+def parse_args():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    parser = argparse.ArgumentParser(description="队伍对单个敌人的批量对战扫描")
+    parser.add_argument("--config", default=os.path.join(root, "data", "visual_config.json"), help="战斗配置文件（只使用其中的队伍）")
+    parser.add_argument("--data", default=os.path.join(root, "data"), help="游戏数据目录")
+    parser.add_argument("--rank", help="只对战该等级的敌人，如 Elite / BigBoss")
+    parser.add_argument("--weakness", help="只对战有该弱点的敌人")
+    parser.add_argument("--limit", type=int, help="最多对战的敌人数（按数据文件顺序）")
+    parser.add_argument("--seed", type=int, default=0, help="每场战斗使用的随机种子")
+    parser.add_argument("--max-turns", type=int, default=10, help="每场战斗的最大回合数")
+    parser.add_argument("--no-dedupe", action="store_true", help="不合并战斗等价的敌人，逐个模拟")
+    parser.add_argument("--output", help="把每个敌人的结果写入该 JSON 文件")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if not os.path.exists(args.config):
+        print(f"❌ 错误: 配置文件 '{args.config}' 不存在。")
+        return 1
+    with open(args.config, 'r', encoding='utf-8') as f:
+        base_config = json.load(f)
+
+    # 在敌人二进制表中筛选，只读取选中敌人的 JSON 记录（技能与 AI 信息）
+    enemies_path = os.path.join(args.data, 'processed_enemies.json')
+    enemy_ids = [template['id'] for template in select_enemy_templates(enemies_path, args.rank, args.weakness)]
+    if args.limit is not None:
+        enemy_ids = enemy_ids[:args.limit]
+    if not enemy_ids:
+        print("❌ 没有符合条件的敌人")
+        return 1
+    enemies = load_enemies_by_id(enemies_path, enemy_ids)
+    configs = [enemy_config(enemies[enemy_id]) for enemy_id in enemy_ids]
+    aliases = build_alias_table(dict(config, ai_info=getattr(enemies[config['id']], 'ai_info', {})) for config in configs)
+
+    # 队伍数据与敌人技能按 ID 读取，不加载整个敌人数据库
+    game_data = load_game_data_for_config(args.data, dict(base_config, enemies=configs))
+    print(f"⚔️  对战 {len(enemy_ids)} 个敌人，其中战斗等价去重后 {len(aliases.distinct(enemy_ids))} 个")
+
+    start = time.perf_counter()
+    results = run_matchups(lambda config: setup_battle_from_dict(config, game_data), base_config, enemies,
+                           enemy_ids, aliases, seed=args.seed, max_turns=args.max_turns, dedupe=not args.no_dedupe)
+    elapsed = time.perf_counter() - start
+
+    simulated = sum(result.simulated for result in results)
+    wins = sum(result.winner == 'player' for result in results)
+    print(f"✅ 实际模拟 {simulated} 场，复用 {len(results) - simulated} 场（耗时 {elapsed:.2f}s）")
+    print(f"   我方胜利 {wins}/{len(results)}，平均回合数 {sum(r.turns for r in results) / len(results):.2f}，"
+          f"平均伤害 {sum(r.player_damage for r in results) / len(results):.0f}")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump([result.to_dict() for result in results], f, ensure_ascii=False, indent=2)
+        print(f"💾 结果已保存到: {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+游戏数据查询 - 基于 SQLite 游戏数据库（data/.cache/game_data.sqlite）按条件查询角色、光锥、遗器与敌人
+
+数据库在首次查询或数据文件变化后自动生成，也可以用 --rebuild 强制重新生成。
+
+示例:
+    python scripts/query_data.py enemies --rank BigBoss --weakness Fire
+    python scripts/query_data.py relics --set "Eagle of Twilight Line" --slot Head
+    python scripts/query_data.py characters --path Hunt --element Quantum
+    python scripts/query_data.py light_cones --search night
+"""
+
+import sys
+import os
+import argparse
+import time
+
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from starrail.utils.data_loader import query_characters, query_enemies, query_light_cones, query_relics
+from starrail.utils.game_db import build_game_db, default_db_path, open_game_db
+
+TABLES = ("characters", "light_cones", "relics", "enemies")
+
+
+def parse_args():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    parser = argparse.ArgumentParser(description="按条件查询 SQLite 游戏数据库")
+    parser.add_argument("table", choices=TABLES, help="要查询的数据")
+    parser.add_argument("--data", default=os.path.join(root, "data"), help="游戏数据目录")
+    parser.add_argument("--db", help="数据库文件，默认为 <数据目录>/.cache/game_data.sqlite")
+    parser.add_argument("--rebuild", action="store_true", help="查询前重新生成数据库")
+    parser.add_argument("--id", action="append", dest="ids", help="按ID查询，可重复")
+    parser.add_argument("--search", help="名称包含的文字（不区分大小写）")
+    parser.add_argument("--path", help="命途（角色、光锥）")
+    parser.add_argument("--element", help="元素（角色）")
+    parser.add_argument("--set", dest="set_name", help="遗器套装")
+    parser.add_argument("--slot", help="遗器部位，如 Head / Body / PlanarSphere")
+    parser.add_argument("--main-stat", help="遗器主属性")
+    parser.add_argument("--rank", help="敌人等级，如 Elite / BigBoss")
+    parser.add_argument("--weakness", help="敌人弱点元素")
+    parser.add_argument("--limit", type=int, default=20, help="最多显示的条数")
+    return parser.parse_args()
+
+
+def run_query(args, db):
+    if args.table == "characters":
+        return query_characters(db, ids=args.ids, path=args.path, element=args.element, search=args.search)
+    if args.table == "light_cones":
+        return list(query_light_cones(db, ids=args.ids, path=args.path, search=args.search).values())
+    if args.table == "relics":
+        return list(query_relics(db, ids=args.ids, set_name=args.set_name, slot=args.slot,
+                                 main_stat=args.main_stat).values())
+    return query_enemies(db, ids=args.ids, rank=args.rank, weakness=args.weakness, search=args.search)
+
+
+def describe(table: str, obj) -> str:
+    if table == "characters":
+        return f"{obj.id}  {obj.name}  {obj.path}"
+    if table == "light_cones":
+        return f"{obj.id}  {obj.name}  {obj.path}"
+    if table == "relics":
+        main = ", ".join(f"{k} {v}" for k, v in obj.main_stat.items())
+        return f"{obj.id}  {obj.set_name}  {obj.slot}  {main}"
+    return (f"{obj.id}  {obj.name}  {getattr(obj, 'rank', 'Unknown')}  HP={obj.stats.get('HP', 0):.0f}  "
+            f"弱点={'/'.join(obj.weaknesses)}")
+
+
+def main():
+    args = parse_args()
+    db_path = args.db or default_db_path(args.data)
+    if args.rebuild:
+        start = time.perf_counter()
+        build_game_db(args.data, db_path)
+        print(f"🗄️  已生成游戏数据库 {db_path}（{time.perf_counter() - start:.2f}s）")
+    start = time.perf_counter()
+    db = open_game_db(args.data, db_path)
+    open_seconds = time.perf_counter() - start
+    with db:
+        start = time.perf_counter()
+        results = run_query(args, db)
+        query_seconds = time.perf_counter() - start
+    for obj in results[:args.limit]:
+        print(f"  {describe(args.table, obj)}")
+    if len(results) > args.limit:
+        print(f"  ...（共 {len(results)} 条，使用 --limit 显示更多）")
+    print(f"✅ {len(results)} 条结果，查询 {query_seconds * 1000:.1f}ms（打开数据库 {open_seconds * 1000:.1f}ms）")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
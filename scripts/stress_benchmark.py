@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+压力基准 - 测量 4~100 个单位、大量常驻 Buff 下每秒行动数的扩展曲线，并标出扩展性断崖
+
+示例:
+    python scripts/stress_benchmark.py
+    python scripts/stress_benchmark.py --units 4,16,64,100 --buffs 0,500 --turns 1
+    python scripts/stress_benchmark.py --output benchmarks/scaling.json --csv scaling.csv --check
+"""
+
+import sys
+import os
+import argparse
+import contextlib
+import csv
+import json
+
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from starrail.utils.data_loader import load_all_game_data
+from starrail.engine.stress import (
+    DEFAULT_UNIT_COUNTS, DEFAULT_BUFF_COUNTS, DEFAULT_TURNS, DEFAULT_REPEATS, DEFAULT_CLIFF_EXPONENT,
+    run_scaling, find_cliffs, build_scaling_report, format_curves,
+)
+from main_simulator import setup_battle_from_dict
+
+
+def parse_counts(text: str):
+    return [int(item) for item in text.split(",") if item.strip()]
+
+
+def main():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    parser = argparse.ArgumentParser(description="大规模战斗的压力与扩展性基准")
+    parser.add_argument("--data", default=os.path.join(root, "data"), help="游戏数据目录")
+    parser.add_argument("--units", default=",".join(map(str, DEFAULT_UNIT_COUNTS)), help="单位数列表，逗号分隔")
+    parser.add_argument("--buffs", default=",".join(map(str, DEFAULT_BUFF_COUNTS)), help="每个单位的常驻 Buff 数列表，逗号分隔")
+    parser.add_argument("--turns", type=int, default=DEFAULT_TURNS, help="每场战斗运行的回合数")
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS, help="每个测量点的重复轮数（取最快一轮）")
+    parser.add_argument("--seed", type=int, default=0, help="生成阵容与战斗使用的随机种子")
+    parser.add_argument("--cliff-exponent", type=float, default=DEFAULT_CLIFF_EXPONENT, help="单次行动耗时扩展指数超过该值视为断崖")
+    parser.add_argument("--output", help="将 JSON 曲线写入该文件")
+    parser.add_argument("--csv", help="将测量点写入该 CSV 文件（便于绘图）")
+    parser.add_argument("--check", action="store_true", help="发现扩展性断崖时以非零状态退出")
+    args = parser.parse_args()
+
+    print("📂 正在加载游戏数据...")
+    with open(os.devnull, 'w', encoding='utf-8') as devnull, contextlib.redirect_stdout(devnull):
+        game_data = load_all_game_data(args.data)
+
+    def progress(point):
+        print(f"  ⏱️  {point.units:>4} 单位 × {point.buffs_per_unit:>4} Buff: {point.actions} 次行动, "
+              f"{point.seconds:.3f}s, {point.actions_per_sec:.1f} 行动/s")
+
+    print("🏋️  正在运行压力基准...")
+    points = run_scaling(lambda config: setup_battle_from_dict(config, game_data), game_data,
+                         parse_counts(args.units), parse_counts(args.buffs), args.turns, args.repeats, args.seed,
+                         progress)
+    print(format_curves(points))
+
+    cliffs = find_cliffs(points, args.cliff_exponent)
+    for cliff in cliffs:
+        print(f"⚠️  扩展性断崖: 每单位 {cliff.buffs_per_unit} 个 Buff 时，{cliff.from_units} -> {cliff.to_units} 单位"
+              f"的单次行动耗时扩展指数为 {cliff.exponent:.2f}（阈值 {args.cliff_exponent}）")
+    if not cliffs:
+        print(f"✅ 未发现扩展指数超过 {args.cliff_exponent} 的区间")
+
+    if args.output:
+        directory = os.path.dirname(os.path.abspath(args.output))
+        os.makedirs(directory, exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(json.dumps(build_scaling_report(points, args.turns, args.cliff_exponent),
+                               ensure_ascii=False, indent=2, sort_keys=True) + "\n")
+        print(f"💾 曲线已写入: {args.output}")
+    if args.csv:
+        with open(args.csv, "w", encoding="utf-8", newline="") as f:
+            rows = [point.to_dict() for point in points]
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]) if rows else [])
+            writer.writeheader()
+            writer.writerows(rows)
+        print(f"💾 测量点已写入: {args.csv}")
+    return 1 if args.check and cliffs else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
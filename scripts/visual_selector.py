@@ -15,8 +15,12 @@ import threading
 # 添加项目根目录到路径
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from starrail.utils.data_loader import load_characters, load_skills, load_light_cones, load_relics, load_processed_enemies
-from starrail.core.equipment_manager import RelicManager
+from starrail.utils.data_loader import load_characters, load_skills, load_light_cones, load_enemies_by_id, select_enemy_templates
+from starrail.utils.relic_importer import RelicImporter
+
+# 检查遗器存档是否被重新导出的间隔（毫秒）
+RELIC_WATCH_INTERVAL_MS = 5000
+RELIC_PARSE_POLL_MS = 200  # 后台解析遗器存档期间检查是否完成的间隔
 
 def create_relic_name_to_id_mapping():
     """创建仪器名称到ID的映射"""
@@ -68,7 +72,9 @@ class VisualSelector:
                 os.path.join(self.data_path, 'light_cones.json'),
                 os.path.join(self.data_path, 'light_cone_skills.json')
             )
-            relics_data = load_relics(os.path.join(self.data_path, 'fribbels-optimizer-save.json'))
+            # 遗器增量导入：存档未变化时直接使用缓存的精简记录
+            self.relic_importer = RelicImporter(os.path.join(self.data_path, 'fribbels-optimizer-save.json'))
+            self.relic_importer.refresh()
             
             # 加载角色数据
             self.characters = load_characters(
@@ -77,12 +83,14 @@ class VisualSelector:
                 light_cones_data
             )
             
-            # 加载敌人数据
-            self.enemies = load_processed_enemies(os.path.join(self.data_path, 'processed_enemies.json'))
+            # 敌人列表只读取二进制表中的名称与等级，添加敌人时才按 ID 读取其技能与 AI 信息
+            self.enemies_path = os.path.join(self.data_path, 'processed_enemies.json')
+            self.enemies = select_enemy_templates(self.enemies_path)
             
             self.light_cones = light_cones_data
-            self.relics = relics_data
-            self.relic_manager = RelicManager(self.relics)
+            self.relic_manager = self.relic_importer.manager
+            self.relics = self.relic_manager.relics
+            self.root.after(RELIC_WATCH_INTERVAL_MS, self.watch_relics)
             
             print(f"✅ 数据加载成功:")
             print(f"   角色: {len(self.characters)} 个")
@@ -94,6 +102,42 @@ class VisualSelector:
             print(f"❌ 数据加载失败: {e}")
             messagebox.showerror("错误", f"数据加载失败: {e}")
     
+    def watch_relics(self):
+        """
+        定期检查遗器存档，写入完成（连续两次检查大小与修改时间不变）后在后台线程中解析，
+        解析完成后回到界面线程增量更新遗器管理器（新打开的装备窗口即可看到变化），解析期间界面不会卡住
+        """
+        try:
+            if self.relic_importer.stable_change():
+                result = {}
+                worker = threading.Thread(target=self._read_relics, args=(result,), daemon=True)
+                worker.start()
+                self.root.after(RELIC_PARSE_POLL_MS, self._apply_relics, worker, result)
+                return
+        except OSError as e:
+            print(f"⚠️  遗器存档读取失败，稍后重试: {e}")
+        self.root.after(RELIC_WATCH_INTERVAL_MS, self.watch_relics)
+
+    def _read_relics(self, result):
+        """后台线程：只解析存档，不修改遗器管理器，也不调用 Tk"""
+        try:
+            result['read'] = self.relic_importer.read()
+        except (OSError, ValueError) as e:
+            result['error'] = e
+
+    def _apply_relics(self, worker, result):
+        """界面线程：等待后台解析完成后应用结果，再恢复定期检查"""
+        if worker.is_alive():
+            self.root.after(RELIC_PARSE_POLL_MS, self._apply_relics, worker, result)
+            return
+        if 'error' in result:
+            print(f"⚠️  遗器存档读取失败，稍后重试: {result['error']}")
+        else:
+            changes = self.relic_importer.apply(*result['read'])
+            if changes:
+                print(f"🔄 遗器存档已更新: {changes.summary()}")
+        self.root.after(RELIC_WATCH_INTERVAL_MS, self.watch_relics)
+    
     def create_widgets(self):
         """创建界面组件"""
         # 创建主框架
@@ -326,7 +370,7 @@ class VisualSelector:
         max_cols = 3
         
         for enemy in self.enemies:
-            if search_term and search_term not in enemy.name.lower():
+            if search_term and search_term not in enemy['name'].lower():
                 continue
                 
             # 创建敌人卡片框架
@@ -334,17 +378,17 @@ class VisualSelector:
             card_frame.grid(row=row, column=col, padx=5, pady=5, sticky="nsew")
             
             # 敌人名称
-            name_label = ttk.Label(card_frame, text=enemy.name, font=("Arial", 10, "bold"))
+            name_label = ttk.Label(card_frame, text=enemy['name'], font=("Arial", 10, "bold"))
             name_label.pack()
             
             # 敌人信息
-            info_text = f"ID: {enemy.id}\nRank: {getattr(enemy, 'rank', 'Unknown')}"
+            info_text = f"ID: {enemy['id']}\nRank: {enemy.get('rank', 'Unknown')}"
             info_label = ttk.Label(card_frame, text=info_text, font=("Arial", 8))
             info_label.pack()
             
             # 添加按钮
             add_btn = ttk.Button(card_frame, text="添加", 
-                               command=lambda e=enemy: self.add_enemy_to_list(e))
+                               command=lambda e=enemy: self.add_enemy_to_list(e['id']))
             add_btn.pack(pady=2)
             
             # 更新行列位置
@@ -379,8 +423,13 @@ class VisualSelector:
         # 打开装备选择窗口，不立即添加到队伍
         self.open_equipment_selector(character)
     
-    def add_enemy_to_list(self, enemy):
-        """添加敌人到列表"""
+    def add_enemy_to_list(self, enemy_id):
+        """按 ID 创建敌人并添加到列表"""
+        enemy = load_enemies_by_id(self.enemies_path, [enemy_id]).get(str(enemy_id))
+        if enemy is None:
+            messagebox.showerror("错误", f"未找到ID为 {enemy_id} 的敌人")
+            return
+        
         # 检查是否已经在列表中
         if any(e.id == enemy.id for e in self.current_enemies):
             messagebox.showwarning("警告", f"{enemy.name} 已经在敌人列表中")
@@ -576,7 +625,7 @@ class VisualSelector:
                 # 加载敌人
                 for enemy_data in config.get('enemies', []):
                     enemy_id = enemy_data.get('id')
-                    enemy = next((e for e in self.enemies if e.id == enemy_id), None)
+                    enemy = load_enemies_by_id(self.enemies_path, [enemy_id]).get(str(enemy_id))
                     if enemy:
                         # 更新敌人属性（如果需要）
                         if 'stats' in enemy_data:
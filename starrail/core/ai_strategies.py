@@ -1,7 +1,7 @@
 # ai_strategies.py
-import random
 from typing import Optional, List
 from .skills.base_skill import BaseSkill
+from ..utils.random_tape import random_uniform, random_choice
 
 # 前向声明以支持类型提示
 if False:
@@ -55,8 +55,6 @@ def seele_balanced_ai(character) -> Optional[BaseSkill]:
     1. 70%概率使用战技（如果有战技点）
     2. 30%概率使用普攻
     """
-    import random
-    
     if not character.skills:
         return None
     
@@ -78,7 +76,7 @@ def seele_balanced_ai(character) -> Optional[BaseSkill]:
                 basic_skill = s
     
     # 70%概率使用战技，30%概率使用普攻（但需要战技点）
-    if random.random() < 0.7 and can_use_skill and skill:
+    if random_uniform(battle_context, "ai") < 0.7 and can_use_skill and skill:
         return skill
     elif basic_skill:
         return basic_skill
@@ -210,7 +208,7 @@ def bronya_simple_ai(character: 'Character') -> Optional[BaseSkill]:
     skill = next((s for s in character.skills if getattr(s, 'skill_id', '') == "110102"), None)
     basic_skill = next((s for s in character.skills if getattr(s, 'skill_id', '') == "110101"), None)
 
-    if can_use_skill and skill and random.random() < 0.7:
+    if can_use_skill and skill and random_uniform(battle_context, "ai") < 0.7:
         return skill
     
     return basic_skill or (character.skills[0] if character.skills else None)
@@ -232,4 +230,4 @@ def enemy_default_ai(character) -> Optional[BaseSkill]:
         from .skills.base_skill import BaseSkill
         return BaseSkill.create_default_attack(character)
     
-    return random.choice(character.skills)
\ No newline at end of file
+    return random_choice(character, "ai", character.skills, actor=character)
\ No newline at end of file
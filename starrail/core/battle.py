@@ -1,14 +1,29 @@
 # starrail/core/battle.py (基于你的本地文件进行美化和修正)
-from typing import List
+import io
+from typing import List, Dict, Callable, Optional
 from .character import Character
 from .ai_strategies import seele_should_cast_ultimate, default_should_cast_ultimate
-from ..utils.logger import logger # 引入日志记录器
+from .skills.multiplier_cache import DamageMultiplierCache
+from .skills.hit_record import ActionRecord
+from ..utils.random_tape import BattleRandom, random_choice
+from ..utils.logger import logger, LogState, log_scope # 引入日志记录器
+from ..utils import metrics
 
 class Battle:
-    def __init__(self, characters: List[Character]):
+    def __init__(self, characters: List[Character], rng: Optional[BattleRandom] = None, capture_output: bool = False):
         self.characters = characters
+        # 进入战斗时初始化尚未设置的生命值
+        for char in self.characters:
+            char.init_hp()
+        # 本场战斗的日志状态（缩进、动态属性日志去重），capture_output 为 True 时日志写入内存
+        self.log_state = LogState(output=io.StringIO() if capture_output else None)
+        # 本场战斗的引擎计数器（属性重算、缓存命中、Buff、钩子、效果、调度等）
+        self.metrics = metrics.MetricsRegistry()
+        # 战斗随机数磁带，为 None 时使用全局 random 模块
+        self.rng = rng
         self.turn = 0
         self.is_over = False
+        self.winner: Optional[str] = None
         self.action_gauges = {char: 0 for char in self.characters}
         self.action_progress = {char: 0.0 for char in self.characters}
         self.skill_points_by_side = {}
@@ -21,6 +36,35 @@ class Battle:
             self.max_skill_points_by_side[side] = 5
         
         self.pending_next_turn_boosts = {}
+        # 战斗内伤害乘区缓存（防御/抗性/韧性/易伤）
+        self.multiplier_cache = DamageMultiplierCache()
+        # 战斗事件监听器: "hit" -> HitRecord, "action" -> ActionRecord, "heal" -> HealRecord
+        self._listeners: Dict[str, List[Callable]] = {}
+
+    def add_listener(self, event: str, callback: Callable):
+        """注册战斗事件监听器"""
+        self._listeners.setdefault(event, []).append(callback)
+
+    def remove_listener(self, event: str, callback: Callable):
+        if callback in self._listeners.get(event, []):
+            self._listeners[event].remove(callback)
+
+    def has_listeners(self, event: str) -> bool:
+        return bool(self._listeners.get(event))
+
+    def emit(self, event: str, payload):
+        """向所有监听器分发战斗事件"""
+        for callback in self._listeners.get(event, []):
+            callback(payload)
+
+    def use_reference_path(self):
+        """关闭伤害乘区缓存，每次命中重新计算乘区，用于差分校验（其他优化不受影响）"""
+        self.multiplier_cache = None
+
+    def _record_action(self, character: Character, kind: str):
+        metrics.count(metrics.ACTIONS, character.name)
+        if self.has_listeners("action"):
+            self.emit("action", ActionRecord(turn=self.turn, actor_name=character.name, kind=kind))
 
     def get_skill_points(self, side: str) -> int:
         return self.skill_points_by_side.get(side, 0)
@@ -72,7 +116,21 @@ class Battle:
                 logger.log(f"  - {char.name:<15} | {hp_str:<20} | {spd_str:<15} | {crit_str} | {energy_str}")
         logger.end_block()
 
+    def enable_capture(self):
+        """将本场战斗的日志写入内存（可通过 transcript 读取），适合并发运行多场战斗"""
+        self.log_state.output = io.StringIO()
+
+    @property
+    def transcript(self) -> str:
+        """capture_output 模式下本场战斗的完整日志"""
+        output = self.log_state.output
+        return output.getvalue() if isinstance(output, io.StringIO) else ""
+
     def run(self, max_turns=10):
+        with log_scope(self.log_state), metrics.metrics_scope(self.metrics):
+            self._run(max_turns)
+
+    def _run(self, max_turns):
         logger.log("="*60, color="purple")
         logger.log("⚔️ 战斗开始！", color="purple")
         logger.log("="*60, color="purple")
@@ -106,6 +164,7 @@ class Battle:
         round_count = 1
         EPS = 1e-6
         while not self.is_over and round_count <= max_turns:
+            self.turn = round_count
             action_value_pool = 150 if round_count == 1 else 100
             logger.log(f"\n{'='*20} [全局回合 {round_count}] | 行动值池: {action_value_pool} {'='*20}", color="yellow")
             
@@ -121,6 +180,7 @@ class Battle:
                 while ready:
                     for c in ready:
                         logger.start_block(f"🎬 {c.name}({c.side}) 行动！ (SPD={c.spd:.1f})", color="green")
+                        self._record_action(c, "turn")
                         c.take_turn(self)
                         self.action_progress[c] -= 1
                         logger.end_block()
@@ -137,6 +197,7 @@ class Battle:
                         
                         if hasattr(c, 'is_in_extra_turn') and c.is_in_extra_turn():
                             logger.start_block(f"🔁 {c.name} 获得额外回合！", color="green")
+                            self._record_action(c, "extra_turn")
                             c.take_turn(self)
                             c.set_extra_turn(False)
                             logger.end_block()
@@ -159,6 +220,7 @@ class Battle:
                 advance = action_value_pool if (min_need == float('inf') or min_need <= 0 or min_need > action_value_pool) else min_need
                 
                 logger.log(f"-> 行动值池推进: {advance:.2f} | 剩余: {action_value_pool - advance:.2f}", color="cyan")
+                metrics.count(metrics.SCHEDULER_TICKS)
                 
                 for c in self.action_progress:
                     spd = c.spd
@@ -184,6 +246,7 @@ class Battle:
         if len(sides) <= 1:
             self.is_over = True
             winning_side = list(sides)[0] if sides else "无"
+            self.winner = list(sides)[0] if sides else None
             logger.log(f"\n🏆 战斗结束！{winning_side} 阵营获胜！", color="green")
 
     def boost_action_progress(self, character, boost_amount):
@@ -221,10 +284,10 @@ class Battle:
                 if ultimate_skill:
                     enemies = [c for c in self.characters if c.side != char.side and c.is_alive()]
                     if enemies:
-                        import random
-                        target = random.choice(enemies)
+                        target = random_choice(self, "target", enemies, actor=char)
                         max_level = getattr(ultimate_skill, 'max_level', 1)
                         logger.start_block(f"⚡ {char.name} 插队释放终结技 [{getattr(ultimate_skill, 'name', 'Ultra')}]!", color="purple")
+                        self._record_action(char, "ultimate")
                         char.set_last_skill_type("Ultra")
                         char.consume_energy(char.max_sp)
                         if hasattr(char, 'light_cone') and char.light_cone and hasattr(char.light_cone, 'skill_instance') and char.light_cone.skill_instance:
@@ -1,7 +1,9 @@
 # starrail/core/character.py (日志优化和事件修正版)
-import random
 from typing import List, Dict, Any, Optional, Callable
 from ..utils.logger import logger
+from ..utils.random_tape import random_choice
+from ..utils import metrics
+from .skills.hit_record import HealRecord
 
 # 前向声明以支持类型提示
 if False:
@@ -18,7 +20,9 @@ class Character:
         self.stats = stats
         self.skills: List['BaseSkill'] = skills
         self.buffs: List['Buff'] = []
-        self.hp = self.get_current_stats(recursive_guard=True).get("HP", 100)
+        self._stats_version = 0
+        # 生命值延迟到进入战斗（或首次读取）时按最终属性初始化，加载数据时不做属性计算
+        self._hp: Optional[float] = None
         self.side = side
         self.light_cone = light_cone
         self.path = path
@@ -41,6 +45,7 @@ class Character:
     def get_current_stats(self, recursive_guard: bool = False) -> Dict[str, Any]:
         from .equipment_manager import calc_total_stats
         from .skills.buff import Buff
+        metrics.count(metrics.STAT_RECALCS, self.name)
         base_stats, percent_stats, flat_bonus, _, _ = calc_total_stats(self)
         flat_bonus = {k: float(v) for k, v in flat_bonus.items()}
         all_buffs = getattr(self, 'buffs', [])
@@ -63,7 +68,7 @@ class Character:
             if hasattr(self.light_cone.skill_instance, 'on_turn_start'):
                 self.light_cone.skill_instance.on_turn_start(self)
 
-        skill_to_use = self.ai_strategy(self) if callable(self.ai_strategy) else random.choice(self.skills)
+        skill_to_use = self.ai_strategy(self) if callable(self.ai_strategy) else random_choice(battle_context, "ai", self.skills, actor=self)
         if not skill_to_use:
             logger.log(f"{self.name} 没有可用的技能，跳过回合。", color="yellow")
             return
@@ -139,7 +144,7 @@ class Character:
         else:
             enemies = [c for c in battle_context.characters if c.side != self.side and c.is_alive()]
             if enemies:
-                targets = [random.choice(enemies)]
+                targets = [random_choice(battle_context, "target", enemies, actor=self)]
         return targets
 
     def _process_buff_duration(self):
@@ -161,6 +166,7 @@ class Character:
         
         for buff in expired_buffs:
             self.remove_buff(buff)
+            metrics.count(metrics.BUFFS_EXPIRED, buff.name)
             logger.log(f"[Buff结束] '{buff.name}' 已失效。", color="purple")
 
     def check_resurgence_talent(self):
@@ -205,6 +211,21 @@ class Character:
     def set_last_skill_type(self, skill_type: str): self._last_skill_type = skill_type
     def set_extra_turn(self, has_extra_turn: bool): self._has_extra_turn = has_extra_turn
     def is_in_extra_turn(self) -> bool: return getattr(self, '_has_extra_turn', False)
+    @property
+    def hp(self) -> float:
+        if self._hp is None:
+            self.init_hp()
+        return self._hp
+
+    @hp.setter
+    def hp(self, value: float):
+        self._hp = value
+
+    def init_hp(self):
+        """尚未设置生命值时，按当前最终属性回满"""
+        if self._hp is None:
+            self._hp = self.get_current_stats().get("HP", 100)
+
     def get_max_hp(self) -> float: return self.get_current_stats().get("HP", 0)
     def get_hp_ratio(self) -> float: return self.hp / self.get_max_hp() if self.get_max_hp() > 0 else 0
     def show_hp(self) -> str: return f"{self.hp:.0f}/{self.get_max_hp():.0f}"
@@ -215,28 +236,26 @@ class Character:
         old_hp = self.hp
         self.hp = min(self.hp + amount, max_hp)
         healed = self.hp - old_hp
+        if self._battle_context is not None and self._battle_context.has_listeners("heal"):
+            self._battle_context.emit("heal", HealRecord(target_name=self.name, source=source, amount=healed, hp_after=self.hp))
         logger.log(f"[治疗] {self.name} 回复了 {healed:.1f} HP (from: {source or '未知'})，当前HP: {self.show_hp()}", color="green")
 
     @staticmethod
     def defense_reduction(damage, attacker: 'Character', defender: 'Character', reduce_def_pct=0, flat_reduce_def=0, skip_ignore_def=False):
-        attacker_stats = attacker.get_current_stats()
-        ignore_def_pct = attacker_stats.get("DEF Ignore %", 0)
-        def_val = defender.get_current_stats().get("DEF", 0)
-        def_val *= (1 - reduce_def_pct)
-        def_val += flat_reduce_def
-        
-        if skip_ignore_def:
-            ignore_def_pct = 0
-            logger.log(f"-> [击破伤害] 跳过无视防御效果", color="yellow")
-        
-        def_val *= (1 - ignore_def_pct)
-        def_val = max(def_val, 0)
-        level = getattr(attacker, 'level', 80)
-        reduction = def_val / (def_val + level * 10 + 200)
-        final_damage = damage * (1 - reduction)
+        from .skills.multiplier_cache import compute_defense_multiplier, get_multiplier_cache
+        cache = get_multiplier_cache(attacker)
+        if cache is not None:
+            (multiplier, reduction, ignore_def_pct), cached = cache.defense_multiplier(attacker, defender, reduce_def_pct, flat_reduce_def, skip_ignore_def)
+        else:
+            multiplier, reduction, ignore_def_pct = compute_defense_multiplier(attacker, defender, reduce_def_pct, flat_reduce_def, skip_ignore_def)
+            cached = False
+        final_damage = damage * multiplier
         
-        logger.log(f"-> 防御修正(系数: {reduction:.3f}):", color="red")
-        logger.log(f"   (无视:{ignore_def_pct:.1%}, 减防:{reduce_def_pct:.1%}, 固减:{flat_reduce_def}) -> 最终伤害: {final_damage:.1f}")
+        if cached:
+            logger.log_verbose(f"-> 防御修正(缓存, 系数: {reduction:.3f}) -> 最终伤害: {final_damage:.1f}")
+        else:
+            logger.log(f"-> 防御修正(系数: {reduction:.3f}):", color="red")
+            logger.log(f"   (无视:{ignore_def_pct:.1%}, 减防:{reduce_def_pct:.1%}, 固减:{flat_reduce_def}) -> 最终伤害: {final_damage:.1f}")
         return final_damage
 
     def receive_damage(self, amount: float, attacker: Optional['Character'] = None, **kwargs):
@@ -258,13 +277,21 @@ class Character:
                 if b.name == buff.name:
                     b.duration = buff.duration
                     b.freshly_added = True
+                    self.bump_stats_version()
                     logger.log(f"[Buff刷新] {self.name} 的 '{b.name}' 刷新为 {b.duration} 回合", color="purple")
                     return
         self.buffs.append(buff)
+        self.bump_stats_version()
         logger.log(f"[Buff获得] {self.name} 获得 '{buff.name}' (持续{buff.duration}回合)", color="purple")
 
     def remove_buff(self, buff_to_remove: 'Buff'):
-        if buff_to_remove in self.buffs: self.buffs.remove(buff_to_remove)
+        if buff_to_remove in self.buffs:
+            self.buffs.remove(buff_to_remove)
+            self.bump_stats_version()
+
+    def bump_stats_version(self):
+        """属性来源(Buff、装备)发生变化时调用，使基于属性快照的缓存失效。"""
+        self._stats_version += 1
 
     @property
     def atk(self): return self.get_current_stats().get("ATK", 0)
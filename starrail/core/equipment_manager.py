@@ -1,8 +1,24 @@
 # equipment_manager.py
 import os
 import json
+import functools
 from starrail.core.relics.relic_set_skill import RelicSetSkillFactory
 
+RELIC_SKILLS_PATH = os.path.join(os.path.dirname(__file__), '../../data/relic_skills.json')
+
+
+@functools.lru_cache(maxsize=None)
+def load_relic_set_data(path: str = RELIC_SKILLS_PATH) -> dict:
+    """按套装名索引遗器套装数据（relic_skills.json 为静态游戏数据，每个进程只解析一次）"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        relic_data = json.load(f)
+    sets = {}
+    for entry in relic_data:
+        sets.setdefault(entry.get('name'), entry)
+    return sets
+
 class RelicManager:
     """遗器管理器 - 提供遗器筛选、套装管理、推荐等功能"""
     
@@ -10,6 +26,15 @@ class RelicManager:
         self.relics = relics_data
         self.relics_by_slot = self._organize_relics_by_slot()
         self.relics_by_set = self._organize_relics_by_set()
+        self.relics_by_main_stat = self._organize_relics_by_main_stat()
+    
+    @classmethod
+    def from_stream(cls, relics):
+        """由逐件产出遗器的迭代器（如 data_loader.iter_relics）边读取边建立索引"""
+        manager = cls({})
+        for relic in relics:
+            manager.add_relic(relic)
+        return manager
     
     def _organize_relics_by_slot(self):
         """按部位组织遗器"""
@@ -36,6 +61,71 @@ class RelicManager:
                 organized[relic.set_name].append(relic)
         return organized
     
+    def add_relic(self, relic):
+        """添加遗器并更新部位/套装索引（追加在末尾）"""
+        self.relics[relic.id] = relic
+        if getattr(relic, 'slot', None) in self.relics_by_slot:
+            self.relics_by_slot[relic.slot].append(relic)
+        if getattr(relic, 'set_name', None):
+            self.relics_by_set.setdefault(relic.set_name, []).append(relic)
+        for key in self._main_stat_keys(relic):
+            self.relics_by_main_stat.setdefault(key, []).append(relic)
+    
+    def remove_relic(self, relic_id):
+        """移除遗器并更新部位/套装索引，返回被移除的遗器（不存在时返回 None）"""
+        relic = self.relics.pop(relic_id, None)
+        if relic is None:
+            return None
+        self._remove_from_index(self.relics_by_slot, getattr(relic, 'slot', None), relic, keep_empty=True)
+        self._remove_from_index(self.relics_by_set, getattr(relic, 'set_name', None), relic)
+        for key in self._main_stat_keys(relic):
+            self._remove_from_index(self.relics_by_main_stat, key, relic)
+        return relic
+    
+    def update_relic(self, relic):
+        """替换同ID的遗器，部位与套装不变时保持其在索引中的位置"""
+        old = self.relics.get(relic.id)
+        if old is None:
+            self.add_relic(relic)
+            return
+        if old.slot != relic.slot or old.set_name != relic.set_name or list(old.main_stat) != list(relic.main_stat):
+            self.remove_relic(relic.id)
+            self.add_relic(relic)
+            return
+        self.relics[relic.id] = relic
+        indexes = [(self.relics_by_slot, relic.slot), (self.relics_by_set, relic.set_name)]
+        indexes += [(self.relics_by_main_stat, key) for key in self._main_stat_keys(relic)]
+        for index, key in indexes:
+            items = index.get(key, [])
+            for i, item in enumerate(items):
+                if item is old:
+                    items[i] = relic
+                    break
+    
+    @staticmethod
+    def _remove_from_index(index, key, relic, keep_empty=False):
+        items = index.get(key)
+        if items is None:
+            return
+        for i, item in enumerate(items):
+            if item is relic:
+                del items[i]
+                break
+        if not items and not keep_empty:
+            del index[key]
+    
+    def _organize_relics_by_main_stat(self):
+        """按 (部位, 主属性) 组织遗器"""
+        organized = {}
+        for relic in self.relics.values():
+            for key in self._main_stat_keys(relic):
+                organized.setdefault(key, []).append(relic)
+        return organized
+    
+    @staticmethod
+    def _main_stat_keys(relic):
+        return [(getattr(relic, 'slot', None), stat) for stat in (getattr(relic, 'main_stat', None) or {})]
+    
     def get_relics_by_slot(self, slot):
         """获取指定部位的所有遗器"""
         return self.relics_by_slot.get(slot, [])
@@ -46,8 +136,7 @@ class RelicManager:
     
     def get_relics_by_main_stat(self, slot, main_stat):
         """获取指定部位和主属性的遗器"""
-        relics = self.get_relics_by_slot(slot)
-        return [r for r in relics if hasattr(r, 'main_stat') and r.main_stat.get('stat') == main_stat]
+        return self.relics_by_main_stat.get((slot, main_stat), [])
     
     def get_relics_by_sub_stats(self, slot, sub_stats):
         """获取指定部位和副属性的遗器"""
@@ -150,11 +239,17 @@ class RelicManager:
         
         return recommendations
 
+def _bump_stats_version(character):
+    if hasattr(character, 'bump_stats_version'):
+        character.bump_stats_version()
+
 def equip_light_cone(character, light_cone):
     character.light_cone = light_cone
+    _bump_stats_version(character)
 
 def unequip_light_cone(character):
     character.light_cone = None
+    _bump_stats_version(character)
 
 def equip_relic(character, relic):
     if not hasattr(character, 'relics') or character.relics is None:
@@ -168,11 +263,13 @@ def equip_relic(character, relic):
         print("角色最多只能装备6个遗器。")
         return False
     character.relics.append(relic)
+    _bump_stats_version(character)
     return True
 
 def unequip_relic_by_slot(character, slot):
     if hasattr(character, 'relics') and character.relics:
         character.relics = [r for r in character.relics if r.slot != slot]
+        _bump_stats_version(character)
 
 def normalize_path(p):
     # 规范化命途名称，用于比较
@@ -263,7 +360,6 @@ def calc_total_stats(character):
             set_counter[relic.set_name] = set_counter.get(relic.set_name, 0) + 1
     
     # 激活套装效果（只考虑2件/4件套）
-    relic_skills_path = os.path.join(os.path.dirname(__file__), '../../data/relic_skills.json')
     active_sets = {}
     complex_effects = {}  # 复杂效果，用于战斗内结算
     relic_set_skills = []  # 遗器套装技能实例
@@ -273,19 +369,11 @@ def calc_total_stats(character):
         def __init__(self):
             self.spd = 0
     
-    # 加载遗器套装数据
-    if os.path.exists(relic_skills_path):
-        with open(relic_skills_path, encoding='utf-8') as f:
-            relic_data = json.load(f)
-        
+    # 遗器套装数据
+    relic_set_data = load_relic_set_data()
+    if relic_set_data:
         for set_name, count in set_counter.items():
-            # 查找套装数据
-            set_data = None
-            for entry in relic_data:
-                if entry.get('name') == set_name:
-                    set_data = entry
-                    break
-            
+            set_data = relic_set_data.get(set_name)
             if set_data:
                 description = set_data.get('skills', '')
                 skill_instance = RelicSetSkillFactory.create_skill(set_name, description, level=1)
@@ -2,6 +2,7 @@
 from typing import Dict, Any, Optional, List
 from abc import ABC, abstractmethod
 from ...utils.logger import logger
+from ...utils.metrics import count_overridden_hooks
 
 # 前向声明以支持类型提示
 if False:
@@ -10,6 +11,11 @@ if False:
 
 class LightConeSkill(ABC):
     """光锥技能基类"""
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # 统计子类实现的事件钩子调用次数
+        count_overridden_hooks(cls, LightConeSkill)
+
     def __init__(self, skill_id: str, name: str, desc: str, params: List[List[float]], level: int = 1):
         self.skill_id, self.name, self.desc, self.params, self.level = skill_id, name, desc, params, max(1, min(level, len(params)))
         self.current_params = params[self.level - 1]
@@ -151,6 +157,11 @@ class LightConeSkillFactory:
         # --- 注册布洛妮娅光锥 ---
         "23003": ButTheBattleIsntOverSkill,
     }
+
+    @classmethod
+    def registered_ids(cls) -> List[str]:
+        """已实现技能的光锥ID"""
+        return sorted(cls._skill_classes)
     
     @classmethod
     def create_skill(cls, skill_id: str, skill_data: Dict[str, Any], level: int = 1) -> Optional[LightConeSkill]:
@@ -2,6 +2,7 @@
 from typing import Dict, Any, Optional, List
 from abc import ABC, abstractmethod
 from starrail.utils.logger import logger
+from starrail.utils.metrics import count_overridden_hooks, counted_hook
 
 # 前向声明以支持类型提示
 if False:
@@ -10,6 +11,11 @@ if False:
 
 class RelicSetSkill(ABC):
     """遗器套装技能基类"""
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # 统计子类实现的事件钩子调用次数
+        count_overridden_hooks(cls, RelicSetSkill)
     
     def __init__(self, set_name: str, description: str, level: int = 1):
         self.set_name = set_name
@@ -22,6 +28,7 @@ class RelicSetSkill(ABC):
         pass
     
     # --- 事件钩子 (通常用于4件套或更复杂的效果) ---
+    @counted_hook
     def on_battle_start(self, character: 'Character'):
         """战斗开始时触发"""
         logger.log(f"[遗器] {character.name} 装备了 '{self.set_name}'", color="cyan")
@@ -81,7 +88,8 @@ class SpaceSealingStationSkill(RelicSetSkill):
         from starrail.core.skills.buff import Buff
 
         def dynamic_station_bonus(char: 'Character') -> Dict[str, float]:
-            current_spd = char.get_current_stats().get("SPD", 0)
+            # 在动态属性计算中读取速度，需跳过动态加成以免无限递归
+            current_spd = char.get_current_stats(recursive_guard=True).get("SPD", 0)
             if current_spd >= self.spd_threshold:
                 logger.log_verbose(f"-> [遗器效果] '{self.set_name}' 速度达标({current_spd:.0f})，提供额外ATK")
                 return {"ATK%": self.extra_atk_bonus}
@@ -201,6 +209,11 @@ class RelicSetSkillFactory:
         # --- 注册新套装 ---
         "Passerby of Wandering Cloud": PasserbyOfWanderingCloudSkill,
     }
+
+    @classmethod
+    def registered_sets(cls) -> List[str]:
+        """已实现技能的遗器套装名称"""
+        return sorted(cls._skill_classes)
     
     @classmethod
     def create_skill(cls, set_name: str, description: str, level: int = 1) -> Optional[RelicSetSkill]:
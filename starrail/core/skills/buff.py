@@ -1,5 +1,7 @@
 # starrail/core/skills/buff.py (已修正)
 from typing import Optional, Dict, Any, List, Callable
+from ...utils.logger import current_log_state
+from ...utils import metrics
 
 # 为了类型提示
 if False:
@@ -8,11 +10,12 @@ if False:
 class Buff:
     # 静态变量控制动态属性日志输出
     _show_dynamic_stats_log = True
-    _dynamic_stats_logged = set()  # 记录已输出的Buff名称
+    # 已输出动态属性日志的Buff名称记录在当前战斗的日志状态中（LogState.dynamic_stats_logged）
     
     def __init__(self, name: str, duration: int, stat_bonus: Optional[Dict[str, float]] = None, damage_bonus: float = 0, element_penetration: float = 0, stackable: bool = False, dynamic_stat_bonus_func: Optional[Callable[['Character'], Dict[str, float]]] = None, dynamic_damage_bonus_func: Optional[Callable[['Character'], float]] = None):
         self.name = name
         self.duration = duration
+        metrics.count(metrics.BUFFS_CREATED, name)
         self.stat_bonus = stat_bonus or {}
         self.damage_bonus = damage_bonus
         self.element_penetration = element_penetration
@@ -69,10 +72,11 @@ class Buff:
                     dynamic_bonuses = buff.dynamic_stat_bonus_func(character)
                     for k, v in dynamic_bonuses.items():
                         # 只在需要时输出动态属性日志
-                        if (Buff._show_dynamic_stats_log and 
-                            buff.name not in Buff._dynamic_stats_logged):
-                            print(f"    [属性计算] {buff.name} 动态属性: {k} +{v*100:.1f}%")
-                            Buff._dynamic_stats_logged.add(buff.name)
+                        if Buff._show_dynamic_stats_log:
+                            dynamic_stats_logged = current_log_state().dynamic_stats_logged
+                            if buff.name not in dynamic_stats_logged:
+                                print(f"    [属性计算] {buff.name} 动态属性: {k} +{v*100:.1f}%")
+                                dynamic_stats_logged.add(buff.name)
                         percent_stats[k] = percent_stats.get(k, 0) + v
 
         for base, percent in [("HP", "HP%"), ("DEF", "DEF%"), ("ATK", "ATK%"), ("SPD", "SPD%")]:
@@ -116,8 +120,8 @@ class Buff:
     
     @staticmethod
     def reset_dynamic_stats_log():
-        """重置动态属性日志状态，允许重新输出日志"""
-        Buff._dynamic_stats_logged.clear()
+        """重置当前日志状态中的动态属性日志记录，允许重新输出日志"""
+        current_log_state().dynamic_stats_logged.clear()
     
     @staticmethod
     def set_dynamic_stats_log_enabled(enabled: bool):
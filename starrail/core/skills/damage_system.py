@@ -2,7 +2,10 @@
 from dataclasses import dataclass
 from typing import Optional, Dict, List
 from enum import Enum
-import random
+from ...utils.random_tape import roll_crit
+from ...utils.streaming_stats import DamageStatsAggregator
+from .skill_manager import SkillManager
+from ..enemy import Enemy
 
 class DamageType(Enum):
     """伤害类型"""
@@ -42,16 +45,23 @@ class DamageInstance:
         }
 
 class DamageCalculator:
-    """伤害计算器"""
+    """
+    伤害计算器
+    伤害统计按 (攻击者, 伤害类型, 元素) 流式累计，内存占用不随伤害次数增长；
+    keep_history 为 True 时额外保留完整的 damage_history 以便逐条回看。
+    """
     
-    def __init__(self):
+    def __init__(self, keep_history: bool = False):
+        self.keep_history = keep_history
         self.damage_history: List[DamageInstance] = []
+        self.stats = DamageStatsAggregator()
     
     def calculate_damage(self, attacker, target, multiplier: float, element: Optional[str] = None, 
                         damage_type: DamageType = DamageType.NORMAL, 
-                        force_crit: bool = False, crit_immunity: bool = False) -> DamageInstance:
+                        force_crit: bool = False, crit_immunity: bool = False, record: bool = True) -> DamageInstance:
         """
         计算伤害的主函数
+        record: 是否计入伤害统计（预览伤害时为 False）
         """
         # 1. 基础伤害计算
         base_damage = self._calculate_base_damage(attacker, multiplier)
@@ -100,8 +110,12 @@ class DamageCalculator:
             }
         )
         
-        # 记录到历史
-        self.damage_history.append(damage_instance)
+        # 记录到统计
+        if record:
+            self.stats.record(damage_instance.attacker_name, damage_type.value, element,
+                              final_damage, damage_instance.is_critical)
+            if self.keep_history:
+                self.damage_history.append(damage_instance)
         
         # 输出详细日志
         self._log_damage_calculation(damage_instance, theory_damage)
@@ -143,7 +157,7 @@ class DamageCalculator:
         crit_rate = attacker.get_current_stats().get("CRIT Rate", 0.05)
         crit_dmg = attacker.get_current_stats().get("CRIT DMG", 0.5)
         
-        is_crit = force_crit or random.random() < crit_rate
+        is_crit = force_crit or roll_crit(attacker, crit_rate)
         multiplier = 1 + crit_dmg if is_crit else 1.0
         
         return {
@@ -220,10 +234,10 @@ class DamageCalculator:
         
         # 非暴击伤害
         non_crit = self.calculate_damage(attacker, target, multiplier, element, 
-                                       crit_immunity=True)
+                                       crit_immunity=True, record=False)
         # 暴击伤害
         crit = self.calculate_damage(attacker, target, multiplier, element, 
-                                   force_crit=True)
+                                   force_crit=True, record=False)
         
         # 期望伤害
         expected = non_crit.final_damage * (1 - crit_rate) + crit.final_damage * crit_rate
@@ -235,31 +249,15 @@ class DamageCalculator:
             "crit_rate": crit_rate
         }
     
-    def get_damage_statistics(self, attacker_name: Optional[str] = None) -> Dict:
-        """获取伤害统计"""
-        filtered_history = self.damage_history
-        if attacker_name:
-            filtered_history = [d for d in self.damage_history if d.attacker_name == attacker_name]
-        
-        if not filtered_history:
-            return {}
-        
-        total_damage = sum(d.final_damage for d in filtered_history)
-        crit_count = sum(1 for d in filtered_history if d.is_critical)
-        
-        return {
-            "total_damage": total_damage,
-            "average_damage": total_damage / len(filtered_history),
-            "max_damage": max(d.final_damage for d in filtered_history),
-            "min_damage": min(d.final_damage for d in filtered_history),
-            "critical_hits": crit_count,
-            "critical_rate": crit_count / len(filtered_history),
-            "damage_instances": len(filtered_history)
-        }
+    def get_damage_statistics(self, attacker_name: Optional[str] = None, damage_type: Optional[DamageType] = None,
+                              element: Optional[str] = None) -> Dict:
+        """获取伤害统计，可按攻击者/伤害类型/元素筛选"""
+        return self.stats.summary(attacker_name or None, damage_type.value if damage_type else None, element)
 
 # 在SkillManager中集成新的伤害系统
 class SkillManagerWithNewDamage(SkillManager):
     """集成新伤害系统的SkillManager"""
+    toughness_map = {"Normal": 10, "BPSkill": 20, "Ultra": 30}
     
     def __init__(self, skill_data_dict):
         super().__init__(skill_data_dict)
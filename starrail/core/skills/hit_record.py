@@ -0,0 +1,60 @@
+# hit_record.py - 命中、行动与治疗记录
+from dataclasses import dataclass
+from typing import Optional, List
+
+
+@dataclass
+class HitRecord:
+    """单次命中记录，同时保存非暴击与暴击两种结果，便于离线分析伤害分布"""
+    attacker_name: str
+    target_name: str
+    skill_type: str
+    element: Optional[str]
+    crit_rate: float
+    non_crit_damage: float
+    crit_damage: float
+    is_crit: bool
+    final_damage: float
+
+    @property
+    def expected_damage(self) -> float:
+        """该次命中的期望伤害"""
+        return self.non_crit_damage * (1 - self.crit_rate) + self.crit_damage * self.crit_rate
+
+
+@dataclass
+class ActionRecord:
+    """单位开始一次行动（"turn" 常规回合、"extra_turn" 额外回合、"ultimate" 插队终结技）"""
+    turn: int
+    actor_name: str
+    kind: str
+
+
+@dataclass
+class HealRecord:
+    """单次治疗，amount 为实际回复量（不超过生命上限）"""
+    target_name: str
+    source: Optional[str]
+    amount: float
+    hp_after: float
+
+
+class HitRecorder:
+    """收集战斗中的命中记录，可作为 Battle 的 "hit" 事件监听器"""
+
+    def __init__(self):
+        self.hits: List[HitRecord] = []
+
+    def __call__(self, hit: HitRecord):
+        self.hits.append(hit)
+
+    def filter(self, attacker_name: Optional[str] = None, target_name: Optional[str] = None) -> List[HitRecord]:
+        """按攻击者/目标筛选命中记录"""
+        return [
+            h for h in self.hits
+            if (attacker_name is None or h.attacker_name == attacker_name)
+            and (target_name is None or h.target_name == target_name)
+        ]
+
+    def clear(self):
+        self.hits.clear()
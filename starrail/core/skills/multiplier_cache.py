@@ -0,0 +1,143 @@
+# multiplier_cache.py - 战斗内伤害乘区缓存
+from typing import Dict, Optional, Tuple
+from ...utils.logger import logger
+from ...utils import metrics
+
+# 前向声明以支持类型提示
+if False:
+    from starrail.core.character import Character
+
+
+def compute_defense_multiplier(attacker: 'Character', defender: 'Character', reduce_def_pct=0, flat_reduce_def=0, skip_ignore_def=False, log: bool = True) -> Tuple[float, float, float]:
+    """
+    计算防御乘区，返回 (防御乘区, 减伤系数, 实际无视防御比例)。
+    """
+    ignore_def_pct = attacker.get_current_stats().get("DEF Ignore %", 0)
+    def_val = defender.get_current_stats().get("DEF", 0)
+    def_val *= (1 - reduce_def_pct)
+    def_val += flat_reduce_def
+
+    if skip_ignore_def:
+        ignore_def_pct = 0
+        if log:
+            logger.log(f"-> [击破伤害] 跳过无视防御效果", color="yellow")
+
+    def_val *= (1 - ignore_def_pct)
+    def_val = max(def_val, 0)
+    level = getattr(attacker, 'level', 80)
+    reduction = def_val / (def_val + level * 10 + 200)
+    return 1 - reduction, reduction, ignore_def_pct
+
+
+def compute_resistance_multiplier(target, element, element_penetration) -> Tuple[float, float]:
+    """计算抗性乘区，返回 (抗性乘区, 目标属性抗性)。"""
+    element_resistance = getattr(target, 'resistances', {}).get(element, 0)
+    return 1 - (element_resistance - element_penetration), element_resistance
+
+
+def compute_target_modifiers(target, log: bool = True) -> Tuple[float, float]:
+    """计算受击方的独立减伤(含韧性减伤)与受到伤害增加乘区，返回 (独立减伤修正, 受到伤害修正)。"""
+    independent_reduction = 1.0
+    for buff in getattr(target, 'buffs', []):
+        buff_reduction = getattr(buff, 'independent_damage_reduction', 0)
+        independent_reduction *= (1 - buff_reduction)
+        if buff_reduction > 0 and log:
+            print(f"    [防御计算] {buff.name} 独立减伤: {buff_reduction*100:.1f}%")
+
+    if hasattr(target, 'toughness') and target.toughness is not None and target.toughness > 0:
+        toughness_reduction = 0.1
+        independent_reduction *= (1 - toughness_reduction)
+        if log:
+            print(f"    [防御计算] 韧性减伤: {toughness_reduction*100:.1f}%")
+
+    damage_taken_bonus = 1.0
+    for buff in getattr(target, 'buffs', []):
+        buff_taken_increase = getattr(buff, 'damage_taken_increase', 0)
+        damage_taken_bonus *= (1 + buff_taken_increase)
+        if buff_taken_increase > 0 and log:
+            print(f"    [防御计算] {buff.name} 受到伤害增加: {buff_taken_increase*100:.1f}%")
+
+    return independent_reduction, damage_taken_bonus
+
+
+class DamageMultiplierCache:
+    """
+    战斗内的伤害乘区缓存。
+
+    以攻守双方的属性快照版本为键，缓存防御乘区、抗性/穿透乘区以及韧性/易伤乘区，
+    同一对单位在属性未发生变化时的重复命中只需一次字典查询。
+    属性快照版本在 Buff 增减、装备变更时递增；动态 Buff 读取的
+    上次技能类型与当前目标也作为键的一部分。
+    """
+
+    def __init__(self):
+        self._defense: Dict[tuple, Tuple[float, float, float]] = {}
+        self._resistance: Dict[tuple, Tuple[float, float]] = {}
+        self._target_modifiers: Dict[tuple, Tuple[float, float]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def snapshot_key(character) -> tuple:
+        """单位属性快照的标识: 对象身份 + 属性版本 + 动态Buff依赖的战斗状态。"""
+        current_target = getattr(character, '_current_target', None)
+        return (
+            id(character),
+            getattr(character, '_stats_version', 0),
+            getattr(character, '_last_skill_type', None),
+            id(current_target) if current_target is not None else None,
+        )
+
+    def defense_multiplier(self, attacker, defender, reduce_def_pct=0, flat_reduce_def=0, skip_ignore_def=False) -> Tuple[Tuple[float, float, float], bool]:
+        """返回 ((防御乘区, 减伤系数, 无视防御比例), 是否命中缓存)。"""
+        key = (self.snapshot_key(attacker), self.snapshot_key(defender), reduce_def_pct, flat_reduce_def, skip_ignore_def)
+        cached = self._defense.get(key)
+        if cached is not None:
+            self.hits += 1
+            metrics.count(metrics.CACHE_HITS, "defense")
+            return cached, True
+        self.misses += 1
+        metrics.count(metrics.CACHE_MISSES, "defense")
+        result = compute_defense_multiplier(attacker, defender, reduce_def_pct, flat_reduce_def, skip_ignore_def)
+        self._defense[key] = result
+        return result, False
+
+    def resistance_multiplier(self, target, element, element_penetration) -> Tuple[float, float]:
+        """返回 (抗性乘区, 目标属性抗性)。"""
+        key = (id(target), getattr(target, '_stats_version', 0), element, element_penetration)
+        cached = self._resistance.get(key)
+        if cached is not None:
+            self.hits += 1
+            metrics.count(metrics.CACHE_HITS, "resistance")
+            return cached
+        self.misses += 1
+        metrics.count(metrics.CACHE_MISSES, "resistance")
+        result = compute_resistance_multiplier(target, element, element_penetration)
+        self._resistance[key] = result
+        return result
+
+    def target_modifiers(self, target) -> Tuple[float, float]:
+        """返回 (独立减伤修正, 受到伤害修正)，韧性是否未被击破也作为键的一部分。"""
+        toughness = getattr(target, 'toughness', None)
+        key = (id(target), getattr(target, '_stats_version', 0), toughness is not None and toughness > 0)
+        cached = self._target_modifiers.get(key)
+        if cached is not None:
+            self.hits += 1
+            metrics.count(metrics.CACHE_HITS, "target")
+            return cached
+        self.misses += 1
+        metrics.count(metrics.CACHE_MISSES, "target")
+        result = compute_target_modifiers(target)
+        self._target_modifiers[key] = result
+        return result
+
+    def clear(self):
+        self._defense.clear()
+        self._resistance.clear()
+        self._target_modifiers.clear()
+
+
+def get_multiplier_cache(character) -> Optional[DamageMultiplierCache]:
+    """获取单位所在战斗的乘区缓存，不在战斗中时返回 None。"""
+    battle_context = getattr(character, '_battle_context', None)
+    return getattr(battle_context, 'multiplier_cache', None)
@@ -3,6 +3,7 @@ from abc import ABC, abstractmethod
 from typing import List, Dict, Any
 from enum import Enum
 from starrail.core.skills.base_skill import BaseSkill
+from starrail.utils import metrics
 
 class EffectTiming(Enum):
     """效果执行时机"""
@@ -187,6 +188,7 @@ def _handle_composite_skill(self, user, targets, intent, skill_type):
     for timing in execution_order:
         effects = effects_by_timing.get(timing, [])
         for effect in effects:
+            metrics.count(metrics.EFFECTS_EXECUTED, type(effect).__name__)
             results = effect.execute(
                 user, targets, context,
                 skill_manager=self,
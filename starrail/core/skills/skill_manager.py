@@ -1,60 +1,77 @@
 # skill_manager.py (已修正)
-import random
 from .skill import get_skill_instance
 from .effects import DamageEffect, HealEffect, BaseEffect
+from .hit_record import HitRecord
+from .multiplier_cache import get_multiplier_cache, compute_defense_multiplier, compute_resistance_multiplier, compute_target_modifiers
 from starrail.core.enemy import Enemy
+from starrail.utils.random_tape import roll_crit
+from starrail.utils import metrics
 if False:
     from starrail.core.character import Character
 
-def damage_calc_attack_side(user: 'Character', target, multiplier, element):
-    atk = user.get_current_stats().get("ATK", 0) # 确保获取最新属性
-    base_damage = atk * multiplier
-    
-    print(f"    [伤害计算] 基础伤害: {base_damage:.1f} (攻击力: {atk:.1f} × 倍率: {multiplier:.2f})")
-
+def damage_bonus_terms(user: 'Character', multiplier, element):
+    """
+    攻击方的伤害公式各项（不掷暴击、不输出日志），damage_calc_attack_side 与 damage_outcomes 共用。
+    技能类型取自 user._last_skill_type；buff_terms 为 [(Buff, 伤害加成, 穿透)]。
+    """
+    current_stats = user.get_current_stats() # 确保获取最新属性
+    atk = current_stats.get("ATK", 0)
     damage_bonus = 0
     element_penetration = 0
-    current_stats = user.get_current_stats()
 
-    if element:
-        element_dmg = current_stats.get(f"{element} DMG", 0)
-        damage_bonus += element_dmg
-        if element_dmg > 0:
-            print(f"    [伤害计算] 元素伤害加成: {element_dmg*100:.1f}%")
-    
+    element_dmg = current_stats.get(f"{element} DMG", 0) if element else 0
+    damage_bonus += element_dmg
+
     skill_type = getattr(user, '_last_skill_type', 'Normal')
+    skill_type_dmg = 0
     if skill_type == "Ultra":
-        ultimate_dmg = current_stats.get("Ultimate DMG%", 0)
-        damage_bonus += ultimate_dmg
-        if ultimate_dmg > 0:
-            print(f"    [伤害计算] 终极技伤害加成: {ultimate_dmg*100:.1f}%")
+        skill_type_dmg = current_stats.get("Ultimate DMG%", 0)
     elif skill_type == "Follow-up":
-        followup_dmg = current_stats.get("Follow-up DMG%", 0)
-        damage_bonus += followup_dmg
-        if followup_dmg > 0:
-            print(f"    [伤害计算] 追击伤害加成: {followup_dmg*100:.1f}%")
-    
+        skill_type_dmg = current_stats.get("Follow-up DMG%", 0)
+    damage_bonus += skill_type_dmg
+
     # 【关键修正】调用 get_damage_bonus 方法，而不是直接访问属性
+    buff_terms = []
     for buff in getattr(user, 'buffs', []):
         # 通过调用方法来获取动态或静态的伤害加成
         buff_dmg_bonus = buff.get_damage_bonus(user)
         buff_penetration = getattr(buff, 'element_penetration', 0)
-        
         damage_bonus += buff_dmg_bonus
         element_penetration += buff_penetration
+        buff_terms.append((buff, buff_dmg_bonus, buff_penetration))
+
+    return {
+        "atk": atk, "base_damage": atk * multiplier, "skill_type": skill_type,
+        "element_dmg": element_dmg, "skill_type_dmg": skill_type_dmg, "buff_terms": buff_terms,
+        "damage_bonus": damage_bonus, "element_penetration": element_penetration,
+        "crit_rate": current_stats.get("CRIT Rate", 0.05), "crit_dmg": current_stats.get("CRIT DMG", 0.5),
+    }
 
+def damage_calc_attack_side(user: 'Character', target, multiplier, element):
+    terms = damage_bonus_terms(user, multiplier, element)
+    base_damage = terms["base_damage"]
+    print(f"    [伤害计算] 基础伤害: {base_damage:.1f} (攻击力: {terms['atk']:.1f} × 倍率: {multiplier:.2f})")
+
+    if terms["element_dmg"] > 0:
+        print(f"    [伤害计算] 元素伤害加成: {terms['element_dmg']*100:.1f}%")
+    if terms["skill_type_dmg"] > 0:
+        label = "终极技伤害加成" if terms["skill_type"] == "Ultra" else "追击伤害加成"
+        print(f"    [伤害计算] {label}: {terms['skill_type_dmg']*100:.1f}%")
+    for buff, buff_dmg_bonus, buff_penetration in terms["buff_terms"]:
         # 对于静态Buff，仍然打印其固定值
         if not buff.dynamic_damage_bonus_func and buff_dmg_bonus > 0:
             print(f"    [伤害计算] {buff.name} 伤害加成: {buff_dmg_bonus*100:.1f}%")
         if buff_penetration > 0:
             print(f"    [伤害计算] {buff.name} 穿透加成: {buff_penetration*100:.1f}%")
 
+    damage_bonus = terms["damage_bonus"]
+    element_penetration = terms["element_penetration"]
     damage_modifier = 1 + damage_bonus
     print(f"    [伤害计算] 总伤害修正: {damage_modifier:.3f} (1 + {damage_bonus*100:.1f}%)")
 
-    crit_rate = current_stats.get("CRIT Rate", 0.05)
-    crit_dmg = current_stats.get("CRIT DMG", 0.5)
-    is_crit = random.random() < crit_rate
+    crit_rate = terms["crit_rate"]
+    crit_dmg = terms["crit_dmg"]
+    is_crit = roll_crit(user, crit_rate)
     crit_modifier = 1 + crit_dmg if is_crit else 1
     
     print(f"    [伤害计算] 暴击率: {crit_rate*100:.1f}%, 暴击伤害: {crit_dmg*100:.1f}%")
@@ -66,14 +83,18 @@ def damage_calc_attack_side(user: 'Character', target, multiplier, element):
     return {
         "theory_damage": theory_damage, "element": element,
         "element_penetration": element_penetration, "is_crit": is_crit,
+        "crit_rate": crit_rate, "crit_dmg": crit_dmg,
     }
 
 # ... (文件其余部分保持不变) ...
 def damage_calc_defense_side(theory_damage, user, target, element, element_penetration, is_break_damage=False):
     print(f"    [防御计算] 理论伤害: {theory_damage:.1f}")
     
-    element_resistance = getattr(target, 'resistances', {}).get(element, 0)
-    resistance_modifier = 1 - (element_resistance - element_penetration)
+    cache = get_multiplier_cache(user)
+    if cache is not None:
+        resistance_modifier, element_resistance = cache.resistance_multiplier(target, element, element_penetration)
+    else:
+        resistance_modifier, element_resistance = compute_resistance_multiplier(target, element, element_penetration)
     print(f"    [防御计算] 属性抗性: {element_resistance*100:.1f}%, 穿透: {element_penetration*100:.1f}%")
     print(f"    [防御计算] 抗性修正: {resistance_modifier:.3f} (1 - {element_resistance*100:.1f}% + {element_penetration*100:.1f}%)")
 
@@ -93,27 +114,12 @@ def damage_calc_defense_side(theory_damage, user, target, element, element_penet
             after_def = theory_damage
             print(f"    [防御计算] 无防御修正: {after_def:.1f}")
 
-    independent_reduction = 1.0
-    for buff in getattr(target, 'buffs', []):
-        buff_reduction = getattr(buff, 'independent_damage_reduction', 0)
-        independent_reduction *= (1 - buff_reduction)
-        if buff_reduction > 0:
-            print(f"    [防御计算] {buff.name} 独立减伤: {buff_reduction*100:.1f}%")
-    
-    if hasattr(target, 'toughness') and target.toughness is not None and target.toughness > 0:
-        toughness_reduction = 0.1
-        independent_reduction *= (1 - toughness_reduction)
-        print(f"    [防御计算] 韧性减伤: {toughness_reduction*100:.1f}%")
+    if cache is not None:
+        independent_reduction, damage_taken_bonus = cache.target_modifiers(target)
+    else:
+        independent_reduction, damage_taken_bonus = compute_target_modifiers(target)
     
     print(f"    [防御计算] 独立减伤修正: {independent_reduction:.3f}")
-
-    damage_taken_bonus = 1.0
-    for buff in getattr(target, 'buffs', []):
-        buff_taken_increase = getattr(buff, 'damage_taken_increase', 0)
-        damage_taken_bonus *= (1 + buff_taken_increase)
-        if buff_taken_increase > 0:
-            print(f"    [防御计算] {buff.name} 受到伤害增加: {buff_taken_increase*100:.1f}%")
-    
     print(f"    [防御计算] 受到伤害修正: {damage_taken_bonus:.3f}")
 
     final_damage = after_def * resistance_modifier * independent_reduction * damage_taken_bonus
@@ -132,6 +138,17 @@ def full_damage_calc(user, target, multiplier, element, skill_type):
     )
     print(f"  -> [伤害结算] {user.name} 对 {target.name} 造成 {final_damage:.1f} 点伤害 ({'暴击' if attack_result['is_crit'] else '非暴击'})")
     
+    battle_context = getattr(user, '_battle_context', None)
+    if battle_context is not None and battle_context.has_listeners("hit"):
+        crit_factor = 1 + attack_result["crit_dmg"]
+        non_crit_damage = final_damage / crit_factor if attack_result["is_crit"] else final_damage
+        battle_context.emit("hit", HitRecord(
+            attacker_name=user.name, target_name=target.name, skill_type=skill_type, element=element,
+            crit_rate=min(max(attack_result["crit_rate"], 0.0), 1.0),
+            non_crit_damage=non_crit_damage, crit_damage=non_crit_damage * crit_factor,
+            is_crit=attack_result["is_crit"], final_damage=final_damage,
+        ))
+    
     target_was_alive = target.is_alive()
     if hasattr(target, "receive_damage"):
         target.receive_damage(final_damage, attacker=user, skill_type=skill_type)
@@ -151,6 +168,31 @@ def full_damage_calc(user, target, multiplier, element, skill_type):
 
     return final_damage
 
+def damage_outcomes(user, target, multiplier, element, skill_type):
+    """
+    与 full_damage_calc 相同的伤害公式（攻击方各项同样来自 damage_bonus_terms），但不掷暴击、不结算伤害、不输出日志。
+    返回 (非暴击伤害, 暴击伤害, 暴击率)，用于击杀概率等解析计算。
+    """
+    previous_skill_type = getattr(user, '_last_skill_type', 'Normal')
+    user._last_skill_type = skill_type
+    try:
+        terms = damage_bonus_terms(user, multiplier, element)
+        element_penetration = terms["element_penetration"]
+        crit_rate, crit_dmg = terms["crit_rate"], terms["crit_dmg"]
+
+        theory_damage = terms["base_damage"] * (1 + terms["damage_bonus"])
+        if hasattr(target, 'defense_reduction'):
+            defense_multiplier, _, _ = compute_defense_multiplier(user, target, log=False)
+        else:
+            defense_multiplier = 1.0
+        resistance_modifier, _ = compute_resistance_multiplier(target, element, element_penetration)
+        independent_reduction, damage_taken_bonus = compute_target_modifiers(target, log=False)
+        non_crit_damage = theory_damage * defense_multiplier * resistance_modifier * independent_reduction * damage_taken_bonus
+    finally:
+        user._last_skill_type = previous_skill_type
+
+    return non_crit_damage, non_crit_damage * (1 + crit_dmg), min(max(crit_rate, 0.0), 1.0)
+
 def calculate_final_heal(user, base_heal_amount, skill_type):
     healing_bonus = user.get_current_stats().get("Outgoing Healing Boost", 0)
     light_cone_healing_bonus = 0
@@ -190,6 +232,7 @@ class SkillManager:
         effects = skill.use(user, targets, context, level)
         
         for effect in effects:
+            metrics.count(metrics.EFFECTS_EXECUTED, type(effect).__name__)
             if isinstance(effect, DamageEffect):
                 effect.execute(damage_calc_func=full_damage_calc)
             elif isinstance(effect, HealEffect):
@@ -213,11 +256,21 @@ class SkillManager:
                         base_heal = data["heal_ratio"] * caster_max_hp + data["heal_base"]
                         
                         heal_effect = HealEffect(caster, [character], context, base_heal)
+                        metrics.count(metrics.EFFECTS_EXECUTED, type(heal_effect).__name__)
                         # 为持续治疗传递特殊技能类型，避免享受终结技加成
                         heal_effect.execute(calculate_final_heal_func=lambda user, base_heal, skill_type: calculate_final_heal(user, base_heal, "HealOverTime"))
 
 def break_damage_calc(attacker, target, break_damage, element):
     print(f"  -> [击破伤害结算] 基础击破伤害: {break_damage:.1f}")
-    return damage_calc_defense_side(
+    final_damage = damage_calc_defense_side(
         break_damage, attacker, target, element, element_penetration=0, is_break_damage=True
-    )
\ No newline at end of file
+    )
+    battle_context = getattr(attacker, '_battle_context', None)
+    if battle_context is not None and battle_context.has_listeners("hit"):
+        # 击破伤害不会暴击，记录为确定性命中
+        battle_context.emit("hit", HitRecord(
+            attacker_name=attacker.name, target_name=target.name, skill_type="Break", element=element,
+            crit_rate=0.0, non_crit_damage=final_damage, crit_damage=final_damage,
+            is_crit=False, final_damage=final_damage,
+        ))
+    return final_damage
\ No newline at end of file
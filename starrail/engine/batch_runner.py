@@ -0,0 +1,336 @@
+# batch_runner.py - 批量战斗模拟与方差缩减采样
+"""
+批量运行同一配置的战斗，并对暴击随机流提供方差缩减采样模式：
+
+    mc          普通蒙特卡洛，每场战斗独立取随机数
+    antithetic  对偶采样，成对的两场战斗使用相同随机数，暴击流分别取 u 与 1 - u
+    stratified  拉丁超立方采样，同一批次内第 j 次暴击判定在各场战斗间分层
+    qmc         随机化 Halton 序列（Cranley-Patterson 随机平移）
+
+默认只对暴击流应用上述采样，也可通过 streams 扩展到目标选择与 AI 随机流；
+未应用的随机流在每场战斗间相互独立。方差缩减效果通过独立重复组估计：
+对偶模式以每对战斗为一组，分层/QMC 模式将批次划分为若干独立随机化的重复组，
+比较组均值的方差与同样场数普通蒙特卡洛的方差，得到有效场数。
+当暴击率接近 0 或 1 时暴击流几乎不影响结果，方差缩减倍数会接近 1。
+"""
+import contextlib
+import os
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Union
+import numpy as np
+
+from ..core.skills.hit_record import HitRecorder
+from ..utils.random_tape import BattleRandom, RandomTape, STREAMS
+from ..utils.streaming_stats import DamageStatsAggregator
+from ..utils.log_sink import log_to_file
+from ..utils.logger import log_output
+from ..utils.metrics import MetricsRegistry
+
+# 前向声明以支持类型提示
+if False:
+    from ..core.battle import Battle
+
+SAMPLING_MODES = ("mc", "antithetic", "stratified", "qmc")
+# 分层/QMC 样本矩阵按列分块生成，每块对应每场战斗的若干次暴击判定
+SHARED_BLOCK_SIZE = 32
+DEFAULT_QMC_DIMENSIONS = 16
+
+
+@dataclass
+class BattleOutcome:
+    """单场战斗的结果摘要"""
+    index: int
+    winner: Optional[str]
+    turns: int
+    side_damage: Dict[str, float] = field(default_factory=dict)
+    damage_by_attacker: Dict[str, float] = field(default_factory=dict)
+    hits: int = 0
+    crits: int = 0
+
+
+METRICS: Dict[str, Callable[[BattleOutcome], float]] = {
+    "damage": lambda o: o.side_damage.get("player", 0.0),
+    "win": lambda o: 1.0 if o.winner == "player" else 0.0,
+    "turns": lambda o: float(o.turns),
+    "crits": lambda o: float(o.crits),
+}
+
+
+class AntitheticTape(RandomTape):
+    """对偶随机流：与同种子的普通随机流一一对应，发放 1 - u"""
+
+    def _next_block(self) -> List[float]:
+        return (1.0 - self._generator.random(self.block_size)).tolist()
+
+
+class SharedSampleSource(ABC):
+    """
+    批次内共享的样本矩阵：第 i 行供第 i 场战斗使用，按列块惰性生成。
+    并发运行时多个线程共用同一矩阵，列块的生成加锁，保证第 k 块的内容与生成顺序无关。
+    """
+
+    def __init__(self, n_battles: int, seed: int, block_size: int = SHARED_BLOCK_SIZE):
+        self.n_battles = n_battles
+        self.block_size = block_size
+        self._rng = np.random.default_rng(seed)
+        self._blocks: List[np.ndarray] = []
+        self._lock = threading.Lock()
+
+    def block(self, k: int) -> np.ndarray:
+        if k < len(self._blocks):
+            return self._blocks[k]
+        with self._lock:
+            while len(self._blocks) <= k:
+                self._blocks.append(self._generate(len(self._blocks)))
+        return self._blocks[k]
+
+    @abstractmethod
+    def _generate(self, k: int) -> np.ndarray:
+        """生成第 k 个列块，形状为 (n_battles, block_size)"""
+        pass
+
+
+class LatinHypercubeSource(SharedSampleSource):
+    """拉丁超立方：每一列（同一次暴击判定）在 n 场战斗间各占 [i/n, (i+1)/n) 中的一格"""
+
+    def _generate(self, k: int) -> np.ndarray:
+        shape = (self.n_battles, self.block_size)
+        strata = np.argsort(self._rng.random(shape), axis=0)
+        return (strata + self._rng.random(shape)) / self.n_battles
+
+
+class HaltonSource(SharedSampleSource):
+    """随机化 Halton 序列：前 dimensions 维使用 Halton 点并整体随机平移，其余维退化为普通随机数"""
+
+    def __init__(self, n_battles: int, seed: int, block_size: int = SHARED_BLOCK_SIZE, dimensions: int = DEFAULT_QMC_DIMENSIONS):
+        super().__init__(n_battles, seed, block_size)
+        self.dimensions = dimensions
+        self._primes = _first_primes(dimensions)
+
+    def _generate(self, k: int) -> np.ndarray:
+        samples = self._rng.random((self.n_battles, self.block_size))
+        indices = np.arange(1, self.n_battles + 1)
+        for j in range(self.block_size):
+            dim = k * self.block_size + j
+            if dim >= self.dimensions:
+                break
+            shift = self._rng.random()
+            samples[:, j] = (_radical_inverse(indices, self._primes[dim]) + shift) % 1.0
+        return samples
+
+
+class SharedSampleTape(RandomTape):
+    """从共享样本矩阵中读取固定一行的随机流"""
+
+    def __init__(self, source: SharedSampleSource, row: int, name: str = ""):
+        super().__init__(None, source.block_size, name=name)
+        self._source = source
+        self._row = row
+
+    def _next_block(self) -> List[float]:
+        return self._source.block(len(self._blocks))[self._row].tolist()
+
+
+@dataclass
+class BatchResult:
+    """一批战斗的结果，groups[i] 为第 i 场战斗所属的独立重复组，damage_stats 为全部命中的流式伤害统计"""
+    mode: str
+    outcomes: List[BattleOutcome]
+    groups: List[int]
+    damage_stats: DamageStatsAggregator = field(default_factory=DamageStatsAggregator)
+    metrics: MetricsRegistry = field(default_factory=MetricsRegistry)
+
+    def values(self, metric: Union[str, Callable[[BattleOutcome], float]] = "damage") -> np.ndarray:
+        metric_fn = METRICS[metric] if isinstance(metric, str) else metric
+        return np.array([metric_fn(o) for o in self.outcomes], dtype=float)
+
+    def estimate(self, metric: Union[str, Callable[[BattleOutcome], float]] = "damage") -> Dict[str, float]:
+        """
+        返回估计值与方差缩减效果:
+        mean / std_error: 本模式下的估计值及标准误（由重复组间方差得到）
+        mc_std_error: 同样场数的普通蒙特卡洛的标准误
+        variance_reduction: 方差缩减倍数，effective_battles: 等效的普通蒙特卡洛场数
+        """
+        values = self.values(metric)
+        n = len(values)
+        groups = np.asarray(self.groups)
+        group_ids = np.unique(groups)
+        group_means = np.array([values[groups == g].mean() for g in group_ids])
+
+        mc_var = values.var(ddof=1) / n if n > 1 else float('nan')
+        mode_var = group_means.var(ddof=1) / len(group_ids) if len(group_ids) > 1 else float('nan')
+        if mode_var > 0:
+            reduction = mc_var / mode_var
+        else:
+            reduction = float('inf') if mc_var > 0 else 1.0
+        return {
+            "battles": n,
+            "groups": len(group_ids),
+            "mean": float(values.mean()) if n else float('nan'),
+            "std_error": float(np.sqrt(mode_var)),
+            "mc_std_error": float(np.sqrt(mc_var)),
+            "variance_reduction": float(reduction),
+            "effective_battles": float(n * reduction),
+        }
+
+
+def _first_primes(count: int) -> List[int]:
+    primes: List[int] = []
+    candidate = 2
+    while len(primes) < count:
+        if all(candidate % p for p in primes if p * p <= candidate):
+            primes.append(candidate)
+        candidate += 1
+    return primes
+
+
+def _radical_inverse(indices: np.ndarray, base: int) -> np.ndarray:
+    """van der Corput 根反演，向量化计算"""
+    n = indices.copy()
+    result = np.zeros(len(n), dtype=float)
+    scale = 1.0 / base
+    while np.any(n > 0):
+        result += (n % base) * scale
+        n //= base
+        scale /= base
+    return result
+
+
+def battle_seeds(seed: int, count: int) -> List[int]:
+    """由批次种子派生每场战斗的独立种子"""
+    return [int(child.generate_state(1)[0]) for child in np.random.SeedSequence(seed).spawn(count)]
+
+
+def _stream_generator(seed: int, name: str) -> np.random.Generator:
+    """与 BattleRandom 相同的派生方式，得到指定种子下某条随机流的生成器"""
+    children = np.random.SeedSequence(seed).spawn(len(STREAMS))
+    return np.random.default_rng(children[STREAMS.index(name)])
+
+
+def plan_random_sources(mode: str, n_battles: int, seed: int = 0, replicates: int = 10,
+                        streams: Sequence[str] = ("crit",), qmc_dimensions: int = DEFAULT_QMC_DIMENSIONS):
+    """
+    按采样模式为每场战斗生成 (BattleRandom, 重复组编号)。
+    streams: 应用方差缩减采样的随机流。
+    对偶模式的场数向上取偶数，分层/QMC 模式的场数取 replicates 的整数倍。
+    """
+    if mode not in SAMPLING_MODES:
+        raise ValueError(f"未知的采样模式: {mode}，可选: {', '.join(SAMPLING_MODES)}")
+    unknown = set(streams) - set(STREAMS)
+    if unknown:
+        raise ValueError(f"未知的随机流: {', '.join(sorted(unknown))}，可选: {', '.join(STREAMS)}")
+
+    if mode == "mc":
+        return [(BattleRandom(s), i) for i, s in enumerate(battle_seeds(seed, n_battles))]
+
+    if mode == "antithetic":
+        pairs = (n_battles + 1) // 2
+        plan = []
+        for p, (s, partner_seed) in enumerate(zip(battle_seeds(seed, pairs), battle_seeds(seed + 1, pairs))):
+            partner = BattleRandom(partner_seed)
+            for name in streams:
+                partner.tapes[name] = AntitheticTape(_stream_generator(s, name), partner.block_size, name=name)
+            plan.append((BattleRandom(s), p))
+            plan.append((partner, p))
+        return plan
+
+    replicates = max(2, min(replicates, n_battles))
+    per_group = max(1, n_battles // replicates)
+    plan = []
+    for g, group_seed in enumerate(battle_seeds(seed, replicates)):
+        source_seeds = battle_seeds(group_seed + 1, len(streams))
+        if mode == "stratified":
+            sources = {name: LatinHypercubeSource(per_group, ss) for name, ss in zip(streams, source_seeds)}
+        else:
+            sources = {name: HaltonSource(per_group, ss, dimensions=qmc_dimensions) for name, ss in zip(streams, source_seeds)}
+        for row, s in enumerate(battle_seeds(group_seed, per_group)):
+            rng = BattleRandom(s)
+            for name, source in sources.items():
+                rng.tapes[name] = SharedSampleTape(source, row, name=name)
+            plan.append((rng, g))
+    return plan
+
+
+@contextlib.contextmanager
+def quiet_output(quiet: bool = True):
+    """屏蔽当前上下文（线程/协程）中的战斗日志输出"""
+    if not quiet:
+        yield
+        return
+    with open(os.devnull, 'w', encoding='utf-8') as devnull, log_output(devnull):
+        yield
+
+
+def battle_log(log_dir: Optional[str], index: int, compress: bool = False, quiet: bool = True):
+    """log_dir 不为空时，把第 index 场战斗的日志写入该目录下的独立文件，否则按 quiet 屏蔽输出"""
+    if not log_dir:
+        return quiet_output(quiet)
+    filename = f"battle_{index:05d}.log" + (".gz" if compress else "")
+    return log_to_file(os.path.join(log_dir, filename))
+
+
+def run_battle_with(battle_factory: Callable[[], 'Battle'], rng: BattleRandom, index: int = 0, max_turns: int = 10,
+                    damage_stats: Optional[DamageStatsAggregator] = None,
+                    metrics: Optional[MetricsRegistry] = None) -> BattleOutcome:
+    """
+    使用指定的随机数源运行一场战斗并汇总结果。
+    damage_stats / metrics 不为 None 时同时累计伤害统计与引擎计数器。
+    """
+    battle = battle_factory()
+    battle.rng = rng
+    recorder = HitRecorder()
+    battle.add_listener("hit", recorder)
+    if damage_stats is not None:
+        battle.add_listener("hit", damage_stats)
+    battle.run(max_turns=max_turns)
+    if metrics is not None:
+        metrics.merge(battle.metrics)
+
+    sides = {c.name: c.side for c in battle.characters}
+    outcome = BattleOutcome(index=index, winner=battle.winner, turns=battle.turn, hits=len(recorder.hits))
+    for hit in recorder.hits:
+        outcome.damage_by_attacker[hit.attacker_name] = outcome.damage_by_attacker.get(hit.attacker_name, 0.0) + hit.final_damage
+        side = sides.get(hit.attacker_name)
+        outcome.side_damage[side] = outcome.side_damage.get(side, 0.0) + hit.final_damage
+        outcome.crits += hit.is_crit
+    return outcome
+
+
+def run_batch(battle_factory: Callable[[], 'Battle'], n_battles: int, mode: str = "mc", seed: int = 0,
+              replicates: int = 10, streams: Sequence[str] = ("crit",), max_turns: int = 10, quiet: bool = True,
+              qmc_dimensions: int = DEFAULT_QMC_DIMENSIONS, log_dir: Optional[str] = None,
+              compress_logs: bool = False, workers: int = 1) -> BatchResult:
+    """
+    批量运行战斗。
+    battle_factory: 每次调用返回一场全新的战斗（如 lambda: setup_battle_from_config(path, game_data)）
+    quiet: 为 True 时屏蔽战斗日志输出
+    log_dir: 指定时每场战斗的完整日志异步写入该目录（compress_logs 为 True 时 gzip 压缩）
+    workers: 大于 1 时在线程池中并发运行，每场战斗的日志状态与输出相互独立
+    """
+    plan = plan_random_sources(mode, n_battles, seed, replicates, streams, qmc_dimensions)
+
+    def run_one(index: int, rng: BattleRandom):
+        stats = DamageStatsAggregator()
+        registry = MetricsRegistry()
+        with battle_log(log_dir, index, compress_logs, quiet):
+            outcome = run_battle_with(battle_factory, rng, index, max_turns, stats, registry)
+        return outcome, stats, registry
+
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(run_one, range(len(plan)), [rng for rng, _ in plan]))
+    else:
+        results = [run_one(index, rng) for index, (rng, _) in enumerate(plan)]
+
+    outcomes: List[BattleOutcome] = []
+    damage_stats = DamageStatsAggregator()
+    batch_metrics = MetricsRegistry()
+    for outcome, stats, registry in results:
+        outcomes.append(outcome)
+        damage_stats.merge(stats)
+        batch_metrics.merge(registry)
+    return BatchResult(mode=mode, outcomes=outcomes, groups=[g for _, g in plan],
+                       damage_stats=damage_stats, metrics=batch_metrics)
@@ -0,0 +1,479 @@
+# benchmark.py - 引擎基础操作的微基准测试
+"""
+对计划优化的引擎基础操作做微基准测试：属性计算（calc_total_stats、Buff.finalize_stats、
+带 0/5/20 个 Buff 的 Character.get_current_stats）、伤害计算（full_damage_calc）、
+技能释放（SkillManager.use_skill）、添加 Buff（Character.add_buff）
+以及从大型 fribbels 存档加载遗器（load_relics）。
+
+每个基准先自动确定单轮调用次数（单轮耗时不少于 min_time），再重复若干轮，
+以每次调用的最快/中位/平均耗时报告。结果可输出为键顺序固定的 JSON，便于逐项比较。
+
+场景基准测量整体指标：每秒战斗场数、启动耗时（加载数据并创建战斗）与峰值内存。
+启动耗时同时测量按战斗配置加载（load_game_data_for_config，main_simulator 的默认路径）
+与加载全部数据（load_all_game_data，--load-all 与批量脚本使用）。
+compare_reports 将结果与提交在仓库中的基线比较：变差同时超过相对容差与噪声下限（基线记录的
+标准差的 noise_sigmas 倍）才视为退化，避免在没有改动的代码上因机器抖动而失败。
+个别抖动大的指标可在基线的 "tolerances" 中单独放宽容差，重新录制基线时保留。
+改动上述路径性能的提交应同时用 --update-baseline 重新录制基线，否则优化带来的余量会掩盖之后的退化。
+"""
+import copy
+import gc
+import json
+import os
+import platform
+import statistics
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from ..core.skills.buff import Buff
+from ..core.enemy import Enemy
+from ..utils.random_tape import BattleRandom
+from .batch_runner import quiet_output, run_batch
+
+# 前向声明以支持类型提示
+if False:
+    from ..core.battle import Battle
+    from ..core.character import Character
+
+SCHEMA_VERSION = 1
+DEFAULT_REPEATS = 5
+DEFAULT_MIN_TIME = 0.2
+DEFAULT_RELIC_COUNT = 2000
+DEFAULT_SCENARIO_BATTLES = 20
+DEFAULT_SCENARIO_REPEATS = 5
+DEFAULT_TOLERANCE = 0.2
+DEFAULT_NOISE_SIGMAS = 3.0
+# 创建战斗只需几毫秒，每轮连续创建多场取平均
+_SETUP_CALLS = 20
+# 伤害类基准中为目标重置的生命值与韧性，保证重复调用不会击杀目标或触发击破
+_TARGET_HP = 1e12
+_TARGET_TOUGHNESS = 1e12
+
+
+@dataclass
+class BenchmarkResult:
+    """单项基准的结果，耗时均为每次调用的秒数"""
+    name: str
+    iterations: int
+    repeats: int
+    best: float
+    median: float
+    mean: float
+    stdev: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "iterations": self.iterations,
+            "repeats": self.repeats,
+            "best_us": round(self.best * 1e6, 3),
+            "median_us": round(self.median * 1e6, 3),
+            "mean_us": round(self.mean * 1e6, 3),
+            "stdev_us": round(self.stdev * 1e6, 3),
+        }
+
+
+def measure(name: str, func: Callable[[], Any], repeats: int = DEFAULT_REPEATS,
+            min_time: float = DEFAULT_MIN_TIME) -> BenchmarkResult:
+    """按 1, 2, 5, 10, 20, 50... 递增单轮调用次数直到单轮耗时达到 min_time，再重复 repeats 轮"""
+    scale = 1
+    number = 1
+    while True:
+        for factor in (1, 2, 5):
+            number = scale * factor
+            if _time_calls(func, number) >= min_time:
+                break
+        else:
+            scale *= 10
+            continue
+        break
+    timings = [_time_calls(func, number) / number for _ in range(repeats)]
+    return BenchmarkResult(
+        name=name, iterations=number, repeats=repeats,
+        best=min(timings), median=statistics.median(timings), mean=statistics.fmean(timings),
+        stdev=statistics.stdev(timings) if repeats > 1 else 0.0,
+    )
+
+
+def _time_calls(func: Callable[[], Any], number: int) -> float:
+    start = time.perf_counter()
+    for _ in range(number):
+        func()
+    return time.perf_counter() - start
+
+
+class BenchmarkFixture:
+    """
+    基准测试共用的战斗环境。
+    battle_factory: 返回一场全新战斗的函数（如 lambda: setup_battle_from_config(path, game_data)）
+    data_path: 游戏数据目录，用于构造大型遗器存档
+    config_path: 战斗配置文件，用于测量按配置加载数据的启动耗时，为 None 时跳过该指标
+    """
+
+    def __init__(self, battle_factory: Callable[[], 'Battle'], data_path: str, relic_count: int = DEFAULT_RELIC_COUNT,
+                 config_path: Optional[str] = None):
+        self.battle_factory = battle_factory
+        self.data_path = data_path
+        self.config_path = config_path
+        self.relic_count = relic_count
+        self._relic_save: Optional[str] = None
+
+    def battle(self) -> 'Battle':
+        battle = self.battle_factory()
+        battle.rng = BattleRandom(0)
+        for char in battle.characters:
+            char._battle_context = battle
+        return battle
+
+    def attacker_and_target(self, battle: 'Battle'):
+        """我方第一个角色与第一个敌人"""
+        attacker = next(c for c in battle.characters if not isinstance(c, Enemy))
+        target = next(c for c in battle.characters if isinstance(c, Enemy))
+        return attacker, target
+
+    @staticmethod
+    def reset_target(target: 'Character'):
+        target.hp = _TARGET_HP
+        if getattr(target, 'toughness', None) is not None:
+            target.toughness = _TARGET_TOUGHNESS
+
+    @staticmethod
+    def with_buffs(character: 'Character', count: int) -> 'Character':
+        """把角色的 Buff 替换为 count 个互不相同的静态 Buff"""
+        character.buffs = [Buff(f"基准Buff{i}", 3, stat_bonus={"ATK%": 0.01, "CRIT DMG": 0.01}) for i in range(count)]
+        character.bump_stats_version()
+        return character
+
+    def relic_save(self) -> str:
+        """把数据目录中的 fribbels 存档复制扩充到 relic_count 件遗器，写入临时文件"""
+        if self._relic_save is None:
+            with open(os.path.join(self.data_path, 'fribbels-optimizer-save.json'), 'r', encoding='utf-8') as f:
+                save = json.load(f)
+            source = save["relics"]
+            relics = []
+            for i in range(self.relic_count):
+                relic = copy.deepcopy(source[i % len(source)])
+                relic["id"] = f"{relic['id']}-{i}"
+                relics.append(relic)
+            save["relics"] = relics
+            handle, self._relic_save = tempfile.mkstemp(prefix="relic_save_", suffix=".json")
+            with os.fdopen(handle, 'w', encoding='utf-8') as f:
+                json.dump(save, f)
+        return self._relic_save
+
+    def close(self):
+        if self._relic_save is not None:
+            os.remove(self._relic_save)
+            self._relic_save = None
+
+
+def _bench_calc_total_stats(fixture: BenchmarkFixture) -> Callable[[], Any]:
+    from ..core.equipment_manager import calc_total_stats
+    attacker, _ = fixture.attacker_and_target(fixture.battle())
+    return lambda: calc_total_stats(attacker)
+
+
+def _bench_finalize_stats(fixture: BenchmarkFixture) -> Callable[[], Any]:
+    from ..core.equipment_manager import calc_total_stats
+    attacker, _ = fixture.attacker_and_target(fixture.battle())
+    fixture.with_buffs(attacker, 5)
+    base_stats, percent_stats, flat_bonus, _, _ = calc_total_stats(attacker)
+    return lambda: Buff.finalize_stats(base_stats, percent_stats, flat_bonus, buffs=attacker.buffs, character=attacker)
+
+
+def _bench_get_current_stats(buff_count: int) -> Callable[[BenchmarkFixture], Callable[[], Any]]:
+    def build(fixture: BenchmarkFixture) -> Callable[[], Any]:
+        attacker, _ = fixture.attacker_and_target(fixture.battle())
+        fixture.with_buffs(attacker, buff_count)
+        return attacker.get_current_stats
+    return build
+
+
+def _bench_full_damage_calc(fixture: BenchmarkFixture) -> Callable[[], Any]:
+    from ..core.skills.skill_manager import full_damage_calc
+    attacker, target = fixture.attacker_and_target(fixture.battle())
+    element = getattr(attacker, 'element', None)
+
+    def run():
+        fixture.reset_target(target)
+        return full_damage_calc(attacker, target, 1.0, element, "Normal")
+    return run
+
+
+def _bench_use_skill(fixture: BenchmarkFixture) -> Callable[[], Any]:
+    battle = fixture.battle()
+    attacker, target = fixture.attacker_and_target(battle)
+    skill = next(s for s in attacker.skills if getattr(s, 'type', None) == 'Normal')
+
+    def run():
+        fixture.reset_target(target)
+        attacker.skill_manager.use_skill(skill.skill_id, attacker, [target], battle)
+    return run
+
+
+def _bench_add_buff(fixture: BenchmarkFixture) -> Callable[[], Any]:
+    attacker, _ = fixture.attacker_and_target(fixture.battle())
+    fixture.with_buffs(attacker, 5)
+
+    def run():
+        attacker.add_buff(Buff("基准新增Buff", 2, stat_bonus={"ATK%": 0.01}))
+        attacker.remove_buff(attacker.buffs[-1])
+    return run
+
+
+def _bench_load_relics(fixture: BenchmarkFixture) -> Callable[[], Any]:
+    from ..utils.data_loader import load_relics
+    path = fixture.relic_save()
+    return lambda: load_relics(path)
+
+
+MICRO_BENCHMARKS: Dict[str, Callable[[BenchmarkFixture], Callable[[], Any]]] = {
+    "calc_total_stats": _bench_calc_total_stats,
+    "Buff.finalize_stats[5 buffs]": _bench_finalize_stats,
+    "Character.get_current_stats[0 buffs]": _bench_get_current_stats(0),
+    "Character.get_current_stats[5 buffs]": _bench_get_current_stats(5),
+    "Character.get_current_stats[20 buffs]": _bench_get_current_stats(20),
+    "full_damage_calc": _bench_full_damage_calc,
+    "SkillManager.use_skill": _bench_use_skill,
+    "Character.add_buff": _bench_add_buff,
+    "load_relics[large save]": _bench_load_relics,
+}
+
+
+def run_micro_benchmarks(fixture: BenchmarkFixture, names: Optional[List[str]] = None,
+                         repeats: int = DEFAULT_REPEATS, min_time: float = DEFAULT_MIN_TIME,
+                         progress: Optional[Callable[[BenchmarkResult], None]] = None) -> List[BenchmarkResult]:
+    """运行指定（默认全部）微基准，战斗日志输出被屏蔽"""
+    results = []
+    for name in names or list(MICRO_BENCHMARKS):
+        gc.collect()
+        with quiet_output():
+            func = MICRO_BENCHMARKS[name](fixture)
+            result = measure(name, func, repeats, min_time)
+        results.append(result)
+        if progress:
+            progress(result)
+    return results
+
+
+@dataclass
+class ScenarioResult:
+    """场景基准的单个指标，stdev 为各轮数值的标准差（单位与 value 相同）"""
+    name: str
+    value: float
+    unit: str
+    higher_is_better: bool = False
+    stdev: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"value": round(self.value, 4), "unit": self.unit, "higher_is_better": self.higher_is_better,
+                "stdev": round(self.stdev, 4)}
+
+
+def _stdev(values: List[float]) -> float:
+    return statistics.stdev(values) if len(values) > 1 else 0.0
+
+
+def _scenario_startup(fixture: BenchmarkFixture, repeats: int, battles: int) -> List[ScenarioResult]:
+    from ..utils.data_loader import load_all_game_data, load_game_data_for_config
+    load_times, config_load_times, setup_times = [], [], []
+    for _ in range(repeats):
+        if fixture.config_path:
+            start = time.perf_counter()
+            with open(fixture.config_path, 'r', encoding='utf-8') as f:
+                load_game_data_for_config(fixture.data_path, json.load(f))
+            config_load_times.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        load_all_game_data(fixture.data_path)
+        load_times.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        for _ in range(_SETUP_CALLS):
+            fixture.battle_factory()
+        setup_times.append((time.perf_counter() - start) / _SETUP_CALLS)
+    results = [
+        ScenarioResult("startup.load_all_game_data", min(load_times), "s", stdev=_stdev(load_times)),
+        ScenarioResult("startup.setup_battle", min(setup_times) * 1000, "ms", stdev=_stdev(setup_times) * 1000),
+    ]
+    if config_load_times:
+        results.append(ScenarioResult("startup.load_game_data_for_config", min(config_load_times) * 1000, "ms",
+                                      stdev=_stdev(config_load_times) * 1000))
+    return results
+
+
+def _scenario_throughput(fixture: BenchmarkFixture, repeats: int, battles: int) -> List[ScenarioResult]:
+    rates = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        run_batch(fixture.battle_factory, battles, seed=0)
+        rates.append(battles / (time.perf_counter() - start))
+    return [ScenarioResult("battle.battles_per_sec", max(rates), "battles/s", higher_is_better=True, stdev=_stdev(rates))]
+
+
+def _scenario_peak_memory(fixture: BenchmarkFixture, repeats: int, battles: int) -> List[ScenarioResult]:
+    """加载数据、创建并运行一场战斗过程中 tracemalloc 统计的峰值内存（与重复轮数无关，只测一次）"""
+    from ..utils.data_loader import load_all_game_data
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start(1)
+    try:
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        load_all_game_data(fixture.data_path)
+        _, load_peak = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        battle_base, _ = tracemalloc.get_traced_memory()
+        battle = fixture.battle()
+        battle.run()
+        _, battle_peak = tracemalloc.get_traced_memory()
+    finally:
+        if started:
+            tracemalloc.stop()
+    return [
+        ScenarioResult("memory.load_peak", (load_peak - base) / 2 ** 20, "MiB"),
+        ScenarioResult("memory.battle_peak", (battle_peak - battle_base) / 2 ** 20, "MiB"),
+    ]
+
+
+SCENARIOS: Dict[str, Callable[[BenchmarkFixture, int, int], List[ScenarioResult]]] = {
+    "startup": _scenario_startup,
+    "throughput": _scenario_throughput,
+    "memory": _scenario_peak_memory,
+}
+
+
+def run_scenarios(fixture: BenchmarkFixture, names: Optional[List[str]] = None, repeats: int = DEFAULT_SCENARIO_REPEATS,
+                  battles: int = DEFAULT_SCENARIO_BATTLES,
+                  progress: Optional[Callable[[ScenarioResult], None]] = None) -> List[ScenarioResult]:
+    """运行指定（默认全部）场景基准，耗时类指标取多轮中的最好值"""
+    results = []
+    for name in names or list(SCENARIOS):
+        gc.collect()
+        with quiet_output():
+            scenario_results = SCENARIOS[name](fixture, repeats, battles)
+        for result in scenario_results:
+            results.append(result)
+            if progress:
+                progress(result)
+    return results
+
+
+def build_report(results: List[BenchmarkResult], scenarios: Optional[List[ScenarioResult]] = None,
+                 tolerances: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+    """tolerances 为写入报告的单项容差（录制基线时沿用旧基线中的设置）"""
+    report = {
+        "schema": SCHEMA_VERSION,
+        "environment": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+        },
+        "benchmarks": {result.name: result.to_dict() for result in results},
+        "scenarios": {result.name: result.to_dict() for result in scenarios or []},
+    }
+    if tolerances:
+        report["tolerances"] = dict(tolerances)
+    return report
+
+
+def results_to_json(results: List[BenchmarkResult], scenarios: Optional[List[ScenarioResult]] = None) -> str:
+    """键顺序固定的 JSON 报告"""
+    return report_to_json(build_report(results, scenarios))
+
+
+def report_to_json(report: Dict[str, Any]) -> str:
+    return json.dumps(report, ensure_ascii=False, indent=2, sort_keys=True)
+
+
+def load_report(path: str) -> Dict[str, Any]:
+    with open(path, 'r', encoding='utf-8') as f:
+        report = json.load(f)
+    if report.get("schema") != SCHEMA_VERSION:
+        raise ValueError(f"基线文件 '{path}' 的格式版本 {report.get('schema')} 与当前版本 {SCHEMA_VERSION} 不符")
+    return report
+
+
+def _report_metrics(report: Dict[str, Any]) -> Dict[str, tuple]:
+    """
+    把报告展开为 指标名 -> (数值, 单位, 是否越大越好, 各轮标准差)。
+    微基准取多轮中最快一轮的每次调用耗时，受其他进程干扰最小，比中位数更适合做门禁
+    """
+    metrics = {}
+    for name, entry in report.get("benchmarks", {}).items():
+        metrics[name] = (entry["best_us"], "µs", False, entry.get("stdev_us", 0.0))
+    for name, entry in report.get("scenarios", {}).items():
+        metrics[name] = (entry["value"], entry["unit"], entry["higher_is_better"], entry.get("stdev", 0.0))
+    return metrics
+
+
+@dataclass
+class Comparison:
+    """
+    单个指标与基线的比较。change 为相对变化，正值表示变好；
+    tolerance 为该指标使用的容差，noise 为判定退化所需的最小绝对变差
+    """
+    name: str
+    baseline: Optional[float]
+    current: Optional[float]
+    unit: str
+    change: Optional[float]
+    regressed: bool
+    tolerance: float = DEFAULT_TOLERANCE
+    noise: float = 0.0
+
+    @property
+    def within_noise(self) -> bool:
+        """变差超过了容差，但没有超过噪声下限"""
+        return not self.regressed and self.change is not None and self.change < -self.tolerance
+
+
+def compare_reports(baseline: Dict[str, Any], current: Dict[str, Any],
+                    tolerance: float = DEFAULT_TOLERANCE, tolerances: Optional[Dict[str, float]] = None,
+                    noise_sigmas: float = DEFAULT_NOISE_SIGMAS) -> List[Comparison]:
+    """
+    逐项比较当前结果与基线。变差同时超过容差（相对值）与噪声下限（基线中该指标各轮标准差的
+    noise_sigmas 倍，绝对值）才视为退化。单项容差依次取 tolerances、基线中的 "tolerances"、tolerance。
+    只存在于一侧的指标不判定退化。
+    """
+    tolerances = dict(baseline.get("tolerances", {}), **(tolerances or {}))
+    base_metrics, current_metrics = _report_metrics(baseline), _report_metrics(current)
+    comparisons = []
+    for name in sorted(set(base_metrics) | set(current_metrics)):
+        base = base_metrics.get(name)
+        cur = current_metrics.get(name)
+        if base is None or cur is None:
+            unit = (base or cur)[1]
+            comparisons.append(Comparison(name, base and base[0], cur and cur[0], unit, None, False))
+            continue
+        base_value, unit, higher_is_better, base_stdev = base
+        cur_value = cur[0]
+        if base_value == 0:
+            change = 0.0
+        elif higher_is_better:
+            change = (cur_value - base_value) / base_value
+        else:
+            change = (base_value - cur_value) / base_value
+        metric_tolerance = tolerances.get(name, tolerance)
+        noise = noise_sigmas * base_stdev
+        regressed = change < -metric_tolerance and abs(cur_value - base_value) > noise
+        comparisons.append(Comparison(name, base_value, cur_value, unit, change, regressed, metric_tolerance, noise))
+    return comparisons
+
+
+def format_comparison(comparisons: List[Comparison], tolerance: float = DEFAULT_TOLERANCE) -> str:
+    """生成可读的对比表，退化的指标以 ❌ 标出，使用单项容差的指标注明其容差"""
+    lines = [f"{'指标':<40} {'基线':>14} {'当前':>14}  变化（默认容差 {tolerance * 100:.0f}%）"]
+    for c in comparisons:
+        base = f"{c.baseline:.3f}{c.unit}" if c.baseline is not None else "-"
+        cur = f"{c.current:.3f}{c.unit}" if c.current is not None else "-"
+        if c.change is None:
+            status = "⏭️  仅存在于" + ("基线" if c.current is None else "当前结果")
+        else:
+            status = f"{'❌' if c.regressed else '✅'} {c.change * 100:+.1f}%"
+            if c.tolerance != tolerance:
+                status += f"（容差 {c.tolerance * 100:.0f}%）"
+            if c.within_noise:
+                status += f"（在噪声范围 ±{c.noise:.3f}{c.unit} 内）"
+        lines.append(f"{c.name:<40} {base:>14} {cur:>14}  {status}")
+    return "\n".join(lines)
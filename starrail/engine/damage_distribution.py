@@ -0,0 +1,156 @@
+# damage_distribution.py - 基于卷积的精确伤害分布分析
+"""
+对一段固定的行动序列，每次命中都是"暴击/非暴击"的两点分布。
+将所有命中的两点分布在离散网格上做卷积（通过 FFT 计算特征函数的乘积），
+即可得到总伤害的精确分布与 CDF，用于回答"能否一轮击杀"之类的阈值问题，
+无需采样成千上万场战斗。
+
+注意：分析假设行动序列本身不受暴击结果影响（例如击杀时机改变后续行动），
+因此适合对确定性的一段输出循环进行分析。
+"""
+from collections import Counter
+from typing import Iterable, List, Optional
+import numpy as np
+
+from ..core.skills.hit_record import HitRecord, HitRecorder
+
+# 前向声明以支持类型提示
+if False:
+    from ..core.battle import Battle
+
+DEFAULT_BINS = 8192
+_CHUNK_SIZE = 64
+
+
+class DamageDistribution:
+    """离散网格上的总伤害分布，pmf[j] 为总伤害落在 j * resolution 附近的概率"""
+
+    def __init__(self, pmf: np.ndarray, resolution: float, exact_mean: Optional[float] = None, hit_count: int = 0):
+        self.pmf = pmf
+        self.resolution = resolution
+        self.exact_mean = exact_mean
+        self.hit_count = hit_count
+        self._cdf = np.cumsum(pmf)
+
+    @classmethod
+    def from_hits(cls, hits: Iterable[HitRecord], resolution: Optional[float] = None, bins: int = DEFAULT_BINS) -> 'DamageDistribution':
+        """
+        由命中记录构建总伤害分布。
+        resolution: 网格步长（伤害单位），未指定时按暴击总伤害划分为约 bins 个格子。
+        每次命中的离散化误差不超过半个步长。
+        """
+        hits = list(hits)
+        if not hits:
+            return cls(np.array([1.0]), resolution or 1.0, exact_mean=0.0, hit_count=0)
+
+        non_crit = np.array([h.non_crit_damage for h in hits], dtype=float)
+        crit = np.array([h.crit_damage for h in hits], dtype=float)
+        rates = np.clip(np.array([h.crit_rate for h in hits], dtype=float), 0.0, 1.0)
+
+        if resolution is None:
+            resolution = max(float(np.maximum(non_crit, crit).sum()) / bins, 1e-9)
+
+        low = np.rint(non_crit / resolution).astype(np.int64)
+        high = np.rint(crit / resolution).astype(np.int64)
+        size = int(np.maximum(low, high).sum()) + 1
+
+        # 相同的 (非暴击格, 暴击格, 暴击率) 合并为幂次，减少特征函数的乘法次数
+        grouped = Counter(zip(low.tolist(), high.tolist(), rates.tolist()))
+        groups = np.array(list(grouped.keys()), dtype=float)
+        counts = np.array(list(grouped.values()), dtype=float)
+
+        n_fft = 1 << (size - 1).bit_length() if size > 1 else 2
+        freqs = np.arange(n_fft // 2 + 1)
+        spectrum = np.ones(n_fft // 2 + 1, dtype=complex)
+        for start in range(0, len(groups), _CHUNK_SIZE):
+            chunk = groups[start:start + _CHUNK_SIZE]
+            chunk_counts = counts[start:start + _CHUNK_SIZE]
+            a = chunk[:, 0][:, None]
+            b = chunk[:, 1][:, None]
+            p = chunk[:, 2][:, None]
+            phase = -2j * np.pi * freqs[None, :] / n_fft
+            factors = (1 - p) * np.exp(phase * a) + p * np.exp(phase * b)
+            spectrum *= np.prod(factors ** chunk_counts[:, None], axis=0)
+
+        pmf = np.fft.irfft(spectrum, n=n_fft)[:size]
+        pmf = np.clip(pmf, 0.0, None)
+        pmf /= pmf.sum()
+
+        exact_mean = float(((1 - rates) * non_crit + rates * crit).sum())
+        return cls(pmf, resolution, exact_mean=exact_mean, hit_count=len(hits))
+
+    @property
+    def error_bound(self) -> float:
+        """离散化带来的总伤害最大偏差（每次命中至多半个步长）"""
+        return self.hit_count * self.resolution / 2
+
+    @property
+    def values(self) -> np.ndarray:
+        """网格点对应的伤害值"""
+        return np.arange(len(self.pmf)) * self.resolution
+
+    def mean(self) -> float:
+        return float((self.values * self.pmf).sum())
+
+    def std(self) -> float:
+        mean = self.mean()
+        return float(np.sqrt(((self.values - mean) ** 2 * self.pmf).sum()))
+
+    def cdf(self, damage: float) -> float:
+        """P(总伤害 <= damage)"""
+        index = int(np.floor(damage / self.resolution + 1e-9))
+        if index < 0:
+            return 0.0
+        if index >= len(self._cdf):
+            return 1.0
+        return float(min(self._cdf[index], 1.0))
+
+    def prob_at_least(self, threshold: float) -> float:
+        """P(总伤害 >= threshold)，例如击杀概率 prob_at_least(敌人HP)"""
+        index = int(np.ceil(threshold / self.resolution - 1e-9))
+        if index <= 0:
+            return 1.0
+        if index >= len(self._cdf):
+            return 0.0
+        return float(max(1.0 - self._cdf[index - 1], 0.0))
+
+    def quantile(self, q: float) -> float:
+        """最小的伤害值 x，使 P(总伤害 <= x) >= q"""
+        index = int(np.searchsorted(self._cdf, min(max(q, 0.0), 1.0) - 1e-12))
+        return min(index, len(self.pmf) - 1) * self.resolution
+
+    def summary(self) -> dict:
+        return {
+            "hits": self.hit_count,
+            "resolution": self.resolution,
+            "error_bound": self.error_bound,
+            "exact_mean": self.exact_mean,
+            "mean": self.mean(),
+            "std": self.std(),
+            "p05": self.quantile(0.05),
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "max": (len(self.pmf) - 1) * self.resolution,
+        }
+
+
+def record_battle_hits(battle: 'Battle', **run_kwargs) -> List[HitRecord]:
+    """运行一场战斗并返回其全部命中记录"""
+    recorder = HitRecorder()
+    battle.add_listener("hit", recorder)
+    try:
+        battle.run(**run_kwargs)
+    finally:
+        battle.remove_listener("hit", recorder)
+    return recorder.hits
+
+
+def analyze_hits(hits: Iterable[HitRecord], attacker_name: Optional[str] = None, target_name: Optional[str] = None,
+                 resolution: Optional[float] = None, bins: int = DEFAULT_BINS) -> DamageDistribution:
+    """按攻击者/目标筛选命中记录后计算总伤害分布"""
+    selected = [
+        h for h in hits
+        if (attacker_name is None or h.attacker_name == attacker_name)
+        and (target_name is None or h.target_name == target_name)
+    ]
+    return DamageDistribution.from_hits(selected, resolution=resolution, bins=bins)
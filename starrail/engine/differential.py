@@ -0,0 +1,228 @@
+# differential.py - 参考路径与优化路径的差分校验
+"""
+同一场战斗（相同配置、相同随机种子）分别按参考路径与优化路径运行，
+记录两边的战斗事件流（行动、命中、治疗、战斗结束）并逐条比较，报告第一处分歧。
+
+参考路径调用 Battle.use_reference_path()，目前只关闭战斗内的伤害乘区缓存（DamageMultiplierCache），
+防御、抗性与受击方乘区每次命中重新计算；优化路径保持默认配置。
+因此本校验只覆盖乘区缓存，其他优化（属性快照版本、load_relic_set_data 的进程内缓存、数据驻留等）
+两条路径共用，由黄金战斗记录（golden.py）校验。需要差分校验的新优化可在 use_reference_path
+中增加关闭开关，或以 CombatPath 的形式注册到 COMBAT_PATHS。
+
+每个事件附带当时所有单位的生命值、能量、双方战技点与各随机流的消耗个数，
+事件本身一致但状态不一致（例如多消耗了一个随机数）同样视为分歧。
+random_battle_config 可从游戏数据中随机组队与挑选敌人，用于大范围校验。
+"""
+import math
+import random
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..core.skills.hit_record import HitRecord, ActionRecord, HealRecord
+from ..utils.random_tape import BattleRandom
+from .batch_runner import quiet_output
+
+# 前向声明以支持类型提示
+if False:
+    from ..core.battle import Battle
+
+DEFAULT_REL_TOL = 1e-9
+DEFAULT_CONTEXT = 5
+RELIC_SLOTS = ("Head", "Hands", "Body", "Feet", "PlanarSphere", "LinkRope")
+
+
+@dataclass
+class CombatPath:
+    """一种战斗计算路径，configure 在战斗开始前调整战斗实例"""
+    name: str
+    configure: Callable[['Battle'], None]
+
+
+COMBAT_PATHS: Dict[str, CombatPath] = {
+    "reference": CombatPath("reference", lambda battle: battle.use_reference_path()),
+    "optimized": CombatPath("optimized", lambda battle: None),
+}
+
+
+@dataclass
+class CombatEvent:
+    """事件流中的一条记录，state 为记录该事件时的战斗状态"""
+    index: int
+    kind: str
+    data: Dict[str, Any]
+    state: Dict[str, Any] = field(default_factory=dict)
+
+    def describe(self) -> str:
+        fields = ", ".join(f"{k}={_format_value(v)}" for k, v in self.data.items())
+        return f"#{self.index} {self.kind}({fields})"
+
+
+def _format_value(value) -> str:
+    return f"{value:.6g}" if isinstance(value, float) else repr(value)
+
+
+class EventStreamRecorder:
+    """监听战斗的 action / hit / heal 事件，按发生顺序记录事件及当时的战斗状态"""
+
+    def __init__(self, battle: 'Battle'):
+        self.battle = battle
+        self.events: List[CombatEvent] = []
+        battle.add_listener("action", self._on_action)
+        battle.add_listener("hit", self._on_hit)
+        battle.add_listener("heal", self._on_heal)
+
+    def _state(self) -> Dict[str, Any]:
+        battle = self.battle
+        return {
+            "units": [(c.name, c.hp, getattr(c, 'current_sp', 0)) for c in battle.characters],
+            "skill_points": dict(sorted(battle.skill_points_by_side.items())),
+            "draws": battle.rng.draws() if battle.rng is not None else {},
+        }
+
+    def _record(self, kind: str, data: Dict[str, Any]):
+        self.events.append(CombatEvent(len(self.events), kind, data, self._state()))
+
+    def _on_action(self, record: ActionRecord):
+        self._record("action", {"turn": record.turn, "actor": record.actor_name, "kind": record.kind})
+
+    def _on_hit(self, record: HitRecord):
+        self._record("hit", {
+            "attacker": record.attacker_name, "target": record.target_name, "skill_type": record.skill_type,
+            "element": record.element, "is_crit": record.is_crit, "damage": record.final_damage,
+            "crit_rate": record.crit_rate,
+        })
+
+    def _on_heal(self, record: HealRecord):
+        self._record("heal", {"target": record.target_name, "source": record.source, "amount": record.amount})
+
+    def finish(self):
+        """战斗结束后追加结束事件"""
+        self._record("end", {"winner": self.battle.winner, "turns": self.battle.turn})
+
+
+def record_event_stream(battle_factory: Callable[[], 'Battle'], seed: int, path: CombatPath,
+                        max_turns: int = 10) -> List[CombatEvent]:
+    """按指定路径创建并运行一场战斗，返回事件流，战斗创建与战斗日志的输出被屏蔽"""
+    with quiet_output():
+        battle = battle_factory()
+        path.configure(battle)
+        battle.rng = BattleRandom(seed)
+        recorder = EventStreamRecorder(battle)
+        battle.run(max_turns=max_turns)
+    recorder.finish()
+    return recorder.events
+
+
+def _values_equal(a, b, rel_tol: float) -> bool:
+    if isinstance(a, float) or isinstance(b, float):
+        if not isinstance(a, (int, float)) or not isinstance(b, (int, float)):
+            return False
+        return math.isclose(a, b, rel_tol=rel_tol, abs_tol=rel_tol)
+    if isinstance(a, (list, tuple)) and isinstance(b, (list, tuple)):
+        return len(a) == len(b) and all(_values_equal(x, y, rel_tol) for x, y in zip(a, b))
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(_values_equal(a[k], b[k], rel_tol) for k in a)
+    return a == b
+
+
+def _differences(a: Dict[str, Any], b: Dict[str, Any], rel_tol: float) -> List[Tuple[str, Any, Any]]:
+    return [(key, a.get(key), b.get(key)) for key in sorted(set(a) | set(b), key=str)
+            if not _values_equal(a.get(key), b.get(key), rel_tol)]
+
+
+@dataclass
+class Divergence:
+    """两条事件流的第一处分歧"""
+    index: int
+    reason: str
+    reference: Optional[CombatEvent]
+    candidate: Optional[CombatEvent]
+    differences: List[Tuple[str, Any, Any]]
+    context: List[CombatEvent]
+    reference_name: str = "reference"
+    candidate_name: str = "optimized"
+    seed: Optional[int] = None
+
+    def format(self) -> str:
+        lines = [f"❌ 事件流在第 {self.index} 条事件处出现分歧: {self.reason}"]
+        if self.seed is not None:
+            lines[0] += f"（种子 {self.seed}）"
+        if self.context:
+            lines.append("  之前的一致事件:")
+            lines.extend(f"    {event.describe()}" for event in self.context)
+        for name, event in ((self.reference_name, self.reference), (self.candidate_name, self.candidate)):
+            lines.append(f"  [{name}] {event.describe() if event else '（事件流已结束）'}")
+        for key, ref_value, cand_value in self.differences:
+            lines.append(f"    {key}: {self.reference_name}={ref_value!r}  {self.candidate_name}={cand_value!r}")
+        if self.reference is not None:
+            lines.append(f"  [{self.reference_name}] 记录时状态: {self.reference.state}")
+        if self.candidate is not None:
+            lines.append(f"  [{self.candidate_name}] 记录时状态: {self.candidate.state}")
+        return "\n".join(lines)
+
+
+def compare_event_streams(reference: List[CombatEvent], candidate: List[CombatEvent],
+                          rel_tol: float = DEFAULT_REL_TOL, context: int = DEFAULT_CONTEXT) -> Optional[Divergence]:
+    """逐条比较两条事件流，返回第一处分歧，完全一致时返回 None"""
+    for index in range(max(len(reference), len(candidate))):
+        ref = reference[index] if index < len(reference) else None
+        cand = candidate[index] if index < len(candidate) else None
+        before = reference[max(0, index - context):index]
+        if ref is None or cand is None:
+            return Divergence(index, "事件数量不同", ref, cand, [], before)
+        if ref.kind != cand.kind:
+            return Divergence(index, f"事件类型不同（{ref.kind} / {cand.kind}）", ref, cand, [], before)
+        differences = _differences(ref.data, cand.data, rel_tol)
+        if differences:
+            return Divergence(index, "事件内容不同", ref, cand, differences, before)
+        differences = [(f"state.{key}", a, b) for key, a, b in _differences(ref.state, cand.state, rel_tol)]
+        if differences:
+            return Divergence(index, "记录时的战斗状态不同", ref, cand, differences, before)
+    return None
+
+
+def check_battle(battle_factory: Callable[[], 'Battle'], seed: int, reference: str = "reference",
+                 candidate: str = "optimized", max_turns: int = 10, rel_tol: float = DEFAULT_REL_TOL,
+                 context: int = DEFAULT_CONTEXT) -> Tuple[Optional[Divergence], int]:
+    """按两种路径运行同一场战斗并比较，返回 (分歧或 None, 参考路径的事件数)"""
+    ref_path, cand_path = COMBAT_PATHS[reference], COMBAT_PATHS[candidate]
+    ref_events = record_event_stream(battle_factory, seed, ref_path, max_turns)
+    cand_events = record_event_stream(battle_factory, seed, cand_path, max_turns)
+    divergence = compare_event_streams(ref_events, cand_events, rel_tol, context)
+    if divergence is not None:
+        divergence.reference_name, divergence.candidate_name = ref_path.name, cand_path.name
+        divergence.seed = seed
+    return divergence, len(ref_events)
+
+
+def random_battle_config(game_data: Dict[str, Any], rng: random.Random, team_size: Tuple[int, int] = (1, 4),
+                         enemy_count: Tuple[int, int] = (1, 3)) -> Dict[str, Any]:
+    """
+    从游戏数据中随机生成战斗配置（格式与 visual_config.json 相同）：
+    随机挑选带技能的角色、光锥与每个部位的遗器，以及随机的敌人模板。
+    """
+    characters = [c for c in game_data['characters']
+                  if c.side == 'player' and any(sid in game_data['skills'] for sid in c.skills)]
+    relics_by_slot: Dict[str, List[str]] = {}
+    for relic_id, relic in game_data['relics'].items():
+        relics_by_slot.setdefault(relic.slot, []).append(relic_id)
+    light_cone_ids = sorted(game_data['light_cones'])
+
+    team = []
+    for character in rng.sample(characters, rng.randint(*team_size)):
+        team.append({
+            "id": character.id,
+            "name": character.name,
+            "light_cone": rng.choice(light_cone_ids) if light_cone_ids else None,
+            "relics": {slot: rng.choice(relics_by_slot[slot]) for slot in RELIC_SLOTS if relics_by_slot.get(slot)},
+        })
+
+    templates = sorted(game_data['enemy_templates'].values(), key=lambda t: str(t.get('id')))
+    enemies = []
+    for template in rng.sample(templates, rng.randint(*enemy_count)):
+        enemies.append({
+            key: template[key] for key in
+            ("id", "name", "stats", "skills", "weaknesses", "resistances", "toughness", "max_toughness")
+            if key in template
+        })
+    return {"team": team, "enemies": enemies}
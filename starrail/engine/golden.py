@@ -0,0 +1,308 @@
+# golden.py - 黄金战斗记录（golden transcripts）
+"""
+为一组固定种子的参考战斗录制紧凑、规范化的战斗记录，并在之后重放校验引擎是否仍能逐条复现。
+性能优化改动热点路径之前后都应运行校验，任何行为变化都会在第一条不一致的事件处报告。
+
+每份记录保存：
+- 行动顺序（回合、行动者、行动类型）以及每次行动时双方战技点与所有单位的能量
+- 每次命中的伤害与每次治疗的数值（按 decimals 位小数取整）
+- 战斗结束时的胜者、回合数与所有单位的生命值
+
+记录内嵌完整的战斗配置与所用遗器，不依赖会随用户导入而变化的遗器存档。
+build_scenarios 基于默认配置（希儿 / 娜塔莎 / 布洛妮娅）生成场景，
+覆盖三人的技能组、LightConeSkillFactory 注册的所有光锥与 RelicSetSkillFactory 注册的所有遗器套装；
+missing_coverage 检查一组记录是否覆盖了全部注册项。
+"""
+import copy
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from ..core.light_cones.light_cone_skill import LightConeSkillFactory
+from ..core.relics.relic import Relic
+from ..core.relics.relic_set_skill import RelicSetSkillFactory
+from .differential import COMBAT_PATHS, CombatEvent, record_event_stream
+
+# 前向声明以支持类型提示
+if False:
+    from ..core.battle import Battle
+
+FORMAT_VERSION = 1
+DEFAULT_DECIMALS = 2
+DEFAULT_SEEDS = (0, 1, 2)
+DEFAULT_CONTEXT = 5
+REQUIRED_KITS = ("1102", "1105", "1101")  # 希儿、娜塔莎、布洛妮娅
+CAVERN_SLOTS = ("Head", "Hands", "Body", "Feet")
+PLANAR_SLOTS = ("PlanarSphere", "LinkRope")
+# 默认由队伍第一名成员装备套装，以下套装改由更合适的角色装备
+RELIC_SET_CARRIERS = {
+    "Passerby of Wandering Cloud": "1105",
+}
+
+
+@dataclass
+class GoldenScenario:
+    """一场参考战斗：战斗配置、随机种子，以及遗器存档中不存在、需要内嵌的遗器"""
+    name: str
+    description: str
+    config: Dict[str, Any]
+    seed: int = 0
+    max_turns: int = 10
+    relics: Dict[str, Relic] = field(default_factory=dict)
+
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", text.lower()).strip("_")
+
+
+def _planar_sets(data_path: str) -> set:
+    """relic_skills.json 中编号以 3 开头的套装为位面饰品"""
+    path = os.path.join(data_path, 'relic_skills.json')
+    if not os.path.exists(path):
+        return set()
+    with open(path, encoding='utf-8') as f:
+        return {entry['name'] for entry in json.load(f) if str(entry.get('id', '')).startswith('3')}
+
+
+def _relic_for(game_data: Dict[str, Any], set_name: str, slot: str) -> Relic:
+    """
+    返回指定套装与部位的遗器：优先使用遗器存档中的（按ID排序取第一件），
+    存档中没有时复制同部位的任意遗器并改为该套装。
+    """
+    same_slot = sorted((r for r in game_data['relics'].values() if r.slot == slot), key=lambda r: r.id)
+    for relic in same_slot:
+        if relic.set_name == set_name:
+            return relic
+    if not same_slot:
+        raise ValueError(f"遗器存档中没有 {slot} 部位的遗器，无法为 '{set_name}' 生成场景")
+    relic = copy.deepcopy(same_slot[0])
+    relic.id = f"golden-{_slug(set_name)}-{slot.lower()}"
+    relic.name = set_name
+    relic.set_name = set_name
+    return relic
+
+
+def build_scenarios(game_data: Dict[str, Any], base_config: Dict[str, Any], data_path: str,
+                    seeds=DEFAULT_SEEDS, max_turns: int = 10) -> List[GoldenScenario]:
+    """
+    基于默认战斗配置生成参考战斗：技能组（多个种子）、每个注册光锥、每个注册遗器套装各一场，
+    光锥与遗器套装场景各自使用不同的种子以覆盖更多随机分支。
+    """
+    scenarios = [
+        GoldenScenario(f"kits_seed{seed}", "默认配置下的希儿 / 娜塔莎 / 布洛妮娅技能组", copy.deepcopy(base_config),
+                       seed, max_turns)
+        for seed in seeds
+    ]
+    team = base_config.get('team', [])
+    if not team:
+        return scenarios
+
+    for lc_id in LightConeSkillFactory.registered_ids():
+        config = copy.deepcopy(base_config)
+        member = next((m for m in config['team'] if m.get('light_cone') == lc_id), config['team'][0])
+        member['light_cone'] = lc_id
+        light_cone = game_data['light_cones'].get(lc_id)
+        lc_name = light_cone.name if light_cone else lc_id
+        scenarios.append(GoldenScenario(f"light_cone_{lc_id}", f"{member['name']} 装备光锥 '{lc_name}'", config,
+                                        seeds[0] + len(scenarios), max_turns))
+
+    planar_sets = _planar_sets(data_path)
+    for set_name in RelicSetSkillFactory.registered_sets():
+        config = copy.deepcopy(base_config)
+        carrier_id = RELIC_SET_CARRIERS.get(set_name)
+        member = next((m for m in config['team'] if m['id'] == carrier_id), config['team'][0])
+        relics = {}
+        for slot in (PLANAR_SLOTS if set_name in planar_sets else CAVERN_SLOTS):
+            relic = _relic_for(game_data, set_name, slot)
+            member.setdefault('relics', {})[slot] = relic.id
+            if relic.id not in game_data['relics']:
+                relics[relic.id] = relic
+        scenarios.append(GoldenScenario(f"relic_set_{_slug(set_name)}", f"{member['name']} 装备遗器套装 '{set_name}'",
+                                        config, seeds[0] + len(scenarios), max_turns, relics))
+    return scenarios
+
+
+def _round(value, decimals: int):
+    return round(value, decimals) if isinstance(value, float) else value
+
+
+def canonical_events(events: List[CombatEvent], decimals: int = DEFAULT_DECIMALS) -> List[Dict[str, Any]]:
+    """把差分校验的事件流转换为规范化记录，数值按 decimals 位小数取整"""
+    records = []
+    for event in events:
+        data, state = event.data, event.state
+        if event.kind == "action":
+            records.append({
+                "e": "action", "turn": data["turn"], "actor": data["actor"], "kind": data["kind"],
+                "sp": state["skill_points"],
+                "energy": [_round(float(energy), decimals) for _, _, energy in state["units"]],
+            })
+        elif event.kind == "hit":
+            records.append({
+                "e": "hit", "attacker": data["attacker"], "target": data["target"], "skill": data["skill_type"],
+                "crit": data["is_crit"], "damage": _round(float(data["damage"]), decimals),
+            })
+        elif event.kind == "heal":
+            records.append({
+                "e": "heal", "target": data["target"], "source": data["source"],
+                "amount": _round(float(data["amount"]), decimals),
+            })
+        elif event.kind == "end":
+            records.append({
+                "e": "end", "winner": data["winner"], "turns": data["turns"],
+                "hp": [_round(float(hp), decimals) for _, hp, _ in state["units"]],
+            })
+    return records
+
+
+def _coverage(config: Dict[str, Any], relics: Dict[str, Relic]) -> Dict[str, List[str]]:
+    """配置中出现的角色、光锥，以及至少激活 2 件套效果的遗器套装"""
+    characters, light_cones, relic_sets = set(), set(), set()
+    for member in config.get('team', []):
+        characters.add(member['id'])
+        if member.get('light_cone'):
+            light_cones.add(member['light_cone'])
+        counts: Dict[str, int] = {}
+        for relic_id in member.get('relics', {}).values():
+            relic = relics.get(relic_id)
+            if relic is not None and relic.set_name:
+                counts[relic.set_name] = counts.get(relic.set_name, 0) + 1
+        relic_sets.update(name for name, count in counts.items() if count >= 2)
+    return {"characters": sorted(characters), "light_cones": sorted(light_cones), "relic_sets": sorted(relic_sets)}
+
+
+def _inline_relics(config: Dict[str, Any], relics: Dict[str, Relic]) -> Dict[str, Dict[str, Any]]:
+    used = {rid for member in config.get('team', []) for rid in member.get('relics', {}).values()}
+    return {rid: dict(vars(relics[rid])) for rid in sorted(used) if rid in relics}
+
+
+def _game_data_with_relics(game_data: Dict[str, Any], relics: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    merged = dict(game_data['relics'])
+    merged.update({rid: Relic(**spec) for rid, spec in relics.items()})
+    return dict(game_data, relics=merged)
+
+
+def _run(config: Dict[str, Any], seed: int, max_turns: int, game_data: Dict[str, Any],
+         battle_builder: Callable[[Dict[str, Any], Dict[str, Any]], 'Battle']) -> List[CombatEvent]:
+    return record_event_stream(lambda: battle_builder(config, game_data), seed, COMBAT_PATHS["optimized"], max_turns)
+
+
+def record_transcript(scenario: GoldenScenario, game_data: Dict[str, Any],
+                      battle_builder: Callable[[Dict[str, Any], Dict[str, Any]], 'Battle'],
+                      decimals: int = DEFAULT_DECIMALS) -> Dict[str, Any]:
+    """运行一场参考战斗并生成记录，battle_builder(config, game_data) 负责按配置创建战斗"""
+    all_relics = dict(game_data['relics'], **scenario.relics)
+    relics = _inline_relics(scenario.config, all_relics)
+    events = _run(scenario.config, scenario.seed, scenario.max_turns, _game_data_with_relics(game_data, relics),
+                  battle_builder)
+    return {
+        "format": FORMAT_VERSION,
+        "scenario": scenario.name,
+        "description": scenario.description,
+        "seed": scenario.seed,
+        "max_turns": scenario.max_turns,
+        "decimals": decimals,
+        "covers": _coverage(scenario.config, all_relics),
+        "config": scenario.config,
+        "relics": relics,
+        "units": [name for name, _, _ in events[-1].state["units"]] if events else [],
+        "events": canonical_events(events, decimals),
+    }
+
+
+def transcript_to_json(transcript: Dict[str, Any]) -> str:
+    """序列化记录：头部缩进排版，每条事件独占一行，便于 diff"""
+    header = {key: value for key, value in transcript.items() if key != "events"}
+    text = json.dumps(header, ensure_ascii=False, indent=2, sort_keys=True)
+    events = ",\n".join("    " + json.dumps(event, ensure_ascii=False, sort_keys=True) for event in transcript["events"])
+    return text[:-2] + ',\n  "events": [\n' + events + '\n  ]\n}\n'
+
+
+def save_transcript(path: str, transcript: Dict[str, Any]):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(transcript_to_json(transcript))
+
+
+def load_transcript(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as f:
+        transcript = json.load(f)
+    if transcript.get("format") != FORMAT_VERSION:
+        raise ValueError(f"战斗记录 {path} 的格式版本为 {transcript.get('format')}，当前版本为 {FORMAT_VERSION}")
+    return transcript
+
+
+def _values_equal(expected, actual, tolerance: float) -> bool:
+    if isinstance(expected, bool) or isinstance(actual, bool):
+        return expected is actual
+    if isinstance(expected, (int, float)) and isinstance(actual, (int, float)):
+        return abs(expected - actual) <= tolerance
+    if isinstance(expected, list) and isinstance(actual, list):
+        return len(expected) == len(actual) and all(_values_equal(a, b, tolerance) for a, b in zip(expected, actual))
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        return expected.keys() == actual.keys() and all(_values_equal(expected[k], actual[k], tolerance) for k in expected)
+    return expected == actual
+
+
+@dataclass
+class TranscriptMismatch:
+    """重放结果与记录的第一处不一致"""
+    scenario: str
+    index: int
+    expected: Optional[Dict[str, Any]]
+    actual: Optional[Dict[str, Any]]
+    context: List[Dict[str, Any]]
+
+    def format(self) -> str:
+        lines = [f"❌ [{self.scenario}] 第 {self.index} 条事件与记录不一致"]
+        if self.context:
+            lines.append("  之前的一致事件:")
+            lines.extend(f"    {json.dumps(event, ensure_ascii=False)}" for event in self.context)
+        lines.append(f"  记录: {json.dumps(self.expected, ensure_ascii=False) if self.expected else '（记录已结束）'}")
+        lines.append(f"  重放: {json.dumps(self.actual, ensure_ascii=False) if self.actual else '（重放已结束）'}")
+        return "\n".join(lines)
+
+
+def compare_transcripts(expected: Dict[str, Any], actual: Dict[str, Any],
+                        context: int = DEFAULT_CONTEXT) -> Optional[TranscriptMismatch]:
+    """逐条比较事件，数值允许相差一个取整单位"""
+    tolerance = 10 ** -expected.get("decimals", DEFAULT_DECIMALS) * 1.5
+    if expected.get("units") != actual.get("units"):
+        return TranscriptMismatch(expected["scenario"], -1, {"units": expected.get("units")},
+                                  {"units": actual.get("units")}, [])
+    expected_events, actual_events = expected["events"], actual["events"]
+    for index in range(max(len(expected_events), len(actual_events))):
+        exp = expected_events[index] if index < len(expected_events) else None
+        act = actual_events[index] if index < len(actual_events) else None
+        if exp is None or act is None or not _values_equal(exp, act, tolerance):
+            return TranscriptMismatch(expected["scenario"], index, exp, act,
+                                      expected_events[max(0, index - context):index])
+    return None
+
+
+def replay_transcript(transcript: Dict[str, Any], game_data: Dict[str, Any],
+                      battle_builder: Callable[[Dict[str, Any], Dict[str, Any]], 'Battle'],
+                      context: int = DEFAULT_CONTEXT) -> Optional[TranscriptMismatch]:
+    """按记录中的配置与种子重新运行战斗，返回第一处不一致，完全复现时返回 None"""
+    events = _run(transcript["config"], transcript["seed"], transcript["max_turns"],
+                  _game_data_with_relics(game_data, transcript.get("relics", {})), battle_builder)
+    actual = dict(transcript, units=[name for name, _, _ in events[-1].state["units"]] if events else [],
+                  events=canonical_events(events, transcript.get("decimals", DEFAULT_DECIMALS)))
+    return compare_transcripts(transcript, actual, context)
+
+
+def missing_coverage(transcripts: List[Dict[str, Any]]) -> Dict[str, List[str]]:
+    """返回未被任何记录覆盖的技能组、注册光锥与注册遗器套装"""
+    covered: Dict[str, set] = {"characters": set(), "light_cones": set(), "relic_sets": set()}
+    for transcript in transcripts:
+        for key, values in transcript.get("covers", {}).items():
+            covered.setdefault(key, set()).update(values)
+    required = {
+        "characters": REQUIRED_KITS,
+        "light_cones": LightConeSkillFactory.registered_ids(),
+        "relic_sets": RelicSetSkillFactory.registered_sets(),
+    }
+    missing = {key: sorted(set(values) - covered[key]) for key, values in required.items()}
+    return {key: values for key, values in missing.items() if values}
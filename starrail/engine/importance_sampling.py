@@ -0,0 +1,181 @@
+# importance_sampling.py - 稀有事件概率的重要性采样
+"""
+对"坦克在第5回合前倒下"、"三次暴击击杀首领"这类稀有事件，
+直接批量模拟几乎采不到事件发生的样本。重要性采样把暴击与目标选择的
+随机数偏向事件发生的方向，并在每场战斗中累积似然比：
+
+    暴击判定:  真实暴击率 p，偏置暴击率 q  ->  暴击时乘 p/q，未暴击时乘 (1-p)/(1-q)
+    目标选择:  真实为 n 选 1 均匀分布，偏置权重 w  ->  选中 k 时乘 (1/n) / (w_k / Σw)
+
+事件概率的无偏估计为 mean(权重 * 事件是否发生)。
+"""
+import math
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence
+import numpy as np
+
+from .batch_runner import battle_seeds, quiet_output
+from ..core.skills.hit_record import HitRecord, HitRecorder
+from ..utils.random_tape import BattleRandom
+
+# 前向声明以支持类型提示
+if False:
+    from ..core.battle import Battle
+    from ..core.character import Character
+
+BattleEvent = Callable[['Battle', List[HitRecord]], bool]
+
+
+class ImportanceBias:
+    """
+    采样偏置设置，键可以是单位名称或阵营名称（如 "enemy"）。
+    crit_rates: 攻击者 -> 偏置后的暴击率
+    target_weights: 目标 -> 被选中的相对权重（未列出的目标权重为 1）
+    ai_weights: 技能名称 -> AI 随机选择技能时的相对权重
+    """
+
+    def __init__(self, crit_rates: Optional[Dict[str, float]] = None, target_weights: Optional[Dict[str, float]] = None,
+                 ai_weights: Optional[Dict[str, float]] = None):
+        self.crit_rates = crit_rates or {}
+        self.target_weights = target_weights or {}
+        self.ai_weights = ai_weights or {}
+
+    @staticmethod
+    def _lookup(table: Dict[str, float], unit, default=None):
+        if unit is None:
+            return default
+        for key in (getattr(unit, 'name', None), getattr(unit, 'side', None)):
+            if key in table:
+                return table[key]
+        return default
+
+    def crit_rate(self, attacker: Optional['Character'], crit_rate: float) -> float:
+        """返回偏置后的暴击率"""
+        return self._lookup(self.crit_rates, attacker, crit_rate)
+
+    def choice_weights(self, stream: str, actor, seq: Sequence) -> Optional[List[float]]:
+        """返回偏置后的选择权重，None 表示保持等概率"""
+        if stream == "target" and self.target_weights:
+            weights = [self._lookup(self.target_weights, item, 1.0) for item in seq]
+        elif stream == "ai" and self.ai_weights:
+            weights = [self.ai_weights.get(getattr(item, 'name', None), 1.0) for item in seq]
+        else:
+            return None
+        return weights if any(w != 1.0 for w in weights) else None
+
+
+class ImportanceBattleRandom(BattleRandom):
+    """按 ImportanceBias 偏置采样并累积对数似然比的 BattleRandom"""
+
+    def __init__(self, bias: ImportanceBias, seed: Optional[int] = None, **kwargs):
+        self.bias = bias
+        self.log_weight = 0.0
+        self.biased_draws = 0
+        super().__init__(seed, **kwargs)
+
+    @property
+    def weight(self) -> float:
+        """本场战斗的似然比（真实概率 / 采样概率）"""
+        return math.exp(self.log_weight)
+
+    def _accumulate(self, true_prob: float, sample_prob: float):
+        self.biased_draws += 1
+        self.log_weight += math.log(true_prob) - math.log(sample_prob) if true_prob > 0 else -math.inf
+
+    def roll_crit(self, crit_rate: float, attacker=None) -> bool:
+        p = min(max(crit_rate, 0.0), 1.0)
+        q = min(max(self.bias.crit_rate(attacker, crit_rate), 0.0), 1.0)
+        is_crit = self.random("crit") < q
+        if q != p:
+            self._accumulate(p if is_crit else 1 - p, q if is_crit else 1 - q)
+        return is_crit
+
+    def choice(self, stream: str, seq: Sequence, actor=None):
+        weights = self.bias.choice_weights(stream, actor, seq)
+        if weights is None:
+            return super().choice(stream, seq, actor)
+        total = sum(weights)
+        u = self.random(stream) * total
+        index = len(seq) - 1
+        cumulative = 0.0
+        for i, w in enumerate(weights):
+            cumulative += w
+            if u < cumulative:
+                index = i
+                break
+        self._accumulate(1 / len(seq), weights[index] / total)
+        return seq[index]
+
+
+@dataclass
+class ImportanceResult:
+    """重要性采样结果，weights[i] 为第 i 场战斗的似然比"""
+    weights: np.ndarray
+    occurred: np.ndarray
+
+    def estimate(self) -> Dict[str, float]:
+        """
+        返回事件概率的无偏估计:
+        probability / std_error: 概率估计及其标准误
+        hits: 采样中事件发生的场数
+        effective_sample_size: 权重的有效样本量 (Σw)² / Σw²
+        mc_equivalent_battles: 普通蒙特卡洛达到同样标准误所需的场数
+        """
+        n = len(self.weights)
+        samples = self.weights * self.occurred
+        probability = float(samples.mean()) if n else float('nan')
+        std_error = float(samples.std(ddof=1) / math.sqrt(n)) if n > 1 else float('nan')
+        weight_sq = float((self.weights ** 2).sum())
+        ess = float(self.weights.sum() ** 2 / weight_sq) if weight_sq > 0 else 0.0
+        if std_error > 0:
+            mc_equivalent = probability * (1 - probability) / std_error ** 2
+        else:
+            mc_equivalent = float('inf') if probability > 0 else float('nan')
+        return {
+            "battles": n,
+            "hits": int(self.occurred.sum()),
+            "probability": probability,
+            "std_error": std_error,
+            "effective_sample_size": ess,
+            "mc_equivalent_battles": float(mc_equivalent),
+        }
+
+
+def unit_dies(name: str) -> BattleEvent:
+    """事件: 指定单位在战斗结束时已倒下（配合 max_turns 即为"第 N 回合前倒下"）"""
+    def event(battle: 'Battle', hits: List[HitRecord]) -> bool:
+        return any(c.name == name and not c.is_alive() for c in battle.characters)
+    return event
+
+
+def crit_kill(attacker_name: str, target_name: str, crits: int = 3) -> BattleEvent:
+    """事件: 目标被击杀，且攻击者对其造成了至少 crits 次暴击"""
+    def event(battle: 'Battle', hits: List[HitRecord]) -> bool:
+        if not unit_dies(target_name)(battle, hits):
+            return False
+        landed = sum(1 for h in hits if h.attacker_name == attacker_name and h.target_name == target_name and h.is_crit)
+        return landed >= crits
+    return event
+
+
+def run_importance_sampling(battle_factory: Callable[[], 'Battle'], n_battles: int, event: BattleEvent,
+                            bias: Optional[ImportanceBias] = None, seed: int = 0, max_turns: int = 10,
+                            quiet: bool = True) -> ImportanceResult:
+    """
+    批量运行偏置采样的战斗，返回每场战斗的似然比与事件是否发生。
+    bias 为 None 时等价于普通蒙特卡洛（全部权重为 1）。
+    """
+    bias = bias or ImportanceBias()
+    weights = np.zeros(n_battles)
+    occurred = np.zeros(n_battles)
+    with quiet_output(quiet):
+        for i, s in enumerate(battle_seeds(seed, n_battles)):
+            rng = ImportanceBattleRandom(bias, seed=s)
+            battle = battle_factory()
+            battle.rng = rng
+            recorder = HitRecorder()
+            battle.add_listener("hit", recorder)
+            battle.run(max_turns=max_turns)
+            weights[i] = rng.weight
+            occurred[i] = 1.0 if event(battle, recorder.hits) else 0.0
+    return ImportanceResult(weights=weights, occurred=occurred)
@@ -0,0 +1,203 @@
+# kill_probability.py - 基于动态规划的击杀概率计算
+"""
+给定攻击者、目标敌人与一段行动计划，精确计算"k 次行动内击杀目标"的概率。
+
+每次命中只有暴击/非暴击两种结果，按剩余HP做动态规划：
+    P(i, hp) = p_i * P(i+1, hp - 暴击伤害_i) + (1 - p_i) * P(i+1, hp - 非暴击伤害_i)
+并对状态做记忆化与剪枝：
+    - 剩余命中全部暴击也打不死 -> 概率为 0
+    - 剩余命中全部不暴击也能打死 -> 概率为 1
+伤害公式与 skill_manager.full_damage_calc 一致（见 damage_outcomes），
+敌人的 HP/DEF/抗性/弱点来自 processed_enemies.json（有最新的二进制表 processed_enemies.bin 时直接从中读取）。
+"""
+
+import os
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from ..core.enemy import Enemy
+from ..core.skills.skill_manager import damage_outcomes
+from ..core.skills.multiplier_cache import compute_defense_multiplier, compute_resistance_multiplier, compute_target_modifiers
+from ..utils.data_loader import load_json, create_enemy_from_template, get_enemy_table
+
+# 前向声明以支持类型提示
+if False:
+    from ..core.character import Character
+
+# 与 full_damage_calc 中的削韧量保持一致
+TOUGHNESS_MAP = {"Normal": 10, "BPSkill": 20, "Ultra": 30}
+
+
+@dataclass
+class PlannedHit:
+    """行动计划中的一次命中"""
+    multiplier: float
+    element: Optional[str]
+    skill_type: str = "Normal"
+
+
+@dataclass
+class HitOutcome:
+    """一次命中的两种可能结果"""
+    non_crit_damage: float
+    crit_damage: float
+    crit_rate: float
+    skill_type: str = "Normal"
+
+
+def planned_hit_from_skill(skill_data: Dict, level: int = 1) -> PlannedHit:
+    """由技能数据构建命中计划，约定 params 的第一个参数为伤害倍率"""
+    params = skill_data["params"][level - 1]
+    return PlannedHit(multiplier=params[0], element=skill_data.get("element"), skill_type=skill_data.get("type", "Normal"))
+
+
+def load_enemy(enemy_id: str, processed_enemies_path: str) -> Optional[Enemy]:
+    """
+    从 processed_enemies.json 中按ID创建敌人实例。
+    优先按 ID 索引查找本进程共享的 mmap 二进制表（只有名称与数值数据，敌人不带技能），表不可用时逐条扫描 JSON
+    """
+    table = get_enemy_table(processed_enemies_path)
+    if table is not None:
+        record = table.get(enemy_id)
+        if record is None:
+            return None
+        enemy = create_enemy_from_template(record.to_template())
+        enemy.hp = enemy.stats.get("HP", 0)
+        return enemy
+    for item in load_json(processed_enemies_path):
+        if str(item.get('id')) == str(enemy_id):
+            enemy = create_enemy_from_template(item)
+            enemy.hp = enemy.stats.get("HP", 0)
+            return enemy
+    return None
+
+
+def build_hit_outcomes(attacker: 'Character', target: 'Character', actions: Sequence[Union[PlannedHit, Sequence[PlannedHit]]]) -> List[List[HitOutcome]]:
+    """
+    将行动计划换算为每次行动的命中结果列表。
+    按 full_damage_calc 的顺序模拟削韧：命中弱点时削减韧性，韧性归零后
+    追加一次确定性的击破伤害，且后续命中不再享受韧性减伤。
+    """
+    saved_toughness = getattr(target, 'toughness', None)
+    outcomes: List[List[HitOutcome]] = []
+    try:
+        for action in actions:
+            hits = [action] if isinstance(action, PlannedHit) else list(action)
+            action_outcomes = []
+            for hit in hits:
+                non_crit, crit, crit_rate = damage_outcomes(attacker, target, hit.multiplier, hit.element, hit.skill_type)
+                action_outcomes.append(HitOutcome(non_crit, crit, crit_rate, hit.skill_type))
+                break_outcome = _apply_toughness(attacker, target, hit)
+                if break_outcome:
+                    action_outcomes.append(break_outcome)
+            outcomes.append(action_outcomes)
+    finally:
+        if saved_toughness is not None:
+            target.toughness = saved_toughness
+    return outcomes
+
+
+def _apply_toughness(attacker, target, hit: PlannedHit) -> Optional[HitOutcome]:
+    toughness = getattr(target, 'toughness', None)
+    if toughness is None or toughness <= 0 or hit.element not in getattr(target, 'weaknesses', []):
+        return None
+    target.toughness = max(toughness - TOUGHNESS_MAP.get(hit.skill_type, 0), 0)
+    if target.toughness > 0 or not hasattr(target, 'calculate_break_damage'):
+        return None
+    break_damage = target.calculate_break_damage(hit.element, attacker)
+    defense_multiplier, _, _ = compute_defense_multiplier(attacker, target, skip_ignore_def=True, log=False)
+    resistance_modifier, _ = compute_resistance_multiplier(target, hit.element, 0)
+    independent_reduction, damage_taken_bonus = compute_target_modifiers(target, log=False)
+    damage = break_damage * defense_multiplier * resistance_modifier * independent_reduction * damage_taken_bonus
+    return HitOutcome(damage, damage, 0.0, "Break")
+
+
+class KillProbabilityCalculator:
+    """
+    击杀概率计算器。
+    hp_resolution: 记忆化时剩余HP的量化精度，默认 0.01 点HP，
+    增大该值可在命中种类很多时合并相近状态以控制状态数。
+    """
+
+    def __init__(self, action_outcomes: List[List[HitOutcome]], target_hp: float, hp_resolution: float = 0.01):
+        self.action_outcomes = action_outcomes
+        self.target_hp = target_hp
+        self.hp_resolution = hp_resolution
+        self.states_evaluated = 0
+        self.states_pruned = 0
+
+    @classmethod
+    def from_plan(cls, attacker: 'Character', target: 'Character', actions: Sequence[Union[PlannedHit, Sequence[PlannedHit]]],
+                  target_hp: Optional[float] = None, hp_resolution: float = 0.01) -> 'KillProbabilityCalculator':
+        if target_hp is None:
+            target_hp = target.hp if getattr(target, 'hp', None) else target.get_max_hp()
+        return cls(build_hit_outcomes(attacker, target, actions), target_hp, hp_resolution)
+
+    def kill_probability(self, k: Optional[int] = None) -> float:
+        """k 次行动内击杀目标的精确概率，k 默认为全部行动"""
+        k = len(self.action_outcomes) if k is None else min(k, len(self.action_outcomes))
+        hits = [hit for action in self.action_outcomes[:k] for hit in action]
+        return self._solve(hits)
+
+    def kill_probability_curve(self) -> List[float]:
+        """第 1..K 次行动内击杀的概率列表"""
+        return [self.kill_probability(k) for k in range(1, len(self.action_outcomes) + 1)]
+
+    def expected_actions_to_kill(self) -> Tuple[float, float]:
+        """
+        返回 (行动数期望, 计划内未能击杀的概率)。
+        期望按计划长度截断：计划内未击杀的情况按计划长度计入。
+        """
+        curve = self.kill_probability_curve()
+        expected = sum(1 - p for p in [0.0] + curve[:-1])
+        return expected, 1 - (curve[-1] if curve else 0.0)
+
+    def _solve(self, hits: List[HitOutcome]) -> float:
+        n = len(hits)
+        suffix_min = [0.0] * (n + 1)
+        suffix_max = [0.0] * (n + 1)
+        for i in range(n - 1, -1, -1):
+            low = min(hits[i].non_crit_damage, hits[i].crit_damage)
+            high = max(hits[i].non_crit_damage, hits[i].crit_damage)
+            suffix_min[i] = suffix_min[i + 1] + low
+            suffix_max[i] = suffix_max[i + 1] + high
+
+        resolution = self.hp_resolution
+        memo: Dict[Tuple[int, int], float] = {}
+
+        def solve(i: int, hp: float) -> float:
+            if hp <= 0:
+                return 1.0
+            # 剪枝: 必定击杀 / 不可能击杀
+            if suffix_min[i] >= hp:
+                self.states_pruned += 1
+                return 1.0
+            if suffix_max[i] < hp:
+                self.states_pruned += 1
+                return 0.0
+            key = (i, round(hp / resolution))
+            cached = memo.get(key)
+            if cached is not None:
+                return cached
+            self.states_evaluated += 1
+            hit = hits[i]
+            p = hit.crit_rate
+            result = 0.0
+            if p > 0:
+                result += p * solve(i + 1, hp - hit.crit_damage)
+            if p < 1:
+                result += (1 - p) * solve(i + 1, hp - hit.non_crit_damage)
+            memo[key] = result
+            return result
+
+        return solve(0, self.target_hp)
+
+
+def kill_probability_against(attacker: 'Character', enemy_id: str, actions: Sequence[Union[PlannedHit, Sequence[PlannedHit]]],
+                             k: Optional[int] = None, data_path: Optional[str] = None) -> float:
+    """便捷函数：对 processed_enemies.json 中的指定敌人计算 k 次行动内的击杀概率"""
+    data_path = data_path or os.path.join(os.path.dirname(__file__), '../../data')
+    enemy = load_enemy(enemy_id, os.path.join(data_path, 'processed_enemies.json'))
+    if enemy is None:
+        raise KeyError(f"未找到ID为 {enemy_id} 的敌人")
+    return KillProbabilityCalculator.from_plan(attacker, enemy, actions).kill_probability(k)
@@ -0,0 +1,85 @@
+# matchup.py - 队伍对单个敌人的批量对战
+"""
+用同一支队伍依次对战多个敌人（每场战斗只有一个敌人），汇总每个敌人的胜负、回合数与我方伤害。
+
+去重模式下先用 EnemyAliasTable 把敌人归并为战斗等价组：同组敌人只有 ID、名称等不影响战斗的字段不同，
+在同一随机种子下的战斗完全相同，因此每组只模拟规范敌人一次，结果复制给组内其他敌人
+（simulated=False，canonical_id 指向实际模拟的敌人）。
+"""
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from ..utils.enemy_dedup import EnemyAliasTable
+from ..utils.random_tape import BattleRandom
+from .batch_runner import quiet_output, run_battle_with
+
+# 前向声明以支持类型提示
+if False:
+    from ..core.battle import Battle
+
+ENEMY_CONFIG_KEYS = ("id", "name", "stats", "skills", "weaknesses", "resistances", "toughness", "max_toughness")
+
+
+@dataclass
+class MatchupResult:
+    """队伍对单个敌人的战斗结果"""
+    enemy_id: str
+    enemy_name: str
+    canonical_id: str
+    simulated: bool
+    winner: Optional[str]
+    turns: int
+    player_damage: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def enemy_config(enemy) -> Dict[str, Any]:
+    """敌人记录（processed_enemies.json 中的字典或加载后的 Enemy）转换为战斗配置中的敌人条目"""
+    if isinstance(enemy, dict):
+        return {key: enemy[key] for key in ENEMY_CONFIG_KEYS if key in enemy}
+    return {key: getattr(enemy, key) for key in ENEMY_CONFIG_KEYS if hasattr(enemy, key)}
+
+
+def _enemy_name(enemy, default: str) -> str:
+    return (enemy.get('name') if isinstance(enemy, dict) else getattr(enemy, 'name', None)) or default
+
+
+def run_matchups(make_battle: Callable[[Dict[str, Any]], 'Battle'], base_config: Dict[str, Any],
+                 enemies: Dict[str, Any], enemy_ids: Iterable,
+                 aliases: Optional[EnemyAliasTable] = None, seed: int = 0, max_turns: int = 10,
+                 dedupe: bool = True, quiet: bool = True) -> List[MatchupResult]:
+    """
+    让 base_config 中的队伍依次对战 enemy_ids 中的每个敌人，按 enemy_ids 的顺序返回结果。
+    enemies: {敌人ID: 敌人记录}，需包含 enemy_ids 中的全部敌人
+    make_battle: 由战斗配置创建战斗（如 lambda config: setup_battle_from_dict(config, game_data)）
+    aliases: 敌人别名表，dedupe 为 True 时每个战斗等价组只模拟一次；为 None 或 dedupe 为 False 时逐个模拟
+    每场战斗都使用 BattleRandom(seed)，保证同组敌人的结果可以直接复用。
+    """
+    enemy_ids = [str(enemy_id) for enemy_id in enemy_ids]
+    aliases = aliases if dedupe and aliases is not None else EnemyAliasTable()
+    simulated: Dict[str, MatchupResult] = {}  # {规范敌人ID: 该组实际模拟的结果}
+    results = []
+    for enemy_id in enemy_ids:
+        group = aliases.canonical(enemy_id)
+        if group not in simulated:
+            # 规范敌人没有记录时由组内第一个出现的敌人代为模拟
+            simulated_id = group if group in enemies else enemy_id
+            config = dict(base_config, enemies=[enemy_config(enemies[simulated_id])])
+            with quiet_output(quiet):
+                outcome = run_battle_with(lambda: make_battle(config), BattleRandom(seed), max_turns=max_turns)
+            simulated[group] = MatchupResult(
+                enemy_id=simulated_id, enemy_name=_enemy_name(enemies[simulated_id], simulated_id),
+                canonical_id=simulated_id, simulated=True, winner=outcome.winner, turns=outcome.turns,
+                player_damage=outcome.side_damage.get('player', 0.0))
+        base = simulated[group]
+        canonical_id = base.canonical_id
+        if enemy_id == canonical_id:
+            results.append(base)
+        else:
+            results.append(MatchupResult(
+                enemy_id=enemy_id, enemy_name=_enemy_name(enemies[enemy_id], enemy_id),
+                canonical_id=canonical_id, simulated=False, winner=base.winner, turns=base.turns,
+                player_damage=base.player_damage))
+    return results
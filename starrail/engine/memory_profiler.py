@@ -0,0 +1,318 @@
+# memory_profiler.py - 内存分析报告
+"""
+基于 tracemalloc 的内存分析：在数据加载（load_all_game_data）、战斗创建
+（setup_battle_from_config）与 Battle.run 前后拍摄快照，把各阶段结束后仍然存活的分配
+归属到模块与对象类别（敌人模板、Buff、伤害记录、日志等），并统计这些类的存活实例数。
+
+同一进程中重复运行多场战斗时，record_battle() 在每场战斗结束后记录存活内存，
+若每场战斗后的存活内存持续上涨超过阈值，则标记为疑似泄漏，并列出增长最多的模块。
+
+    profiler = MemoryProfiler()
+    with profiler:
+        with profiler.phase("load_all_game_data"):
+            game_data = load_all_game_data(data_folder)
+    print(profiler.report())
+
+tracemalloc 是进程级的，多线程并发运行战斗时各场战斗的分配无法区分。
+"""
+import contextlib
+import gc
+import linecache
+import os
+import tracemalloc
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_FRAMES = 6
+# 每场战斗后存活内存的平均增长超过该值（字节）时标记为疑似泄漏
+DEFAULT_GROWTH_THRESHOLD = 16 * 1024
+_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# (类别, 函数名集合, 模块文件名集合)，按调用栈由内向外第一个命中的规则归类
+CATEGORY_RULES: List[Tuple[str, frozenset, frozenset]] = [
+    ("logs", frozenset(), frozenset({"logger.py", "log_sink.py"})),
+    ("Buff", frozenset(), frozenset({"buff.py"})),
+    ("DamageInstance", frozenset(), frozenset({"damage_system.py", "hit_record.py"})),
+    ("Enemy", frozenset({"load_processed_enemies", "load_enemy_templates", "create_enemy_from_template"}),
+     frozenset({"enemy.py"})),
+    ("light_cones", frozenset({"load_light_cones"}), frozenset()),
+    ("relics", frozenset({"load_relics"}), frozenset()),
+    ("skills", frozenset({"load_skills"}), frozenset({"skill.py", "base_skill.py"})),
+    ("characters", frozenset({"load_characters"}), frozenset({"character.py"})),
+]
+# 统计存活实例数的类名
+TRACKED_TYPES = ("Enemy", "Character", "Buff", "DamageInstance", "HitRecord")
+_IGNORED_FILES = (tracemalloc.__file__, linecache.__file__, __file__)
+
+
+def module_name(filename: str) -> str:
+    """把源文件路径转换为模块名，标准库文件保留最后两级路径"""
+    if filename.startswith("<"):
+        return filename
+    path = os.path.abspath(filename)
+    parts = path.split(os.sep)
+    if path.startswith(_ROOT + os.sep):
+        parts = os.path.relpath(path, _ROOT).split(os.sep)
+    elif "site-packages" in parts:
+        parts = parts[parts.index("site-packages") + 1:]
+    else:
+        return "/".join(parts[-2:])
+    return ".".join(parts)[:-len(".py")] if path.endswith(".py") else ".".join(parts)
+
+
+# 调用栈帧: (文件名, 行号)，与 tracemalloc 内部格式一致
+FrameKey = Tuple[str, int]
+
+
+def _is_log_line(frame: FrameKey) -> bool:
+    """print / logger 调用所在行分配的内存（格式化字符串、输出缓冲）归为日志"""
+    line = linecache.getline(*frame).strip()
+    return line.startswith("print(") or line.startswith("logger.")
+
+
+def classify_traceback(frames: Iterable[FrameKey]) -> str:
+    """frames 为自内向外的 (文件名, 行号) 序列，返回最内层命中的类别"""
+    frames = list(frames)
+    if frames and _is_log_line(frames[0]):
+        return "logs"
+    for frame in frames:
+        filename = os.path.basename(frame[0])
+        func = _enclosing_function(frame)
+        for name, funcs, files in CATEGORY_RULES:
+            if filename in files or func in funcs:
+                return name
+    return "other"
+
+
+_function_cache: Dict[FrameKey, Optional[str]] = {}
+
+
+def _enclosing_function(frame: FrameKey) -> Optional[str]:
+    """tracemalloc 的帧不带函数名，从源码中向上查找包含该行的顶层函数名"""
+    if frame in _function_cache:
+        return _function_cache[frame]
+    filename, lineno = frame
+    name = None
+    for lineno in range(lineno, 0, -1):
+        line = linecache.getline(filename, lineno)
+        if line.startswith("def "):
+            name = line[4:].split("(", 1)[0].strip()
+            break
+        if line.startswith("class "):
+            break
+    _function_cache[frame] = name
+    return name
+
+
+def _sizes_by_traceback(snapshot: tracemalloc.Snapshot) -> Counter:
+    """
+    按调用栈汇总快照中的分配大小，键为自内向外的帧元组。
+    直接统计快照的原始记录：数据加载后有数十万条分配，
+    Snapshot.filter_traces / compare_to 逐条构造对象要花费数十秒，
+    而相同 (大小, 调用栈) 的记录只有上千种，先计数再汇总快得多。
+    原始记录（Snapshot.traces._traces）不是公开接口，格式不符时改用公开的 Snapshot.statistics。
+    """
+    sizes: Counter = Counter()
+    raw_traces = getattr(getattr(snapshot, "traces", None), "_traces", None)
+    try:
+        if raw_traces is None:
+            raise TypeError("tracemalloc 快照没有原始记录")
+        for (_, size, traceback, _), n in Counter(raw_traces).items():
+            sizes[traceback] += size * n
+    except (TypeError, ValueError):
+        sizes.clear()
+        for stat in snapshot.statistics("traceback"):
+            # 公开的 Traceback 自外向内排列
+            sizes[tuple((frame.filename, frame.lineno) for frame in reversed(stat.traceback))] += stat.size
+    for traceback in [tb for tb in sizes if tb and tb[0][0] in _IGNORED_FILES]:
+        del sizes[traceback]
+    return sizes
+
+
+def resident_memory() -> Optional[int]:
+    """当前进程的常驻内存（字节），读取 /proc/self/statm，不支持的平台返回 None"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def count_live_objects(type_names: Iterable[str] = TRACKED_TYPES) -> Dict[str, int]:
+    """按类名统计由垃圾回收器跟踪的存活实例数（含子类实例）"""
+    wanted = set(type_names)
+    by_type = Counter(map(type, gc.get_objects()))
+    counts: Counter = Counter()
+    for cls, n in by_type.items():
+        for base in cls.__mro__:
+            if base.__name__ in wanted:
+                counts[base.__name__] += n
+    return {name: counts.get(name, 0) for name in type_names}
+
+
+@dataclass
+class PhaseReport:
+    """单个阶段的内存变化。retained 为阶段结束后仍存活的新增内存，peak 为阶段内的峰值增量"""
+    name: str
+    calls: int = 0
+    retained: int = 0
+    peak: int = 0
+    by_module: Counter = field(default_factory=Counter)
+    by_category: Counter = field(default_factory=Counter)
+    objects: Dict[str, int] = field(default_factory=dict)
+
+
+class MemoryProfiler:
+    """
+    tracemalloc 内存分析器。
+    frames: 每次分配保存的调用栈深度，越深归类越准确，开销也越大
+    growth_threshold: 每场战斗存活内存平均增长的报警阈值（字节）
+    """
+
+    def __init__(self, frames: int = DEFAULT_FRAMES, growth_threshold: int = DEFAULT_GROWTH_THRESHOLD):
+        self.frames = frames
+        self.growth_threshold = growth_threshold
+        self.phases: Dict[str, PhaseReport] = {}
+        self.battle_memory: List[int] = []
+        self._baseline: Optional[Counter] = None
+        self._latest: Optional[Counter] = None
+        self._started_tracing = False
+        # 嵌套阶段会重置 tracemalloc 的峰值，外层阶段的峰值由内层结束时回传
+        self._peaks: List[int] = []
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started_tracing = True
+
+    def stop(self):
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def __enter__(self) -> 'MemoryProfiler':
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _snapshot(self) -> Counter:
+        gc.collect()
+        return _sizes_by_traceback(tracemalloc.take_snapshot())
+
+    @contextlib.contextmanager
+    def phase(self, name: str, detail: bool = True):
+        """
+        记录一个阶段的内存变化，同名阶段多次进入时累加。
+        detail 为 False 时只记录存活/峰值增量，不拍快照（适合每场战斗都要经过的阶段）
+        """
+        report = self.phases.get(name)
+        if report is None:
+            report = self.phases[name] = PhaseReport(name)
+        before = self._snapshot() if detail else None
+        objects_before = count_live_objects() if detail else None
+        gc.collect()
+        start_current, outer_peak = tracemalloc.get_traced_memory()
+        if self._peaks:
+            self._peaks[-1] = max(self._peaks[-1], outer_peak)
+        tracemalloc.reset_peak()
+        self._peaks.append(0)
+        try:
+            yield report
+        finally:
+            peak = max(self._peaks.pop(), tracemalloc.get_traced_memory()[1])
+            if self._peaks:
+                self._peaks[-1] = max(self._peaks[-1], peak)
+            gc.collect()
+            retained, _ = tracemalloc.get_traced_memory()
+            report.calls += 1
+            report.retained += retained - start_current
+            report.peak = max(report.peak, peak - start_current)
+            if detail:
+                after = self._snapshot()
+                after.subtract(before)
+                self._attribute(after, report)
+                for type_name, value in count_live_objects().items():
+                    report.objects[type_name] = report.objects.get(type_name, 0) + value - objects_before[type_name]
+
+    @staticmethod
+    def _attribute(diffs: Counter, report: PhaseReport):
+        for traceback, size in diffs.items():
+            if size == 0 or not traceback:
+                continue
+            report.by_module[module_name(traceback[0][0])] += size
+            report.by_category[classify_traceback(traceback)] += size
+
+    def record_battle(self, last: bool = False):
+        """
+        在每场战斗结束后调用，记录当前存活内存。
+        第一场之后的快照作为增长比较的基线，last 为 True 时拍摄用于比较的最终快照
+        """
+        gc.collect()
+        current, _ = tracemalloc.get_traced_memory()
+        self.battle_memory.append(current)
+        if len(self.battle_memory) == 1:
+            self._baseline = self._snapshot()
+        elif last:
+            self._latest = self._snapshot()
+
+    def growth(self) -> Dict:
+        """
+        返回跨战斗的存活内存增长:
+        per_battle: 第一场之后每场战斗的平均增长（字节），leak_suspected: 是否超过阈值
+        top_modules: 相对第一场增长最多的模块
+        """
+        n = len(self.battle_memory)
+        per_battle = (self.battle_memory[-1] - self.battle_memory[0]) / (n - 1) if n > 1 else 0.0
+        top_modules: List[Tuple[str, int]] = []
+        if self._baseline is not None and self._latest is not None and n > 1:
+            growth: Counter = Counter()
+            for traceback, size in self._latest.items():
+                growth[module_name(traceback[0][0])] += size
+            for traceback, size in self._baseline.items():
+                growth[module_name(traceback[0][0])] -= size
+            top_modules = [(name, size) for name, size in growth.most_common(5) if size > 0]
+        return {
+            "battles": n,
+            "per_battle": per_battle,
+            "total": self.battle_memory[-1] - self.battle_memory[0] if n else 0,
+            "leak_suspected": n > 1 and per_battle > self.growth_threshold,
+            "top_modules": top_modules,
+        }
+
+    def report(self, top_n: int = 5) -> str:
+        lines = ["🧠 内存分析报告"]
+        for report in self.phases.values():
+            calls = f" ×{report.calls}" if report.calls > 1 else ""
+            lines.append(f"  ▶ {report.name}{calls}: 存活 {_format_size(report.retained)}, 峰值增量 {_format_size(report.peak)}")
+            if report.by_category:
+                lines.append("    按类别: " + ", ".join(
+                    f"{name} {_format_size(size)}" for name, size in report.by_category.most_common(top_n)))
+            if report.by_module:
+                lines.append("    按模块: " + ", ".join(
+                    f"{name} {_format_size(size)}" for name, size in report.by_module.most_common(top_n)))
+            objects = {name: value for name, value in report.objects.items() if value}
+            if objects:
+                lines.append("    存活实例: " + ", ".join(f"{name} {value:+d}" for name, value in objects.items()))
+        growth = self.growth()
+        if growth["battles"] > 1:
+            lines.append(f"  ▶ 跨 {growth['battles']} 场战斗: 存活内存共增长 {_format_size(growth['total'])}, "
+                         f"平均每场 {_format_size(growth['per_battle'])}")
+            if growth["top_modules"]:
+                lines.append("    增长最多: " + ", ".join(
+                    f"{name} {_format_size(size)}" for name, size in growth["top_modules"]))
+            if growth["leak_suspected"]:
+                lines.append(f"⚠️  每场战斗后的存活内存持续增长（阈值 {_format_size(self.growth_threshold)}/场），疑似泄漏。")
+        return "\n".join(lines)
+
+
+def _format_size(size: float) -> str:
+    sign = "-" if size < 0 else ""
+    size = abs(size)
+    for unit in ("B", "KiB", "MiB"):
+        if size < 1024:
+            return f"{sign}{size:.0f}{unit}" if unit == "B" else f"{sign}{size:.1f}{unit}"
+        size /= 1024
+    return f"{sign}{size:.1f}GiB"
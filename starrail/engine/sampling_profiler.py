@@ -0,0 +1,188 @@
+# sampling_profiler.py - 采样式性能分析
+"""
+按固定间隔读取被测线程的 Python 调用栈，
+把调用栈折叠成 "根;...;叶 次数" 的 collapsed-stack 格式，
+可直接交给 flamegraph.pl / speedscope / inferno 等工具生成火焰图。
+
+与确定性分析（cProfile）不同，get_current_stats 这类又小又频繁的调用
+不会因为逐次插桩而被放大，适合分析生产规模的批量运行。
+每个样本的根节点标注引擎阶段（属性计算、伤害、技能、AI、钩子、日志、调度等），
+以调用栈中最内层命中的规则为准。
+
+只采样主线程时（POSIX 平台）用 SIGPROF 定时器在主线程自身的字节码边界处取样；
+后台采样线程只能在被测线程释放 GIL 时取得 GIL，样本会集中在 isatty、文件写入等释放 GIL 的调用上。
+采样其他线程或所有线程时由后台线程读取 sys._current_frames。
+
+最内层帧停在线程/Future/队列等待上的样本（如主线程在 executor.map 中等待结果、空闲的工作线程）
+不代表引擎的耗时，直接丢弃并单独计数。多线程采样时 sys._current_frames 无法区分正在运行的线程
+与等待 GIL 的线程，等待 GIL 的样本会计入其所停留的调用（常见于 isatty、文件写入等释放 GIL 的调用）。
+"""
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_INTERVAL = 0.005
+
+# (阶段, 函数名集合, 模块文件名集合)
+PHASE_RULES: List[Tuple[str, frozenset, frozenset]] = [
+    ("stat_calc", frozenset({"get_current_stats", "calc_total_stats", "finalize_stats", "get_max_hp"}), frozenset()),
+    ("damage", frozenset({"full_damage_calc", "damage_calc_attack_side", "damage_calc_defense_side",
+                          "break_damage_calc", "defense_reduction", "calculate_damage"}),
+     frozenset({"multiplier_cache.py", "damage_system.py"})),
+    ("heal", frozenset({"calculate_final_heal"}), frozenset({"heal_system.py"})),
+    ("ai", frozenset({"should_cast_ultimate"}), frozenset({"ai_strategies.py"})),
+    ("hooks", frozenset(), frozenset({"light_cone_skill.py", "relic_set_skill.py"})),
+    ("logging", frozenset(), frozenset({"logger.py", "log_sink.py"})),
+    ("skills", frozenset(), frozenset({"skill_manager.py", "skill.py", "base_skill.py", "effects.py", "skill_effect_system.py",
+                                       "seele_skills.py", "bronya_skills.py", "natasha_skills.py"})),
+    ("setup", frozenset({"setup_battle_from_config", "load_all_game_data"}), frozenset({"data_loader.py"})),
+    # 只按文件匹配：run/_run 等函数名过于常见（threading.Thread.run、_WorkItem.run 等）
+    ("scheduler", frozenset(), frozenset({"battle.py"})),
+]
+
+# 最内层帧为这些 (文件名, 函数名) 时视为线程空闲等待
+IDLE_FRAMES = frozenset({
+    ("threading.py", "wait"), ("threading.py", "_wait_for_tstate_lock"), ("threading.py", "join"),
+    ("_base.py", "wait"), ("_base.py", "result"), ("thread.py", "_worker"),
+    ("queue.py", "get"), ("selectors.py", "select"),
+})
+
+
+def classify_phase(frames: Iterable[Tuple[str, str]]) -> str:
+    """frames 为自外向内的 (文件名, 函数名) 序列，返回最内层命中的引擎阶段"""
+    phase = "other"
+    for filename, func in frames:
+        for name, funcs, files in PHASE_RULES:
+            if func in funcs or filename in files:
+                phase = name
+                break
+    return phase
+
+
+class SamplingProfiler:
+    """
+    采样分析器。
+    interval: 采样间隔（秒）
+    all_threads: 为 False 时只采样调用 start() 的线程，为 True 时采样除自身外的所有线程
+    """
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL, all_threads: bool = False):
+        self.interval = interval
+        self.all_threads = all_threads
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.idle_samples = 0
+        self.duration = 0.0
+        self._target_id: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started_at = 0.0
+        self._labels: Dict[object, Tuple[str, str, str]] = {}
+        self._signal_mode = False
+        self._previous_handler = None
+
+    def _use_signal(self) -> bool:
+        return (not self.all_threads and hasattr(signal, "setitimer")
+                and threading.current_thread() is threading.main_thread())
+
+    def start(self):
+        self._target_id = threading.get_ident()
+        self._stop.clear()
+        self._started_at = time.perf_counter()
+        if self._use_signal():
+            self._signal_mode = True
+            self._previous_handler = signal.signal(signal.SIGPROF, self._on_signal)
+            signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+            return
+        self._thread = threading.Thread(target=self._sample_loop, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._signal_mode:
+            signal.setitimer(signal.ITIMER_PROF, 0)
+            signal.signal(signal.SIGPROF, self._previous_handler or signal.SIG_DFL)
+            self._signal_mode = False
+        elif self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        else:
+            return
+        self.duration += time.perf_counter() - self._started_at
+
+    def __enter__(self) -> 'SamplingProfiler':
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _label(self, code) -> Tuple[str, str, str]:
+        label = self._labels.get(code)
+        if label is None:
+            filename = os.path.basename(code.co_filename)
+            label = (filename, code.co_name, f"{code.co_name} ({filename})")
+            self._labels[code] = label
+        return label
+
+    def _on_signal(self, signum, frame):
+        if frame is not None:
+            self._record(frame)
+
+    def _sample_loop(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            if self.all_threads:
+                targets = [frame for ident, frame in frames.items() if ident != own_id]
+            else:
+                frame = frames.get(self._target_id)
+                targets = [frame] if frame is not None else []
+            for frame in targets:
+                self._record(frame)
+            del frames, targets
+
+    def _record(self, frame):
+        if self._label(frame.f_code)[:2] in IDLE_FRAMES:
+            self.idle_samples += 1
+            return
+        labels = []
+        while frame is not None:
+            labels.append(self._label(frame.f_code))
+            frame = frame.f_back
+        labels.reverse()
+        phase = classify_phase((filename, func) for filename, func, _ in labels)
+        self.stacks[";".join([f"phase:{phase}"] + [text for _, _, text in labels])] += 1
+        self.samples += 1
+
+    def phase_summary(self) -> Dict[str, float]:
+        """各引擎阶段的样本占比"""
+        totals: Counter = Counter()
+        for stack, count in self.stacks.items():
+            totals[stack.split(";", 1)[0][len("phase:"):]] += count
+        total = sum(totals.values()) or 1
+        return {phase: count / total for phase, count in totals.most_common()}
+
+    def collapsed_lines(self) -> List[str]:
+        return [f"{stack} {count}" for stack, count in sorted(self.stacks.items())]
+
+    def write_collapsed(self, path: str):
+        """写出 collapsed-stack 格式文件（flamegraph.pl 的输入格式）"""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            for line in self.collapsed_lines():
+                f.write(line + "\n")
+
+    def report(self) -> str:
+        lines = [f"🔬 采样分析: {self.samples} 个样本, 间隔 {self.interval * 1000:.1f}ms, 耗时 {self.duration:.2f}s"
+                 f"（另丢弃 {self.idle_samples} 个线程等待样本）"]
+        if self.all_threads:
+            lines.append("    ⚠️  多线程采样包含等待 GIL 的线程，其样本计入所停留的调用（如 isatty、文件写入）")
+        for phase, share in self.phase_summary().items():
+            lines.append(f"    {phase}: {share * 100:.1f}%")
+        return "\n".join(lines)
@@ -0,0 +1,207 @@
+# stress.py - 大规模战斗的压力与扩展性基准
+"""
+用 characters.json 中带技能的角色与 processed_enemies.json 中的敌人模板生成 4~100 个单位的战斗，
+并可为每个单位预先挂上大量常驻 Buff，测量每秒行动数随单位数与 Buff 数的变化曲线。
+
+为了让单位数在测量期间保持稳定，敌人的生命值放大 ENEMY_HP_SCALE 倍、攻击力缩小为 ENEMY_ATK_SCALE 倍，
+双方都不会在测量的回合内阵亡。find_cliffs 按相邻两点的单次行动耗时计算扩展指数
+（耗时 ∝ 单位数^指数），指数超过阈值的区间即为扩展性断崖。每回合的行动数与单位数成正比，
+单次行动的指数为 1 即每回合耗时按单位数平方增长，默认阈值 1.0 正好标出这种二次增长。
+"""
+import math
+import platform
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from ..core.skills.buff import Buff
+from ..utils import metrics
+from ..utils.random_tape import BattleRandom
+from .batch_runner import quiet_output
+
+# 前向声明以支持类型提示
+if False:
+    from ..core.battle import Battle
+
+SCHEMA_VERSION = 1
+DEFAULT_UNIT_COUNTS = (4, 8, 16, 32, 64, 100)
+DEFAULT_BUFF_COUNTS = (0, 50, 200)
+DEFAULT_TURNS = 2
+DEFAULT_REPEATS = 3
+DEFAULT_CLIFF_EXPONENT = 1.0
+ENEMY_HP_SCALE = 1000.0
+ENEMY_ATK_SCALE = 0.01
+# 压力 Buff 轮流使用的属性，数值很小，不改变行动顺序
+STRESS_BUFF_STATS = ("ATK%", "DEF%", "HP%", "CRIT Rate", "CRIT DMG")
+
+
+def stress_battle_config(game_data: Dict[str, Any], unit_count: int, rng: random.Random) -> Dict[str, Any]:
+    """
+    生成 unit_count 个单位的战斗配置，我方与敌方各占一半（奇数时敌方多一个）。
+    我方循环使用带技能的角色，敌人从敌人模板中随机挑选。
+    """
+    characters = sorted((c for c in game_data['characters']
+                         if c.side == 'player' and any(sid in game_data['skills'] for sid in c.skills)),
+                        key=lambda c: c.id)
+    templates = sorted(game_data['enemy_templates'].values(), key=lambda t: str(t.get('id')))
+    if not characters or not templates:
+        raise ValueError("游戏数据中没有可用的角色或敌人模板")
+    player_count = unit_count // 2
+    enemy_count = unit_count - player_count
+
+    team = [{"id": characters[i % len(characters)].id, "name": characters[i % len(characters)].name}
+            for i in range(player_count)]
+    chosen = rng.sample(templates, enemy_count) if enemy_count <= len(templates) else rng.choices(templates, k=enemy_count)
+    enemies = []
+    for index, template in enumerate(chosen):
+        stats = dict(template.get('stats', {}))
+        stats['HP'] = stats.get('HP', 1) * ENEMY_HP_SCALE
+        stats['ATK'] = stats.get('ATK', 0) * ENEMY_ATK_SCALE
+        enemies.append({
+            "id": template['id'],
+            "name": f"{template['name']}#{index}",
+            "stats": stats,
+            "weaknesses": template.get('weaknesses', []),
+            "resistances": template.get('resistances', {}),
+            "toughness": template.get('toughness', 100),
+            "max_toughness": template.get('max_toughness', 100),
+        })
+    return {"team": team, "enemies": enemies}
+
+
+def add_stress_buffs(battle: 'Battle', buffs_per_unit: int):
+    """为每个单位添加 buffs_per_unit 个互不同名的常驻 Buff"""
+    for character in battle.characters:
+        for i in range(buffs_per_unit):
+            stat = STRESS_BUFF_STATS[i % len(STRESS_BUFF_STATS)]
+            character.add_buff(Buff(name=f"Stress Buff {i}", duration=-1, stat_bonus={stat: 0.0001}))
+
+
+@dataclass
+class ScalingPoint:
+    """一个 (单位数, 每单位 Buff 数) 组合的测量结果，seconds 为多轮中最快的一轮"""
+    units: int
+    buffs_per_unit: int
+    actions: int
+    ticks: int
+    seconds: float
+    setup_seconds: float
+
+    @property
+    def actions_per_sec(self) -> float:
+        return self.actions / self.seconds if self.seconds > 0 else 0.0
+
+    @property
+    def us_per_action(self) -> float:
+        return self.seconds / self.actions * 1e6 if self.actions else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "units": self.units,
+            "buffs_per_unit": self.buffs_per_unit,
+            "actions": self.actions,
+            "ticks": self.ticks,
+            "seconds": round(self.seconds, 6),
+            "setup_seconds": round(self.setup_seconds, 6),
+            "actions_per_sec": round(self.actions_per_sec, 3),
+            "us_per_action": round(self.us_per_action, 3),
+        }
+
+
+def measure_point(build_battle: Callable[[Dict[str, Any]], 'Battle'], game_data: Dict[str, Any], units: int,
+                  buffs_per_unit: int = 0, turns: int = DEFAULT_TURNS, repeats: int = DEFAULT_REPEATS,
+                  seed: int = 0) -> ScalingPoint:
+    """多轮运行同一场压力战斗（相同配置与种子），取最快的一轮"""
+    config = stress_battle_config(game_data, units, random.Random(seed))
+    best: Optional[ScalingPoint] = None
+    for _ in range(repeats):
+        with quiet_output():
+            start = time.perf_counter()
+            battle = build_battle(config)
+            add_stress_buffs(battle, buffs_per_unit)
+            setup_seconds = time.perf_counter() - start
+            battle.rng = BattleRandom(seed)
+            start = time.perf_counter()
+            battle.run(max_turns=turns)
+            seconds = time.perf_counter() - start
+        point = ScalingPoint(units, buffs_per_unit, battle.metrics.get(metrics.ACTIONS),
+                             battle.metrics.get(metrics.SCHEDULER_TICKS), seconds, setup_seconds)
+        if best is None or point.seconds < best.seconds:
+            best = point
+    return best
+
+
+def run_scaling(build_battle: Callable[[Dict[str, Any]], 'Battle'], game_data: Dict[str, Any],
+                unit_counts: Sequence[int] = DEFAULT_UNIT_COUNTS, buff_counts: Sequence[int] = DEFAULT_BUFF_COUNTS,
+                turns: int = DEFAULT_TURNS, repeats: int = DEFAULT_REPEATS, seed: int = 0,
+                progress: Optional[Callable[[ScalingPoint], None]] = None) -> List[ScalingPoint]:
+    """依次测量所有 (Buff 数, 单位数) 组合"""
+    points = []
+    for buffs in buff_counts:
+        for units in unit_counts:
+            point = measure_point(build_battle, game_data, units, buffs, turns, repeats, seed)
+            points.append(point)
+            if progress:
+                progress(point)
+    return points
+
+
+@dataclass
+class Cliff:
+    """相邻两个测量点之间单次行动耗时增长过快的区间"""
+    buffs_per_unit: int
+    from_units: int
+    to_units: int
+    exponent: float
+
+
+def find_cliffs(points: List[ScalingPoint], threshold: float = DEFAULT_CLIFF_EXPONENT) -> List[Cliff]:
+    """
+    同一 Buff 数下按单位数排序，计算单次行动耗时的扩展指数 log(t2/t1) / log(n2/n1)。
+    单次行动的指数超过 1 时每回合耗时的增长快于单位数的平方（如每次行动遍历全部单位的
+    characters / action_progress 循环），超过 threshold 视为断崖。
+    """
+    cliffs = []
+    by_buffs: Dict[int, List[ScalingPoint]] = {}
+    for point in points:
+        by_buffs.setdefault(point.buffs_per_unit, []).append(point)
+    for buffs, series in sorted(by_buffs.items()):
+        series.sort(key=lambda p: p.units)
+        for prev, point in zip(series, series[1:]):
+            if prev.us_per_action <= 0 or point.us_per_action <= 0 or point.units == prev.units:
+                continue
+            exponent = math.log(point.us_per_action / prev.us_per_action) / math.log(point.units / prev.units)
+            if exponent > threshold:
+                cliffs.append(Cliff(buffs, prev.units, point.units, exponent))
+    return cliffs
+
+
+def build_scaling_report(points: List[ScalingPoint], turns: int, threshold: float = DEFAULT_CLIFF_EXPONENT) -> Dict[str, Any]:
+    return {
+        "schema": SCHEMA_VERSION,
+        "environment": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+        },
+        "turns": turns,
+        "cliff_exponent": threshold,
+        "points": [point.to_dict() for point in points],
+        "cliffs": [vars(cliff) for cliff in find_cliffs(points, threshold)],
+    }
+
+
+def format_curves(points: List[ScalingPoint], width: int = 40) -> str:
+    """按 Buff 数分组输出每秒行动数曲线（文本条形图）"""
+    lines = []
+    peak = max((p.actions_per_sec for p in points), default=0) or 1
+    by_buffs: Dict[int, List[ScalingPoint]] = {}
+    for point in points:
+        by_buffs.setdefault(point.buffs_per_unit, []).append(point)
+    for buffs, series in sorted(by_buffs.items()):
+        lines.append(f"📈 每单位 {buffs} 个 Buff")
+        for point in sorted(series, key=lambda p: p.units):
+            bar = "█" * max(1, round(point.actions_per_sec / peak * width))
+            lines.append(f"  {point.units:>4} 单位 {point.actions_per_sec:>10.1f} 行动/s {point.us_per_action:>10.1f}µs/行动  {bar}")
+    return "\n".join(lines)
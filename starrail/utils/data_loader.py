@@ -1,23 +1,91 @@
 # updated_data_loader.py
 import json
 import os
+import sys
 from starrail.core.character import Character
 from starrail.core.enemy import Enemy
 from starrail.core.light_cones.light_cone import LightCone
 from starrail.core.relics.relic import Relic
+from starrail.utils.json_index import IndexedJsonFile
+from starrail.utils.json_stream import iter_json_array
+from starrail.utils.enemy_dedup import EnemyAliasTable, cached_alias_table
+from starrail.utils.enemy_table import open_enemy_table
+from starrail.utils.game_db import GameDatabase
+
+class DataInterner:
+    """
+    加载时压缩游戏数据：驻留属性名、元素名、命途名等字符串，
+    并让内容相同的弱点列表与抗性字典共享同一个对象（同一次加载中的所有敌人与敌人模板共用）。
+    共享的弱点/抗性结构只读，需要修改时应整体替换而不是原地修改。
+    enabled 为 False 时原样返回，用于对比内存占用。
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._weaknesses = {}
+        self._resistances = {}
+
+    def name(self, value):
+        return sys.intern(value) if self.enabled and isinstance(value, str) else value
+
+    def keys(self, mapping):
+        """返回键已驻留的新字典（各对象独立持有，可修改）"""
+        if not self.enabled:
+            return dict(mapping)
+        return {sys.intern(k) if isinstance(k, str) else k: v for k, v in mapping.items()}
+
+    def weaknesses(self, items):
+        if not self.enabled:
+            return items
+        key = tuple(self.name(item) for item in items)
+        shared = self._weaknesses.get(key)
+        if shared is None:
+            shared = self._weaknesses[key] = list(key)
+        return shared
+
+    def resistances(self, mapping):
+        if not self.enabled:
+            return mapping
+        key = tuple((self.name(k), v) for k, v in mapping.items())
+        shared = self._resistances.get(key)
+        if shared is None:
+            shared = self._resistances[key] = dict(key)
+        return shared
+
+    def fields(self, item, names):
+        """原地驻留刚解析出的记录中指定字段的字符串值（如元素、命途），返回该记录"""
+        if self.enabled:
+            for name in names:
+                if isinstance(item.get(name), str):
+                    item[name] = sys.intern(item[name])
+        return item
+
+    def stat_list(self, entries):
+        """驻留遗器副属性列表 [{"stat": 名称, "value": 数值}] 中的属性名"""
+        if not self.enabled:
+            return entries
+        return [{**entry, "stat": self.name(entry["stat"])} for entry in entries]
+
+    def shared_counts(self):
+        return {"weaknesses": len(self._weaknesses), "resistances": len(self._resistances)}
+
 
 def load_json(path):
     """加载JSON文件"""
     with open(path, 'r', encoding='utf-8') as f:
         return json.load(f)
 
-def load_skills(path):
+SKILL_NAME_FIELDS = ('element', 'type', 'damage_type', 'attack_type')
+
+def load_skills(path, interner=None):
     """加载技能数据"""
+    interner = interner or DataInterner()
     data = load_json(path)
-    return {item['id']: item for item in data}
+    return {item['id']: interner.fields(item, SKILL_NAME_FIELDS) for item in data}
 
-def load_light_cones(light_cones_path, light_cone_skills_path=None):
+def load_light_cones(light_cones_path, light_cone_skills_path=None, interner=None):
     """加载光锥数据"""
+    interner = interner or DataInterner()
     data = load_json(light_cones_path)
     skills = {}
     if light_cone_skills_path:
@@ -27,16 +95,19 @@ def load_light_cones(light_cones_path, light_cone_skills_path=None):
     light_cones = {}
     for item in data:
         skill_data = skills.get(item.get('skill_id')) if skills else None
-        light_cones[item['id']] = LightCone(
-            id=item['id'],
-            name=item['name'],
-            stats=item.get('stats', {}),
-            skill=skill_data,
-            path=item.get('path'),
-            skill_data=skill_data
-        )
+        light_cones[item['id']] = _light_cone_from_item(item, skill_data, interner)
     return light_cones
 
+def _light_cone_from_item(item, skill_data, interner):
+    return LightCone(
+        id=item['id'],
+        name=item['name'],
+        stats=interner.keys(item.get('stats', {})),
+        skill=skill_data,
+        path=interner.name(item.get('path')),
+        skill_data=skill_data
+    )
+
 PERCENT_STATS = {
     "CRIT Rate", "CRIT DMG", "Effect Hit Rate", "Effect RES",
     "Break Effect", "Outgoing Healing Boost", "Energy Regeneration Rate"
@@ -48,117 +119,154 @@ def normalize_stat(stat, value):
         return value / 100
     return value
 
-def load_relics(path):
+def iter_relic_items(path):
+    """流式逐条产出遗器存档（顶层为对象时取 "relics" 字段，也可以是遗器数组）中的原始记录"""
+    with open(path, 'r', encoding='utf-8') as f:
+        yield from iter_json_array(f, 'relics')
+
+def iter_relics(path, interner=None):
+    """流式逐件产出遗器，每条记录创建 Relic 后即丢弃，不保留整个存档的解析结果"""
+    interner = interner or DataInterner()
+    for item in iter_relic_items(path):
+        yield _relic_from_item(item, interner)
+
+def load_relics(path, interner=None):
     """加载遗器数据"""
+    return {relic.id: relic for relic in iter_relics(path, interner)}
+
+def _relic_from_item(item, interner):
+    """由遗器存档中的单条记录创建遗器"""
+    # 兼容主属性格式
+    main_stat = {}
+    if "main" in item and "stat" in item["main"] and "value" in item["main"]:
+        stat = item["main"]["stat"]
+        value = item["main"]["value"]
+        main_stat[interner.name(stat)] = normalize_stat(stat, value)
+    # 兼容副属性格式
+    sub_stats = []
+    if "substats" in item:
+        for sub in item["substats"]:
+            if isinstance(sub, dict) and "stat" in sub and "value" in sub:
+                stat = sub["stat"]
+                value = sub["value"]
+                sub_stats.append({"stat": stat, "value": normalize_stat(stat, value)})
+    elif "sub_stats" in item:
+        for sub in item["sub_stats"]:
+            if isinstance(sub, dict) and "stat" in sub and "value" in sub:
+                stat = sub["stat"]
+                value = sub["value"]
+                sub_stats.append({"stat": stat, "value": normalize_stat(stat, value)})
+    return Relic(
+        id=item['id'],
+        name=item.get('name', item.get('set', '')),
+        main_stat=main_stat,
+        sub_stats=interner.stat_list(sub_stats),
+        set_name=interner.name(item.get('set')),
+        slot=interner.name(item.get('part'))
+    )
+
+def load_characters(path, skills_dict, light_cones_dict=None, interner=None):
+    """加载角色数据"""
+    interner = interner or DataInterner()
     data = load_json(path)
-    if isinstance(data, dict) and "relics" in data:
-        data = data["relics"]
-    relics = {}
-    for item in data:
-        # 兼容主属性格式
-        main_stat = {}
-        if "main" in item and "stat" in item["main"] and "value" in item["main"]:
-            stat = item["main"]["stat"]
-            value = item["main"]["value"]
-            main_stat[stat] = normalize_stat(stat, value)
-        # 兼容副属性格式
-        sub_stats = []
-        if "substats" in item:
-            for sub in item["substats"]:
-                if isinstance(sub, dict) and "stat" in sub and "value" in sub:
-                    stat = sub["stat"]
-                    value = sub["value"]
-                    sub_stats.append({"stat": stat, "value": normalize_stat(stat, value)})
-        elif "sub_stats" in item:
-            for sub in item["sub_stats"]:
-                if isinstance(sub, dict) and "stat" in sub and "value" in sub:
-                    stat = sub["stat"]
-                    value = sub["value"]
-                    sub_stats.append({"stat": stat, "value": normalize_stat(stat, value)})
-        relics[item['id']] = Relic(
+    return [_character_from_item(item, light_cones_dict, interner) for item in data]
+
+def _character_from_item(item, light_cones_dict=None, interner=None):
+    """由 characters.json 中的单条记录创建角色（side 为 enemy 时创建敌人）"""
+    # 只保留技能ID列表
+    char_skills = item['skills']
+    side = item.get('side', 'player')
+    light_cone = None
+    if light_cones_dict and item.get('light_cone'):
+        light_cone = light_cones_dict.get(item['light_cone'])
+    
+    interner = interner or DataInterner()
+    # 处理stats，max_sp现在在根级别
+    stats = interner.keys(item['stats'])
+    max_sp = item.get('max_sp', 100)  # 从根级别获取max_sp，默认100
+    
+    if side == 'enemy':
+        return Enemy(
             id=item['id'],
-            name=item.get('name', item.get('set', '')),
-            main_stat=main_stat,
-            sub_stats=sub_stats,
-            set_name=item.get('set'),
-            slot=item.get('part')
+            name=item['name'],
+            stats=stats,
+            skills=char_skills,
+            side=side,
+            drop=item.get('drop'),
+            ai_type=item.get('ai_type', 'default'),
+            light_cone=light_cone,
+            weaknesses=interner.weaknesses(item.get('weaknesses', [])),
+            resistances=interner.resistances(item.get('resistances', {})),
         )
-    return relics
+    return Character(
+        id=item['id'],
+        name=item['name'],
+        stats=stats,
+        skills=char_skills,
+        side=side,
+        light_cone=light_cone,
+        path=interner.name(item.get('path')),
+        traces=interner.keys(item['traces']),
+        max_sp=max_sp
+    )
 
-def load_characters(path, skills_dict, light_cones_dict=None):
-    """加载角色数据"""
-    data = load_json(path)
-    characters = []
-    for item in data:
-        # 只保留技能ID列表
-        char_skills = item['skills']
-        side = item.get('side', 'player')
-        light_cone = None
-        if light_cones_dict and item.get('light_cone'):
-            light_cone = light_cones_dict.get(item['light_cone'])
-        
-        # 处理stats，max_sp现在在根级别
-        stats = item['stats'].copy()
-        max_sp = item.get('max_sp', 100)  # 从根级别获取max_sp，默认100
-        
-        if side == 'enemy':
-            characters.append(Enemy(
-                id=item['id'],
-                name=item['name'],
-                stats=stats,
-                skills=char_skills,
-                side=side,
-                drop=item.get('drop'),
-                ai_type=item.get('ai_type', 'default'),
-                light_cone=light_cone,
-                weaknesses=item.get('weaknesses', []),
-                resistances=item.get('resistances', {}),
-            ))
-        else:
-            characters.append(Character(
-                id=item['id'],
-                name=item['name'],
-                stats=stats,
-                skills=char_skills,
-                side=side,
-                light_cone=light_cone,
-                path=item.get('path'),
-                traces=item['traces'],
-                max_sp=max_sp
-            ))
-    return characters
-
-def load_processed_enemies(path):
-    """加载处理后的敌人数据"""
+def _compact_enemy_item(item, interner):
+    """原地压缩一条敌人记录：属性名与技能元素驻留，弱点/抗性与其他记录共享"""
+    if not interner.enabled:
+        return item
+    if 'stats' in item:
+        item['stats'] = interner.keys(item['stats'])
+    if 'weaknesses' in item:
+        item['weaknesses'] = interner.weaknesses(item['weaknesses'])
+    if 'resistances' in item:
+        item['resistances'] = interner.resistances(item['resistances'])
+    for skill in item.get('skills', []):
+        interner.fields(skill, SKILL_NAME_FIELDS)
+    return item
+
+def _enemy_from_item(item):
+    """由 processed_enemies.json 中的单条记录创建敌人（属性字典各自独立，弱点/抗性共享）"""
+    enemy = Enemy(
+        id=item['id'],
+        name=item['name'],
+        stats=dict(item['stats']),
+        skills=list(item.get('skills', [])),
+        side='enemy',
+        weaknesses=item.get('weaknesses', []),
+        resistances=item.get('resistances', {}),
+        toughness=item.get('toughness', 100),
+        max_toughness=item.get('max_toughness', 100),
+        ai_type=item.get('ai_info', {}).get('path', 'default')
+    )
+    
+    # 设置额外的属性
+    enemy.rank = item.get('rank', 'Unknown')
+    enemy.elite_group = item.get('elite_group', 1)
+    
+    # 设置AI相关信息
+    if 'ai_info' in item:
+        enemy.ai_info = item['ai_info']
+    return enemy
+
+# 战斗等价的敌人之间共享的容器字段（只读）
+SHARED_ENEMY_FIELDS = ('stats', 'weaknesses', 'resistances', 'skills', 'ai_info')
+
+def _share_enemy_aliases(items, aliases):
+    """战斗等价（combat_hash 相同）的敌人记录改为引用规范敌人的属性、弱点、抗性、技能与 AI 信息"""
+    by_id = {str(item['id']): item for item in items}
+    for item in items:
+        canonical = by_id[aliases.canonical(item['id'])]
+        if canonical is not item:
+            for field in SHARED_ENEMY_FIELDS:
+                if field in canonical:
+                    item[field] = canonical[field]
+
+def load_processed_enemies(path, interner=None, items=None):
+    """加载处理后的敌人数据，items 为已解析（并压缩）的记录时不再重复读取文件"""
     try:
-        data = load_json(path)
-        enemies = []
-        
-        for item in data:
-            # 创建敌人对象
-            enemy = Enemy(
-                id=item['id'],
-                name=item['name'],
-                stats=item['stats'],
-                skills=item.get('skills', []),
-                side='enemy',
-                weaknesses=item.get('weaknesses', []),
-                resistances=item.get('resistances', {}),
-                toughness=item.get('toughness', 100),
-                max_toughness=item.get('max_toughness', 100),
-                ai_type=item.get('ai_info', {}).get('path', 'default')
-            )
-            
-            # 设置额外的属性
-            enemy.rank = item.get('rank', 'Unknown')
-            enemy.elite_group = item.get('elite_group', 1)
-            
-            # 设置AI相关信息
-            if 'ai_info' in item:
-                enemy.ai_info = item['ai_info']
-            
-            enemies.append(enemy)
-            
+        interner = interner or DataInterner()
+        data = items if items is not None else [_compact_enemy_item(item, interner) for item in load_json(path)]
+        enemies = [_enemy_from_item(item) for item in data]
         print(f"✅ 成功加载 {len(enemies)} 个敌人")
         return enemies
         
@@ -166,10 +274,11 @@ def load_processed_enemies(path):
         print(f"❌ 加载敌人数据失败: {e}")
         return []
 
-def load_enemy_templates(path):
-    """加载敌人模板数据（用于创建新的敌人实例）"""
+def load_enemy_templates(path, interner=None, items=None):
+    """加载敌人模板数据（用于创建新的敌人实例），items 为已解析（并压缩）的记录时不再重复读取文件"""
     try:
-        data = load_json(path)
+        interner = interner or DataInterner()
+        data = items if items is not None else [_compact_enemy_item(item, interner) for item in load_json(path)]
         templates = {}
         
         for item in data:
@@ -212,49 +321,114 @@ def create_enemy_from_template(template_data, custom_stats=None, custom_name=Non
     
     return enemy
 
-def load_all_game_data(data_path):
-    """加载所有游戏数据的便捷函数"""
+# ---- 敌人二进制表（见 enemy_table）：每个进程每个数据文件只打开一次 ----
+
+_enemy_tables = {}
+
+def get_enemy_table(processed_enemies_path):
+    """
+    返回本进程共享的敌人二进制表：首次调用时打开（表不存在或已过期时由 JSON 生成），之后一直保持映射。
+    表不可用时返回 None，调用方退回读取 JSON；重新生成 processed_enemies.json 后调用 close_enemy_tables 重新打开。
+    """
+    key = os.path.abspath(processed_enemies_path)
+    if key not in _enemy_tables:
+        _enemy_tables[key] = open_enemy_table(processed_enemies_path)
+    return _enemy_tables[key]
+
+def close_enemy_tables():
+    """关闭本进程打开的全部敌人二进制表"""
+    for table in _enemy_tables.values():
+        if table is not None:
+            table.close()
+    _enemy_tables.clear()
+
+def select_enemy_templates(processed_enemies_path, rank=None, weakness=None):
+    """
+    按等级与弱点筛选敌人，按数据文件顺序返回模板字典（ID、名称、等级与数值，不含技能与 AI 信息）。
+    直接在二进制表中筛选，不解析 JSON；表不可用时扫描 JSON。
+    """
+    table = get_enemy_table(processed_enemies_path)
+    if table is not None:
+        return [record.to_template() for record in table.select(rank=rank, weakness=weakness)]
+    return [item for item in load_json(processed_enemies_path)
+            if (rank is None or item.get('rank') == rank) and (weakness is None or weakness in item.get('weaknesses', []))]
+
+def load_enemies_by_id(processed_enemies_path, enemy_ids, cache_dir=None):
+    """
+    按 ID 创建敌人，返回 {敌人ID: Enemy}（找不到的 ID 不在结果中）。
+    名称与数值来自共享的二进制表，技能与 AI 信息按 ID 偏移索引（缓存于 data/.cache）只读取这些敌人的 JSON 记录。
+    """
+    enemy_ids = [str(enemy_id) for enemy_id in enemy_ids]
+    json_items = IndexedJsonFile(processed_enemies_path, cache_dir=cache_dir).get_many(enemy_ids)
+    table = get_enemy_table(processed_enemies_path)
+    enemies = {}
+    for enemy_id in enemy_ids:
+        item = json_items.get(enemy_id)
+        if item is None:
+            continue
+        record = table.get(enemy_id) if table is not None else None
+        if record is not None:
+            template = record.to_template()
+            for field in ('skills', 'ai_info'):
+                if field in item:
+                    template[field] = item[field]
+            item = template
+        enemies[enemy_id] = _enemy_from_item(item)
+    return enemies
+
+def load_all_game_data(data_path, compact=True):
+    """
+    加载所有游戏数据的便捷函数。
+    compact 为 True 时驻留属性名/元素名/命途名并共享相同的弱点与抗性结构（见 DataInterner），
+    战斗等价的敌人（见 enemy_dedup）共享同一份模板数据。
+    processed_enemies.json 只解析一次，同时用于敌人列表与敌人模板；
+    返回值中的 enemy_aliases 为敌人的战斗等价别名表。
+    """
     try:
         print("📂 开始加载游戏数据...")
+        interner = DataInterner(enabled=compact)
         
         # 加载基础数据
-        skills_data = load_skills(os.path.join(data_path, 'skills.json'))
+        skills_data = load_skills(os.path.join(data_path, 'skills.json'), interner)
         light_cones_data = load_light_cones(
             os.path.join(data_path, 'light_cones.json'),
-            os.path.join(data_path, 'light_cone_skills.json')
+            os.path.join(data_path, 'light_cone_skills.json'),
+            interner
         )
-        relics_data = load_relics(os.path.join(data_path, 'fribbels-optimizer-save.json'))
+        relics_data = load_relics(os.path.join(data_path, 'fribbels-optimizer-save.json'), interner)
         
         # 加载角色数据
         characters_data = load_characters(
             os.path.join(data_path, 'characters.json'),
             skills_data,
-            light_cones_data
+            light_cones_data,
+            interner
         )
         
-        # 加载敌人数据（优先使用处理后的数据）
+        # 加载敌人数据与敌人模板（优先使用处理后的数据）
         processed_enemies_path = os.path.join(data_path, 'processed_enemies.json')
         enemies_data = []
+        enemy_templates = {}
+        enemy_aliases = EnemyAliasTable()
         
         if os.path.exists(processed_enemies_path):
-            enemies_data = load_processed_enemies(processed_enemies_path)
+            enemy_items = [_compact_enemy_item(item, interner) for item in load_json(processed_enemies_path)]
+            enemy_aliases = cached_alias_table(processed_enemies_path, enemy_items)
+            if compact:
+                _share_enemy_aliases(enemy_items, enemy_aliases)
+            enemies_data = load_processed_enemies(processed_enemies_path, interner, enemy_items)
+            enemy_templates = load_enemy_templates(processed_enemies_path, interner, enemy_items)
         else:
             print("⚠️  未找到处理后的敌人数据，使用默认敌人配置")
             # 可以在这里添加默认敌人或从其他源加载
         
-        # 加载敌人模板（可选）
-        enemy_templates_path = os.path.join(data_path, 'processed_enemies.json')
-        enemy_templates = {}
-        if os.path.exists(enemy_templates_path):
-            enemy_templates = load_enemy_templates(enemy_templates_path)
-        
         print(f"✅ 游戏数据加载完成:")
         print(f"   技能: {len(skills_data)} 个")
         print(f"   角色: {len(characters_data)} 个")
         print(f"   光锥: {len(light_cones_data)} 个")
         print(f"   遗器: {len(relics_data)} 个")
         print(f"   敌人: {len(enemies_data)} 个")
-        print(f"   敌人模板: {len(enemy_templates)} 个")
+        print(f"   敌人模板: {len(enemy_templates)} 个（战斗等价去重后 {enemy_aliases.distinct_count} 个）")
         
         return {
             'skills': skills_data,
@@ -262,9 +436,107 @@ def load_all_game_data(data_path):
             'light_cones': light_cones_data,
             'relics': relics_data,
             'enemies': enemies_data,
-            'enemy_templates': enemy_templates
+            'enemy_templates': enemy_templates,
+            'enemy_aliases': enemy_aliases
         }
         
     except Exception as e:
         print(f"❌ 游戏数据加载失败: {e}")
-        raise
\ No newline at end of file
+        raise
+
+def load_game_data_for_config(data_path, config, cache_dir=None):
+    """
+    只加载战斗配置引用到的数据：配置中的角色及其技能、光锥（含光锥技能）与遗器，
+    敌人直接来自配置，不加载敌人数据库。各数据文件通过按 ID 的偏移索引（缓存于 data/.cache）随机读取。
+    返回值与 load_all_game_data 结构相同，可直接交给 setup_battle_from_dict。
+    """
+    print("📂 按战斗配置加载游戏数据...")
+    team = config.get('team', [])
+    interner = DataInterner()
+
+    characters_file = IndexedJsonFile(os.path.join(data_path, 'characters.json'), cache_dir=cache_dir)
+    character_items = characters_file.get_many(member['id'] for member in team)
+
+    lc_ids = {member['light_cone'] for member in team if member.get('light_cone')}
+    lc_ids.update(item['light_cone'] for item in character_items.values() if item.get('light_cone'))
+    lc_items = IndexedJsonFile(os.path.join(data_path, 'light_cones.json'), cache_dir=cache_dir).get_many(lc_ids)
+    lc_skill_items = {}
+    lc_skills_path = os.path.join(data_path, 'light_cone_skills.json')
+    if os.path.exists(lc_skills_path):
+        lc_skill_items = IndexedJsonFile(lc_skills_path, cache_dir=cache_dir).get_many(
+            item['skill_id'] for item in lc_items.values() if item.get('skill_id'))
+    light_cones_data = {item['id']: _light_cone_from_item(item, lc_skill_items.get(str(item.get('skill_id'))), interner)
+                        for item in lc_items.values()}
+
+    skill_ids = {sid for item in character_items.values() for sid in item['skills']}
+    skill_ids.update(str(skill['id']) for enemy in config.get('enemies', []) for skill in enemy.get('skills', []))
+    skills_data = {item['id']: interner.fields(item, SKILL_NAME_FIELDS) for item in
+                   IndexedJsonFile(os.path.join(data_path, 'skills.json'), cache_dir=cache_dir).get_many(skill_ids).values()}
+
+    relic_ids = {rid for member in team for rid in member.get('relics', {}).values()}
+    relic_items = IndexedJsonFile(os.path.join(data_path, 'fribbels-optimizer-save.json'), list_key='relics',
+                                  cache_dir=cache_dir).get_many(relic_ids)
+    relics_data = {item['id']: _relic_from_item(item, interner) for item in relic_items.values()}
+
+    characters_data = [_character_from_item(item, light_cones_data, interner) for item in character_items.values()]
+
+    print(f"✅ 游戏数据加载完成（按配置）:")
+    print(f"   技能: {len(skills_data)} 个")
+    print(f"   角色: {len(characters_data)} 个")
+    print(f"   光锥: {len(light_cones_data)} 个")
+    print(f"   遗器: {len(relics_data)} 个")
+
+    return {
+        'skills': skills_data,
+        'characters': characters_data,
+        'light_cones': light_cones_data,
+        'relics': relics_data,
+        'enemies': [],
+        'enemy_templates': {},
+        'enemy_aliases': EnemyAliasTable()
+    }
+
+# ---- 基于 SQLite 游戏数据库（game_db.open_game_db 打开）的按条件查询 ----
+
+def query_skills(db: GameDatabase, ids=None, element=None, type=None):
+    """按ID/元素/类型查询技能，返回 {技能ID: 技能数据}"""
+    interner = DataInterner()
+    return {item['id']: interner.fields(item, SKILL_NAME_FIELDS)
+            for item in db.select('skills', ids=ids, element=element, type=type)}
+
+def query_light_cones(db: GameDatabase, ids=None, path=None, search=None):
+    """按ID/命途/名称查询光锥（含光锥技能），返回 {光锥ID: LightCone}"""
+    interner = DataInterner()
+    items = db.select('light_cones', ids=ids, path=path, search=search)
+    skill_ids = [item['skill_id'] for item in items if item.get('skill_id')]
+    skills = {item['id']: item for item in db.select('light_cone_skills', ids=skill_ids)} if skill_ids else {}
+    return {item['id']: _light_cone_from_item(item, skills.get(str(item.get('skill_id'))), interner) for item in items}
+
+def query_characters(db: GameDatabase, ids=None, path=None, element=None, search=None, with_light_cones=True):
+    """按ID/命途/元素/名称查询角色，返回 Character 列表（按ID排序）"""
+    interner = DataInterner()
+    items = db.select('characters', ids=ids, path=path, element=element, search=search)
+    light_cones = None
+    if with_light_cones:
+        lc_ids = {item['light_cone'] for item in items if item.get('light_cone')}
+        light_cones = query_light_cones(db, ids=lc_ids) if lc_ids else {}
+    return [_character_from_item(item, light_cones, interner) for item in items]
+
+def get_character(db: GameDatabase, char_id):
+    """按ID查询单个角色，不存在时返回 None"""
+    characters = query_characters(db, ids=[char_id])
+    return characters[0] if characters else None
+
+def query_relics(db: GameDatabase, ids=None, set_name=None, slot=None, main_stat=None):
+    """按ID/套装/部位/主属性查询遗器，返回 {遗器ID: Relic}"""
+    interner = DataInterner()
+    return {item['id']: _relic_from_item(item, interner)
+            for item in db.select('relics', ids=ids, set_name=set_name, slot=slot, main_stat=main_stat)}
+
+def query_enemies(db: GameDatabase, ids=None, rank=None, weakness=None, elite_group=None, search=None, limit=None):
+    """按ID/等级/弱点/精英组/名称查询敌人，返回 Enemy 列表（按ID排序）"""
+    interner = DataInterner()
+    items = [_compact_enemy_item(item, interner) for item in
+             db.select('enemies', ids=ids, rank=rank, weakness=weakness, elite_group=elite_group,
+                       search=search, limit=limit)]
+    return [_enemy_from_item(item) for item in items]
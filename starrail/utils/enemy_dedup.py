@@ -0,0 +1,121 @@
+# starrail/utils/enemy_dedup.py
+"""
+按战斗等价性对敌人去重。
+
+combat_hash 只对影响战斗的字段（属性、弱点、抗性、韧性、技能、AI 信息）计算规范化的内容哈希：
+弱点按元素名排序，属性与抗性的数值统一为浮点数，ID、名称、模板ID、等级、精英组等不参与。
+哈希相同的敌人在同一随机种子下的战斗完全相同，EnemyAliasTable 把它们归并到第一个出现的敌人
+（规范敌人）名下，批量对战时每组只需模拟一次。
+cached_alias_table 把各敌人的哈希缓存到数据目录下的 .cache 中（见 file_cache），源文件未变化时不再重新计算。
+"""
+import hashlib
+import json
+import os
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .file_cache import cache_dir_for, file_signature, load_signed_cache, save_signed_cache
+
+HASH_CACHE_VERSION = 2
+
+COMBAT_FIELDS = ("stats", "weaknesses", "resistances", "toughness", "max_toughness", "skills", "ai_info")
+
+
+def _numbers(mapping: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: float(v) if isinstance(v, (int, float)) and not isinstance(v, bool) else v
+            for k, v in mapping.items()}
+
+
+def combat_signature(item: Dict[str, Any]) -> str:
+    """敌人记录中影响战斗的字段的规范化 JSON 文本"""
+    canonical = {
+        "stats": _numbers(item.get("stats") or {}),
+        "weaknesses": sorted(set(item.get("weaknesses") or [])),
+        "resistances": _numbers(item.get("resistances") or {}),
+        "toughness": float(item.get("toughness", 100)),
+        "max_toughness": float(item.get("max_toughness", 100)),
+        "skills": item.get("skills") or [],
+        "ai_info": item.get("ai_info") or {},
+    }
+    return json.dumps(canonical, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+def combat_hash(item: Dict[str, Any]) -> str:
+    return hashlib.sha1(combat_signature(item).encode("utf-8")).hexdigest()[:16]
+
+
+class EnemyAliasTable:
+    """
+    敌人 ID 到规范敌人 ID 的别名表。
+    canonical_of: {敌人ID: 规范敌人ID}（规范敌人映射到自身）；groups: {规范敌人ID: [组内全部ID]}
+    """
+
+    def __init__(self, canonical_of: Optional[Dict[str, str]] = None, hashes: Optional[Dict[str, str]] = None):
+        self.canonical_of: Dict[str, str] = dict(canonical_of or {})
+        self.hashes: Dict[str, str] = dict(hashes or {})
+        self.groups: Dict[str, List[str]] = {}
+        for enemy_id, canonical_id in self.canonical_of.items():
+            self.groups.setdefault(canonical_id, []).append(enemy_id)
+
+    def __len__(self) -> int:
+        return len(self.canonical_of)
+
+    def __contains__(self, enemy_id) -> bool:
+        return str(enemy_id) in self.canonical_of
+
+    @property
+    def distinct_count(self) -> int:
+        return len(self.groups)
+
+    def canonical(self, enemy_id) -> str:
+        """规范敌人ID，不在表中的敌人视为自身"""
+        return self.canonical_of.get(str(enemy_id), str(enemy_id))
+
+    def aliases(self, enemy_id) -> List[str]:
+        """与该敌人战斗等价的全部敌人ID（含自身）"""
+        return list(self.groups.get(self.canonical(enemy_id), [str(enemy_id)]))
+
+    def distinct(self, enemy_ids: Iterable) -> List[str]:
+        """按出现顺序返回 enemy_ids 中各组的代表（规范敌人ID），每组只出现一次"""
+        seen = {}
+        for enemy_id in enemy_ids:
+            seen.setdefault(self.canonical(enemy_id), None)
+        return list(seen)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """写入 enemy_aliases.json 的结构，只列出有别名的组"""
+        return {
+            "total": len(self.canonical_of),
+            "distinct": self.distinct_count,
+            "groups": {canonical_id: {"hash": self.hashes.get(canonical_id), "aliases": ids[1:]}
+                       for canonical_id, ids in self.groups.items() if len(ids) > 1},
+        }
+
+
+def _alias_table_from_hashes(pairs: Iterable[Tuple[str, str]]) -> EnemyAliasTable:
+    first_by_hash: Dict[str, str] = {}
+    canonical_of: Dict[str, str] = {}
+    hashes: Dict[str, str] = {}
+    for enemy_id, digest in pairs:
+        hashes[enemy_id] = digest
+        canonical_of[enemy_id] = first_by_hash.setdefault(digest, enemy_id)
+    return EnemyAliasTable(canonical_of, hashes)
+
+
+def build_alias_table(items: Iterable[Dict[str, Any]]) -> EnemyAliasTable:
+    """按文件顺序计算每个敌人的战斗等价哈希，哈希相同的敌人归并到第一个出现的敌人"""
+    return _alias_table_from_hashes((str(item['id']), combat_hash(item)) for item in items)
+
+
+def cached_alias_table(json_path: str, items: List[Dict[str, Any]], cache_dir: Optional[str] = None) -> EnemyAliasTable:
+    """
+    与 build_alias_table 相同，但各敌人的哈希按源文件（processed_enemies.json）的大小与修改时间缓存，
+    缓存有效时不再计算哈希。缓存目录不可写时每次重新计算。
+    """
+    cache_path = os.path.join(cache_dir_for(json_path, cache_dir), f"{os.path.basename(json_path)}.combat_hash.json")
+    signature = file_signature(json_path, HASH_CACHE_VERSION)
+    cached = load_signed_cache(cache_path, signature)
+    if cached is not None and len(cached) == len(items):
+        return _alias_table_from_hashes(map(tuple, cached))
+    pairs = [(str(item['id']), combat_hash(item)) for item in items]
+    save_signed_cache(cache_path, signature, pairs)
+    return _alias_table_from_hashes(pairs)
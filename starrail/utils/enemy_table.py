@@ -0,0 +1,274 @@
+# starrail/utils/enemy_table.py
+"""
+敌人数值的定长二进制表（processed_enemies.bin），由 create_enemy.py 与 processed_enemies.json 一同生成。
+
+文件布局（小端序）：
+    文件头   HEADER：魔数、版本、记录长度、记录数、等级名表与名称表长度、源 JSON 的大小与修改时间
+    等级名表 以 '\\0' 分隔的 UTF-8 字符串，记录中只保存其下标
+    名称表   各敌人名称的 UTF-8 字节依次拼接，记录中保存其偏移与长度，读取记录时才解码
+    记录区   RECORD × 记录数，按源 JSON 中的顺序
+    ID 索引  INDEX_ENTRY × 记录数，按 ID 排序的 (ID, 记录行号)，用于二分查找
+
+EnemyTable 以只读方式 mmap 整个文件，按 ID 查找与按条件筛选都直接从映射的页面解包，
+不解析 JSON，多个工作进程打开同一文件时共享同一份物理内存（操作系统页缓存）。
+表中只有名称与数值数据：技能与 AI 信息仍需从 processed_enemies.json 读取。
+弱点以位掩码保存，还原时按 ELEMENTS 的顺序排列。
+"""
+import json
+import mmap
+import os
+import struct
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from .file_cache import atomic_path, file_signature
+
+MAGIC = b"SREN"
+TABLE_VERSION = 2
+TABLE_SUFFIX = ".bin"
+
+ELEMENTS = ("Physical", "Fire", "Ice", "Thunder", "Wind", "Quantum", "Imaginary")
+# 与 create_enemy.py 中 calculate_final_stats 生成的属性及顺序一致
+STAT_KEYS = ("ATK", "DEF", "HP", "SPD", "Stance", "CRIT_DMG", "Status_RES")
+
+# 魔数, 版本, 记录长度, 记录数, 等级名表字节数, 名称表字节数, 源文件大小, 源文件修改时间(ns)
+HEADER = struct.Struct("<4sHHIIIQq")
+# ID, 模板ID, 精英组, 等级下标, 弱点掩码, 抗性存在掩码, 韧性, 最大韧性, 各属性, 各元素抗性, 名称偏移, 名称字节数
+RECORD = struct.Struct(f"<qqIBBBxdd{len(STAT_KEYS)}d{len(ELEMENTS)}dIH")
+INDEX_ENTRY = struct.Struct("<qI")
+
+
+@dataclass(frozen=True)
+class EnemyRecord:
+    """二进制表中的一条敌人记录"""
+    row: int
+    id: int
+    name: str
+    template_id: int
+    elite_group: int
+    rank: str
+    weakness_mask: int
+    resistance_mask: int
+    toughness: float
+    max_toughness: float
+    stat_values: tuple
+    resistance_values: tuple
+
+    @property
+    def stats(self) -> Dict[str, float]:
+        return dict(zip(STAT_KEYS, self.stat_values))
+
+    @property
+    def weaknesses(self) -> List[str]:
+        return [element for i, element in enumerate(ELEMENTS) if self.weakness_mask >> i & 1]
+
+    @property
+    def resistances(self) -> Dict[str, float]:
+        return {element: value for i, (element, value) in enumerate(zip(ELEMENTS, self.resistance_values))
+                if self.resistance_mask >> i & 1}
+
+    def has_weakness(self, element: str) -> bool:
+        return bool(self.weakness_mask >> ELEMENTS.index(element) & 1)
+
+    def to_template(self) -> Dict[str, Any]:
+        """转换为与 processed_enemies.json 中记录相同结构的字典（不含技能与 AI 信息）"""
+        return {
+            'id': str(self.id),
+            'name': self.name,
+            'template_id': self.template_id,
+            'rank': self.rank,
+            'elite_group': self.elite_group,
+            'stats': self.stats,
+            'weaknesses': self.weaknesses,
+            'resistances': self.resistances,
+            'toughness': self.toughness,
+            'max_toughness': self.max_toughness,
+            'side': 'enemy',
+        }
+
+
+def table_path_for(json_path: str) -> str:
+    """processed_enemies.json 对应的二进制表路径"""
+    return os.path.splitext(json_path)[0] + TABLE_SUFFIX
+
+
+def _mask(elements: Iterable[str], record_id) -> int:
+    mask = 0
+    for element in elements:
+        if element not in ELEMENTS:
+            raise ValueError(f"敌人 {record_id} 的元素 '{element}' 不在二进制表支持的元素中")
+        mask |= 1 << ELEMENTS.index(element)
+    return mask
+
+
+def write_enemy_table(enemies: List[Dict[str, Any]], path: str, source_path: Optional[str] = None):
+    """
+    把敌人记录（processed_enemies.json 的结构）写入二进制表。
+    source_path 为对应的 JSON 文件，其大小与修改时间写入文件头，用于判断表是否过期。
+    """
+    ranks: List[str] = []
+    names = bytearray()
+    records = []
+    for row, item in enumerate(enemies):
+        rank = item.get('rank', 'Unknown')
+        if rank not in ranks:
+            ranks.append(rank)
+        stats = item.get('stats', {})
+        resistances = item.get('resistances', {})
+        try:
+            enemy_id = int(item['id'])
+        except (TypeError, ValueError):
+            raise ValueError(f"敌人ID '{item.get('id')}' 不是整数，无法写入二进制表")
+        name = str(item.get('name') or f"Enemy_{enemy_id}").encode("utf-8")
+        records.append(RECORD.pack(
+            enemy_id, int(item.get('template_id') or 0), int(item.get('elite_group', 1)), ranks.index(rank),
+            _mask(item.get('weaknesses', []), enemy_id), _mask(resistances, enemy_id),
+            float(item.get('toughness', 100)), float(item.get('max_toughness', 100)),
+            *(float(stats.get(key, 0)) for key in STAT_KEYS),
+            *(float(resistances.get(element, 0)) for element in ELEMENTS),
+            len(names), len(name),
+        ))
+        names += name
+    rank_table = "\0".join(ranks).encode("utf-8")
+    source = file_signature(source_path) if source_path else {"size": 0, "mtime_ns": 0}
+    index = sorted((RECORD.unpack_from(record)[0], row) for row, record in enumerate(records))
+
+    with atomic_path(path) as tmp_path:
+        with open(tmp_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, TABLE_VERSION, RECORD.size, len(records), len(rank_table), len(names),
+                                source["size"], source["mtime_ns"]))
+            f.write(rank_table)
+            f.write(names)
+            f.writelines(records)
+            f.writelines(INDEX_ENTRY.pack(enemy_id, row) for enemy_id, row in index)
+
+
+class EnemyTable:
+    """只读 mmap 的敌人二进制表，支持按 ID 查找、遍历与按条件筛选"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            (magic, version, record_size, self.count, rank_bytes, name_bytes,
+             self.source_size, self.source_mtime_ns) = HEADER.unpack_from(self._mm, 0)
+            if magic != MAGIC or version != TABLE_VERSION or record_size != RECORD.size:
+                raise ValueError(f"{path} 不是当前版本的敌人二进制表")
+            self._names_offset = HEADER.size + rank_bytes
+            self._records_offset = self._names_offset + name_bytes
+            self._index_offset = self._records_offset + self.count * RECORD.size
+            if len(self._mm) != self._index_offset + self.count * INDEX_ENTRY.size:
+                raise ValueError(f"{path} 的长度与文件头不符，文件可能已损坏")
+            rank_table = self._mm[HEADER.size:self._names_offset].decode("utf-8")
+            self.ranks = rank_table.split("\0") if rank_table else []
+        except Exception:
+            self._mm.close()
+            raise
+
+    def close(self):
+        self._mm.close()
+
+    def __enter__(self) -> 'EnemyTable':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def is_current(self, source_path: str) -> bool:
+        """源 JSON 的大小与修改时间是否仍与生成表时一致"""
+        try:
+            source = file_signature(source_path)
+        except OSError:
+            return False
+        return source == {"size": self.source_size, "mtime_ns": self.source_mtime_ns}
+
+    def record(self, row: int) -> EnemyRecord:
+        if not 0 <= row < self.count:
+            raise IndexError(row)
+        values = RECORD.unpack_from(self._mm, self._records_offset + row * RECORD.size)
+        stat_end = 8 + len(STAT_KEYS)
+        name_offset = self._names_offset + values[-2]
+        name = self._mm[name_offset:name_offset + values[-1]].decode("utf-8")
+        return EnemyRecord(row, values[0], name, values[1], values[2], self.ranks[values[3]], values[4], values[5],
+                           values[6], values[7], values[8:stat_end], values[stat_end:-2])
+
+    def find_row(self, enemy_id) -> Optional[int]:
+        """在 ID 索引中二分查找，返回记录行号，不存在（或 ID 不是整数）时返回 None"""
+        try:
+            target = int(enemy_id)
+        except (TypeError, ValueError):
+            return None
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            key, row = INDEX_ENTRY.unpack_from(self._mm, self._index_offset + mid * INDEX_ENTRY.size)
+            if key == target:
+                return row
+            if key < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        return None
+
+    def get(self, enemy_id) -> Optional[EnemyRecord]:
+        row = self.find_row(enemy_id)
+        return self.record(row) if row is not None else None
+
+    def __contains__(self, enemy_id) -> bool:
+        return self.find_row(enemy_id) is not None
+
+    def __iter__(self) -> Iterator[EnemyRecord]:
+        for row in range(self.count):
+            yield self.record(row)
+
+    def select(self, rank: Optional[str] = None, weakness: Optional[str] = None, elite_group: Optional[int] = None,
+               predicate: Optional[Callable[[EnemyRecord], bool]] = None) -> List[EnemyRecord]:
+        """按等级、弱点、精英组及自定义条件筛选敌人记录"""
+        if rank is not None and rank not in self.ranks:
+            return []
+        rank_index = self.ranks.index(rank) if rank is not None else None
+        weakness_bit = 1 << ELEMENTS.index(weakness) if weakness is not None else 0
+        result = []
+        for row in range(self.count):
+            offset = self._records_offset + row * RECORD.size
+            # 先只解包定长头部的整数字段做初筛
+            _, _, group, rank_id, weak_mask = struct.unpack_from("<qqIBB", self._mm, offset)
+            if rank_index is not None and rank_id != rank_index:
+                continue
+            if weakness_bit and not weak_mask & weakness_bit:
+                continue
+            if elite_group is not None and group != elite_group:
+                continue
+            record = self.record(row)
+            if predicate is None or predicate(record):
+                result.append(record)
+        return result
+
+
+def open_enemy_table(json_path: str, rebuild: bool = True) -> Optional[EnemyTable]:
+    """
+    打开 processed_enemies.json 对应的二进制表。
+    表不存在或已过期时，rebuild 为 True 则由 JSON 重新生成，否则（或生成失败时）返回 None，调用方退回读取 JSON。
+    """
+    path = table_path_for(json_path)
+    if os.path.exists(path):
+        try:
+            table = EnemyTable(path)
+        except (OSError, ValueError):
+            table = None
+        if table is not None:
+            if table.is_current(json_path):
+                return table
+            table.close()
+    if not rebuild or not os.path.exists(json_path):
+        return None
+    try:
+        with open(json_path, "r", encoding="utf-8") as f:
+            write_enemy_table(json.load(f), path, json_path)
+        return EnemyTable(path)
+    except (OSError, ValueError):
+        return None
@@ -0,0 +1,76 @@
+# starrail/utils/file_cache.py
+"""
+由数据文件派生的缓存的公共部分：缓存目录、源文件签名与原子替换。
+
+JSON 偏移索引、遗器精简记录、敌人战斗等价哈希、敌人二进制表与 SQLite 游戏数据库
+都以源文件的大小与修改时间（纳秒）加上缓存的格式版本作为签名，签名不一致即视为过期；
+写入时先写同目录下的临时文件，完成后再 os.replace，读取方不会看到写了一半的缓存。
+JSON 缓存统一保存为 {"signature": 签名, "data": 数据}。
+"""
+import json
+import os
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+CACHE_DIR_NAME = ".cache"
+
+
+def cache_dir_for(path: str, cache_dir: Optional[str] = None) -> str:
+    """数据文件的缓存目录，默认为其所在目录下的 .cache"""
+    return cache_dir or os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIR_NAME)
+
+
+def file_signature(path: str, version: Optional[int] = None, **extra) -> Dict[str, Any]:
+    """源文件的大小与修改时间，连同缓存格式版本及 extra 中的其他参数组成缓存签名"""
+    st = os.stat(path)
+    signature: Dict[str, Any] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+    if version is not None:
+        signature["version"] = version
+    signature.update(extra)
+    return signature
+
+
+@contextmanager
+def atomic_path(path: str) -> Iterator[str]:
+    """给出临时文件路径供调用方写入，with 块正常结束后用它原子替换 path，出错时删除临时文件"""
+    tmp_path = path + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def read_signed_cache(cache_path: str) -> Optional[Tuple[Dict[str, Any], Any]]:
+    """读取 JSON 缓存，返回 (签名, 数据)；文件不存在或已损坏时返回 None"""
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+        return cached["signature"], cached["data"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def load_signed_cache(cache_path: str, signature: Dict[str, Any]) -> Optional[Any]:
+    """签名与 signature 一致时返回缓存的数据，否则返回 None"""
+    cached = read_signed_cache(cache_path)
+    if cached is None or cached[0] != signature:
+        return None
+    return cached[1]
+
+
+def save_signed_cache(cache_path: str, signature: Dict[str, Any], data: Any):
+    """原子写入 JSON 缓存，缓存目录不存在时创建"""
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(cache_path)), exist_ok=True)
+        with atomic_path(cache_path) as tmp_path:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"signature": signature, "data": data}, f, ensure_ascii=False, separators=(",", ":"))
+    except OSError:
+        pass  # 缓存只是加速手段，写入失败时调用方下次重新计算
@@ -0,0 +1,237 @@
+# starrail/utils/game_db.py
+"""
+可选的本地 SQLite 游戏数据库，由 data 目录中的 JSON 文件生成（默认位于 data/.cache/game_data.sqlite）。
+
+每张表保存原始 JSON 记录（data 列）以及用于筛选的列，并在 ID、命途、元素、敌人等级、
+敌人弱点、遗器套装/部位/主属性上建立索引，查询时只解析命中的记录。
+数据库记录了生成时各源文件的签名（大小与修改时间，见 file_cache），源文件变化后 open_game_db 会自动重建。
+把查询结果转换为 Character / Enemy / LightCone / Relic 对象的函数在 data_loader 中（query_*）。
+"""
+import json
+import os
+import sqlite3
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .file_cache import CACHE_DIR_NAME, atomic_path, file_signature
+
+DB_VERSION = 1
+DB_FILE_NAME = "game_data.sqlite"
+
+# (源文件, 顶层数组所在字段)
+SOURCE_FILES = {
+    "characters": ("characters.json", None),
+    "skills": ("skills.json", None),
+    "light_cones": ("light_cones.json", None),
+    "light_cone_skills": ("light_cone_skills.json", None),
+    "relics": ("fribbels-optimizer-save.json", "relics"),
+    "enemies": ("processed_enemies.json", None),
+}
+
+SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE characters (id TEXT PRIMARY KEY, name TEXT, path TEXT, element TEXT, side TEXT, rarity INTEGER, data TEXT);
+CREATE INDEX idx_characters_path ON characters(path);
+CREATE INDEX idx_characters_element ON characters(element);
+CREATE TABLE skills (id TEXT PRIMARY KEY, element TEXT, type TEXT, data TEXT);
+CREATE INDEX idx_skills_element ON skills(element);
+CREATE TABLE light_cones (id TEXT PRIMARY KEY, name TEXT, path TEXT, rarity INTEGER, skill_id TEXT, data TEXT);
+CREATE INDEX idx_light_cones_path ON light_cones(path);
+CREATE TABLE light_cone_skills (id TEXT PRIMARY KEY, data TEXT);
+CREATE TABLE relics (id TEXT PRIMARY KEY, set_name TEXT, slot TEXT, main_stat TEXT, main_value REAL, data TEXT);
+CREATE INDEX idx_relics_set_slot ON relics(set_name, slot);
+CREATE INDEX idx_relics_slot ON relics(slot);
+CREATE INDEX idx_relics_main_stat ON relics(main_stat);
+CREATE TABLE enemies (id TEXT PRIMARY KEY, template_id TEXT, name TEXT, rank TEXT, elite_group INTEGER, hp REAL, data TEXT);
+CREATE INDEX idx_enemies_rank ON enemies(rank);
+CREATE INDEX idx_enemies_template ON enemies(template_id);
+CREATE TABLE enemy_weaknesses (enemy_id TEXT, element TEXT, PRIMARY KEY (element, enemy_id));
+"""
+
+# 各表可筛选的列，select 只接受这里列出的列名
+FILTER_COLUMNS = {
+    "characters": ("id", "name", "path", "element", "side", "rarity"),
+    "skills": ("id", "element", "type"),
+    "light_cones": ("id", "name", "path", "rarity", "skill_id"),
+    "light_cone_skills": ("id",),
+    "relics": ("id", "set_name", "slot", "main_stat"),
+    "enemies": ("id", "template_id", "name", "rank", "elite_group"),
+}
+
+
+def default_db_path(data_path: str) -> str:
+    return os.path.join(data_path, CACHE_DIR_NAME, DB_FILE_NAME)
+
+
+def _source_signature(data_path: str) -> Dict[str, Dict[str, Any]]:
+    """各源文件的签名，不存在的文件不计入"""
+    signature = {}
+    for file_name, _ in SOURCE_FILES.values():
+        path = os.path.join(data_path, file_name)
+        if os.path.exists(path):
+            signature[file_name] = file_signature(path)
+    return signature
+
+
+def _load_items(data_path: str, table: str) -> List[Dict[str, Any]]:
+    file_name, list_key = SOURCE_FILES[table]
+    path = os.path.join(data_path, file_name)
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if list_key and isinstance(data, dict):
+        data = data.get(list_key, [])
+    return data
+
+
+def _dump(item: Dict[str, Any]) -> str:
+    return json.dumps(item, ensure_ascii=False, separators=(",", ":"))
+
+
+def _rows(table: str, items: List[Dict[str, Any]]) -> Iterable[Tuple]:
+    for item in items:
+        if table == "characters":
+            yield (str(item['id']), item.get('name'), item.get('path'), item.get('element'),
+                   item.get('side', 'player'), item.get('rarity'), _dump(item))
+        elif table == "skills":
+            yield str(item['id']), item.get('element'), item.get('type'), _dump(item)
+        elif table == "light_cones":
+            skill_id = item.get('skill_id')
+            yield (str(item['id']), item.get('name'), item.get('path'), item.get('rarity'),
+                   str(skill_id) if skill_id is not None else None, _dump(item))
+        elif table == "light_cone_skills":
+            yield str(item['id']), _dump(item)
+        elif table == "relics":
+            main = item.get('main') or {}
+            yield str(item['id']), item.get('set'), item.get('part'), main.get('stat'), main.get('value'), _dump(item)
+        elif table == "enemies":
+            template_id = item.get('template_id') or item.get('id')
+            yield (str(item['id']), str(template_id), item.get('name'), item.get('rank'), item.get('elite_group'),
+                   (item.get('stats') or {}).get('HP'), _dump(item))
+
+
+def build_game_db(data_path: str, db_path: Optional[str] = None) -> str:
+    """由 data 目录中的 JSON 文件重新生成数据库，返回数据库路径"""
+    db_path = db_path or default_db_path(data_path)
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    signature = _source_signature(data_path)
+    with atomic_path(db_path) as tmp_path:
+        conn = sqlite3.connect(tmp_path)
+        try:
+            conn.executescript(SCHEMA)
+            with conn:
+                for table in SOURCE_FILES:
+                    items = _load_items(data_path, table)
+                    rows = list(_rows(table, items))
+                    if rows:
+                        placeholders = ",".join("?" * len(rows[0]))
+                        conn.executemany(f"INSERT OR REPLACE INTO {table} VALUES ({placeholders})", rows)
+                    if table == "enemies":
+                        conn.executemany("INSERT OR IGNORE INTO enemy_weaknesses VALUES (?, ?)",
+                                         [(str(item['id']), element) for item in items
+                                          for element in item.get('weaknesses', [])])
+                conn.executemany("INSERT INTO meta VALUES (?, ?)", [
+                    ("version", str(DB_VERSION)),
+                    ("sources", json.dumps(signature, sort_keys=True)),
+                ])
+        finally:
+            conn.close()
+    return db_path
+
+
+class GameDatabase:
+    """只读查询游戏数据库，select 返回原始 JSON 记录（与数据文件中的结构相同）"""
+
+    def __init__(self, db_path: str):
+        self.path = db_path
+        self.conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self) -> 'GameDatabase':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def meta(self, key: str) -> Optional[str]:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def is_current(self, data_path: str) -> bool:
+        """数据库版本与源文件签名是否与当前 data 目录一致"""
+        try:
+            return (self.meta("version") == str(DB_VERSION)
+                    and json.loads(self.meta("sources") or "null") == _source_signature(data_path))
+        except sqlite3.DatabaseError:
+            return False
+
+    def select(self, table: str, ids: Optional[Iterable] = None, weakness: Optional[str] = None,
+               search: Optional[str] = None, limit: Optional[int] = None, **filters) -> List[Dict[str, Any]]:
+        """
+        按列筛选记录，filters 的值为 None 时忽略该条件，为列表/元组/集合时按 IN 匹配。
+        ids 限定记录ID，weakness 只用于 enemies 表（按弱点元素筛选），
+        search 按名称子串匹配（不区分大小写）。结果按 ID 排序。
+        """
+        if table not in FILTER_COLUMNS:
+            raise ValueError(f"未知的数据表: {table}")
+        clauses, params = [], []
+        if ids is not None:
+            filters["id"] = [str(i) for i in ids]
+        for column, value in filters.items():
+            if value is None:
+                continue
+            if column not in FILTER_COLUMNS[table]:
+                raise ValueError(f"数据表 {table} 不支持按 {column} 筛选")
+            if isinstance(value, (list, tuple, set, frozenset)):
+                values = list(value)
+                if not values:
+                    return []
+                clauses.append(f"{column} IN ({','.join('?' * len(values))})")
+                params.extend(values)
+            else:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if weakness is not None:
+            if table != "enemies":
+                raise ValueError("weakness 只能用于 enemies 表")
+            clauses.append("id IN (SELECT enemy_id FROM enemy_weaknesses WHERE element = ?)")
+            params.append(weakness)
+        if search:
+            if "name" not in FILTER_COLUMNS[table]:
+                raise ValueError(f"数据表 {table} 没有名称列")
+            clauses.append("name LIKE ? ESCAPE '\\'")
+            params.append("%" + search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%")
+        sql = f"SELECT data FROM {table}"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [json.loads(row[0]) for row in self.conn.execute(sql, params)]
+
+    def count(self, table: str) -> int:
+        if table not in FILTER_COLUMNS:
+            raise ValueError(f"未知的数据表: {table}")
+        return self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def open_game_db(data_path: str, db_path: Optional[str] = None, rebuild: bool = True) -> Optional[GameDatabase]:
+    """
+    打开 data 目录对应的游戏数据库。数据库不存在或已过期时，rebuild 为 True 则重新生成，
+    否则返回 None（调用方退回读取 JSON）。
+    """
+    db_path = db_path or default_db_path(data_path)
+    if os.path.exists(db_path):
+        try:
+            db = GameDatabase(db_path)
+            if db.is_current(data_path):
+                return db
+            db.close()
+        except sqlite3.DatabaseError:
+            pass
+    if not rebuild:
+        return None
+    return GameDatabase(build_game_db(data_path, db_path))
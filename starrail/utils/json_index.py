@@ -0,0 +1,138 @@
+# starrail/utils/json_index.py
+"""
+JSON 数据文件的按 ID 偏移索引。
+
+数据文件的主体是对象数组（或顶层对象中的某个数组字段，如遗器存档的 "relics"）。
+首次使用时扫描一遍文件，记录每个元素的 ID 及其在文件中的字节偏移与长度，
+并缓存到数据目录下的 .cache 目录中（见 file_cache）；之后按 ID 读取单个元素时只需 seek + 解析该元素。
+源文件的大小或修改时间变化时索引自动重建，缓存目录不可写时退化为仅在内存中保存索引。
+"""
+import json
+import os
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .file_cache import cache_dir_for, file_signature, load_signed_cache, save_signed_cache
+
+INDEX_VERSION = 2
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+
+
+def _skip_ws(text: str, pos: int) -> int:
+    while pos < len(text) and text[pos] in _WHITESPACE:
+        pos += 1
+    return pos
+
+
+def _expect(text: str, pos: int, char: str) -> int:
+    pos = _skip_ws(text, pos)
+    if pos >= len(text) or text[pos] != char:
+        raise ValueError(f"JSON 格式错误: 位置 {pos} 处应为 '{char}'")
+    return pos + 1
+
+
+def _find_array(text: str, list_key: Optional[str]) -> int:
+    """返回要索引的数组中 '[' 之后的位置"""
+    if list_key is None:
+        return _expect(text, 0, "[")
+    pos = _expect(text, 0, "{")
+    while True:
+        pos = _skip_ws(text, pos)
+        key, pos = _decoder.raw_decode(text, pos)
+        pos = _expect(text, pos, ":")
+        pos = _skip_ws(text, pos)
+        if key == list_key:
+            return _expect(text, pos, "[")
+        _, pos = _decoder.raw_decode(text, pos)
+        pos = _skip_ws(text, pos)
+        if pos >= len(text) or text[pos] != ",":
+            raise ValueError(f"JSON 文件中没有 '{list_key}' 字段")
+        pos += 1
+
+
+def scan_offsets(text: str, key: str = "id", list_key: Optional[str] = None) -> Dict[str, Tuple[int, int]]:
+    """扫描 JSON 文本（需保留原始换行符），返回 {元素ID: (字节偏移, 字节长度)}，ID 统一转为字符串"""
+    entries: Dict[str, Tuple[int, int]] = {}
+    pos = _skip_ws(text, _find_array(text, list_key))
+    char_pos, byte_pos = 0, 0
+    if pos < len(text) and text[pos] == "]":
+        return entries
+    while True:
+        pos = _skip_ws(text, pos)
+        item, end = _decoder.raw_decode(text, pos)
+        # 字符位置换算为字节位置（增量计算，只编码两次之间新扫过的部分）
+        byte_pos += len(text[char_pos:pos].encode("utf-8"))
+        length = len(text[pos:end].encode("utf-8"))
+        if isinstance(item, dict) and key in item:
+            entries.setdefault(str(item[key]), (byte_pos, length))
+        char_pos, byte_pos = end, byte_pos + length
+        pos = _skip_ws(text, end)
+        if pos < len(text) and text[pos] == ",":
+            pos += 1
+            continue
+        _expect(text, pos, "]")
+        return entries
+
+
+class IndexedJsonFile:
+    """
+    按 ID 随机读取 JSON 数组元素。
+    path: 数据文件；key: 元素的 ID 字段；list_key: 数组位于顶层对象的哪个字段（顶层即数组时为 None）；
+    cache_dir: 索引缓存目录，默认为数据文件所在目录下的 .cache。
+    """
+
+    def __init__(self, path: str, key: str = "id", list_key: Optional[str] = None, cache_dir: Optional[str] = None):
+        self.path = path
+        self.key = key
+        self.list_key = list_key
+        self.cache_dir = cache_dir_for(path, cache_dir)
+        self._entries: Optional[Dict[str, Tuple[int, int]]] = None
+
+    @property
+    def index_path(self) -> str:
+        suffix = f".{self.list_key}" if self.list_key else ""
+        return os.path.join(self.cache_dir, f"{os.path.basename(self.path)}{suffix}.{self.key}.idx.json")
+
+    @property
+    def entries(self) -> Dict[str, Tuple[int, int]]:
+        if self._entries is None:
+            signature = file_signature(self.path, INDEX_VERSION, key=self.key, list_key=self.list_key)
+            cached = load_signed_cache(self.index_path, signature)
+            if cached is not None:
+                entries = {k: tuple(v) for k, v in cached.items()}
+            else:
+                with open(self.path, "r", encoding="utf-8", newline="") as f:
+                    entries = scan_offsets(f.read(), self.key, self.list_key)
+                save_signed_cache(self.index_path, signature, entries)
+            self._entries = entries
+        return self._entries
+
+    def ids(self) -> List[str]:
+        return list(self.entries)
+
+    def __contains__(self, item_id) -> bool:
+        return str(item_id) in self.entries
+
+    def get(self, item_id) -> Optional[Dict[str, Any]]:
+        """读取并解析单个元素，ID 不存在时返回 None"""
+        entry = self.entries.get(str(item_id))
+        if entry is None:
+            return None
+        offset, length = entry
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            return json.loads(f.read(length).decode("utf-8"))
+
+    def get_many(self, item_ids: Iterable) -> Dict[str, Dict[str, Any]]:
+        """按文件中的顺序读取多个元素，返回 {ID: 元素}，忽略不存在的 ID"""
+        wanted = sorted({str(i) for i in item_ids if str(i) in self.entries}, key=lambda i: self.entries[i][0])
+        result = {}
+        if not wanted:
+            return result
+        with open(self.path, "rb") as f:
+            for item_id in wanted:
+                offset, length = self.entries[item_id]
+                f.seek(offset)
+                result[item_id] = json.loads(f.read(length).decode("utf-8"))
+        return result
@@ -0,0 +1,112 @@
+# starrail/utils/json_stream.py
+"""
+流式读取 JSON 数组：按块读取文件，逐个解析并产出数组元素，不构建整棵 JSON 树。
+
+缓冲区中只保留尚未解析的文本，已产出的元素立即从缓冲区丢弃，
+内存占用与单个元素及读取块大小成正比，与文件大小无关。
+每个元素用 json.JSONDecoder.raw_decode（C 实现）解析，遇到被块边界截断的元素时继续读取后重试。
+"""
+import json
+from typing import Any, IO, Iterator, Optional
+
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+_NUMBER_CHARS = "0123456789.eE+-"
+
+
+class _Reader:
+    """在文本流上维护一个可增长的缓冲区，pos 之前的内容可随时丢弃"""
+
+    def __init__(self, fp: IO[str], chunk_size: int):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self, min_size: int = 0) -> bool:
+        """丢弃已消费的内容并至少读取一块（或 min_size 个字符），文件已读完时返回 False"""
+        if self.eof:
+            return False
+        if self.pos:
+            self.buffer = self.buffer[self.pos:]
+            self.pos = 0
+        chunk = self.fp.read(max(self.chunk_size, min_size))
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer += chunk
+        return True
+
+    def skip_ws(self):
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer) or not self.fill():
+                return
+
+    def peek(self) -> str:
+        """跳过空白后返回下一个字符，文件结束时返回空字符串"""
+        self.skip_ws()
+        return self.buffer[self.pos] if self.pos < len(self.buffer) else ""
+
+    def expect(self, char: str):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"JSON 格式错误: 应为 '{char}'，实际为 '{found or '文件结尾'}'")
+        self.pos += 1
+
+    def decode(self) -> Any:
+        """解析下一个完整的 JSON 值；值被块边界截断时按缓冲区大小成倍读取后重试"""
+        self.skip_ws()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill(len(self.buffer) - self.pos):
+                    raise
+                continue
+            # 数字可能在块边界处被截断（如 "-4." + "5e10" 会先解析出 -4），需确认其后已是分隔符
+            if (isinstance(value, (int, float)) and not isinstance(value, bool)
+                    and (end == len(self.buffer) or self.buffer[end] in _NUMBER_CHARS)):
+                if self.fill():
+                    continue
+            self.pos = end
+            return value
+
+
+def iter_json_array(fp: IO[str], list_key: Optional[str] = None,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Any]:
+    """
+    逐个产出 JSON 数组的元素。顶层为数组时直接遍历；顶层为对象时遍历其 list_key 字段的数组，
+    该字段之前的其他字段会被解析后丢弃，数组结束后不再读取文件的剩余部分。
+    """
+    reader = _Reader(fp, chunk_size)
+    first = reader.peek()
+    if first == "{":
+        if list_key is None:
+            raise ValueError("JSON 顶层为对象，需要指定数组所在的字段 list_key")
+        reader.pos += 1
+        while True:
+            if reader.peek() == "}":
+                raise ValueError(f"JSON 文件中没有 '{list_key}' 字段")
+            key = reader.decode()
+            reader.expect(":")
+            if key == list_key:
+                break
+            reader.decode()
+            if reader.peek() == ",":
+                reader.pos += 1
+    reader.expect("[")
+    if reader.peek() == "]":
+        return
+    while True:
+        yield reader.decode()
+        char = reader.peek()
+        reader.pos += 1
+        if char == "]":
+            return
+        if char != ",":
+            raise ValueError(f"JSON 格式错误: 数组元素之间应为 ',' 或 ']'，实际为 '{char or '文件结尾'}'")
@@ -0,0 +1,144 @@
+# starrail/utils/log_sink.py
+"""
+异步缓冲日志输出。
+
+AsyncLogSink 是一个类文件对象：写入只追加到内存缓冲区，攒满一块后交给后台线程写盘，
+战斗线程不直接接触磁盘。待写队列有上限，磁盘跟不上时写入方会在队列满时等待（背压），
+也可以选择丢弃新块。战斗日志大多经由 print 输出，log_to_file 会把当前上下文
+（线程/协程）的输出重定向到日志文件：
+
+    with log_to_file("logs/battle_0001.log.gz"):
+        battle.run()
+"""
+import contextlib
+import gzip
+import io
+import os
+import queue
+import threading
+from typing import List, Optional
+
+from .logger import log_output
+
+DEFAULT_BLOCK_SIZE = 256 * 1024
+DEFAULT_MAX_PENDING_BLOCKS = 32
+_CLOSE = object()
+
+
+class AsyncLogSink(io.TextIOBase):
+    """
+    后台线程写盘的缓冲日志文件。
+    compress: 是否 gzip 压缩，默认按文件名是否以 .gz 结尾决定
+    block_size: 缓冲区攒到多少字符后提交给写盘线程
+    max_pending_blocks: 待写队列上限
+    overflow: 队列满时的策略，"block" 等待写盘线程（背压），"drop" 丢弃该块并计数
+    """
+
+    def __init__(self, path: str, compress: Optional[bool] = None, block_size: int = DEFAULT_BLOCK_SIZE,
+                 max_pending_blocks: int = DEFAULT_MAX_PENDING_BLOCKS, overflow: str = "block",
+                 encoding: str = "utf-8", compresslevel: int = 6):
+        super().__init__()
+        if overflow not in ("block", "drop"):
+            raise ValueError(f"未知的溢出策略: {overflow}")
+        self.path = path
+        self.compress = path.endswith(".gz") if compress is None else compress
+        self.block_size = block_size
+        self.overflow = overflow
+        self._encoding = encoding
+        self._compresslevel = compresslevel
+        self._parts: List[str] = []
+        self._size = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending_blocks)
+        self._error: Optional[BaseException] = None
+        # 统计信息
+        self.blocks_written = 0
+        self.bytes_written = 0
+        self.blocks_dropped = 0
+        self.stalls = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._thread = threading.Thread(target=self._writer, name=f"log-sink:{os.path.basename(path)}", daemon=True)
+        self._thread.start()
+
+    @property
+    def encoding(self) -> str:
+        return self._encoding
+
+    def writable(self) -> bool:
+        return True
+
+    def isatty(self) -> bool:
+        return False
+
+    def write(self, text: str) -> int:
+        if self.closed:
+            raise ValueError("日志文件已关闭")
+        self._parts.append(text)
+        self._size += len(text)
+        if self._size >= self.block_size:
+            self._submit()
+        return len(text)
+
+    def flush(self):
+        """把当前缓冲区提交给写盘线程（不等待写盘完成）"""
+        if not self.closed:
+            self._submit()
+
+    def _submit(self):
+        if not self._parts:
+            return
+        block = "".join(self._parts)
+        self._parts = []
+        self._size = 0
+        try:
+            self._queue.put_nowait(block)
+        except queue.Full:
+            if self.overflow == "drop":
+                self.blocks_dropped += 1
+                return
+            self.stalls += 1
+            self._queue.put(block)
+
+    def _writer(self):
+        try:
+            if self.compress:
+                handle = gzip.open(self.path, "wb", compresslevel=self._compresslevel)
+            else:
+                handle = open(self.path, "wb")
+            with handle:
+                while True:
+                    block = self._queue.get()
+                    if block is _CLOSE:
+                        break
+                    data = block.encode(self._encoding)
+                    handle.write(data)
+                    self.blocks_written += 1
+                    self.bytes_written += len(data)
+        except BaseException as e:
+            self._error = e
+            # 写盘失败后继续消费队列，避免写入方因背压永久阻塞
+            while self._queue.get() is not _CLOSE:
+                pass
+
+    def close(self):
+        """提交剩余内容并等待写盘线程结束"""
+        if self.closed:
+            return
+        self._submit()
+        self._queue.put(_CLOSE)
+        self._thread.join()
+        super().close()
+        if self._error is not None:
+            raise IOError(f"写入日志文件 '{self.path}' 失败: {self._error}") from self._error
+
+
+@contextlib.contextmanager
+def log_to_file(path: str, **sink_kwargs):
+    """在当前上下文中把战斗日志重定向到异步日志文件"""
+    sink = AsyncLogSink(path, **sink_kwargs)
+    try:
+        with log_output(sink):
+            yield sink
+    finally:
+        sink.close()
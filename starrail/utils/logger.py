@@ -1,9 +1,105 @@
 # starrail/utils/logger.py
 import sys
+import contextlib
+import threading
+from contextvars import ContextVar
+from typing import Optional, Set, TextIO
+
+
+class LogState:
+    """
+    日志状态：缩进层级、已输出过的动态属性日志、输出目标。
+    每场战斗持有独立的 LogState 并通过上下文变量绑定，
+    多场战斗在不同线程/协程中运行时互不干扰。
+    output 为 None 时沿用外层上下文的输出目标。
+    """
+
+    def __init__(self, output: Optional[TextIO] = None):
+        self.indent_level = 0
+        self.dynamic_stats_logged: Set[str] = set()
+        self.output = output
+        self.parent: Optional['LogState'] = None
+
+    def resolve_output(self) -> Optional[TextIO]:
+        state = self
+        while state is not None:
+            if state.output is not None:
+                return state.output
+            state = state.parent
+        return None
+
+
+_global_state = LogState()
+_current_state: ContextVar[Optional[LogState]] = ContextVar("starrail_log_state", default=None)
+_proxy_lock = threading.Lock()
+
+
+def current_log_state() -> LogState:
+    """当前上下文的日志状态，未绑定时为进程级默认状态"""
+    return _current_state.get() or _global_state
+
+
+class _ContextStdout:
+    """按当前上下文的日志状态分发 print 输出的标准输出代理"""
+
+    def __init__(self, fallback: TextIO):
+        self._fallback = fallback
+
+    def _target(self) -> TextIO:
+        output = current_log_state().resolve_output()
+        return output if output is not None else self._fallback
+
+    def write(self, text: str) -> int:
+        return self._target().write(text)
+
+    def flush(self):
+        self._target().flush()
+
+    def isatty(self) -> bool:
+        target = self._target()
+        return hasattr(target, 'isatty') and target.isatty()
+
+    def __getattr__(self, name):
+        return getattr(self._fallback, name)
+
+
+def install_stdout_proxy():
+    """安装标准输出代理（幂等），使 print 输出也能按上下文重定向"""
+    with _proxy_lock:
+        if not isinstance(sys.stdout, _ContextStdout):
+            sys.stdout = _ContextStdout(sys.stdout)
+
+
+@contextlib.contextmanager
+def log_scope(state: LogState):
+    """在当前上下文中启用指定的日志状态"""
+    previous_parent = state.parent
+    state.parent = current_log_state()
+    if state.resolve_output() is not None:
+        install_stdout_proxy()
+    token = _current_state.set(state)
+    try:
+        yield state
+    finally:
+        _current_state.reset(token)
+        state.parent = previous_parent
+
+
+@contextlib.contextmanager
+def log_output(stream: TextIO):
+    """在当前上下文中把日志与 print 输出重定向到 stream（线程/协程安全）"""
+    current = current_log_state()
+    state = LogState(output=stream)
+    state.indent_level = current.indent_level
+    state.dynamic_stats_logged = current.dynamic_stats_logged
+    with log_scope(state):
+        yield stream
+
 
 class Logger:
     """
     一个简单的单例日志记录器，用于格式化战斗输出。
+    缩进等状态保存在上下文绑定的 LogState 中。
     """
     _instance = None
 
@@ -17,7 +113,6 @@ class Logger:
         if hasattr(self, '_initialized'):
             return
         self.verbose = verbose
-        self._indent_level = 0
         self._indent_char = "  "
         self._color_map = {
             "default": "\033[0m",
@@ -30,6 +125,14 @@ class Logger:
         }
         self._initialized = True
 
+    @property
+    def _indent_level(self) -> int:
+        return current_log_state().indent_level
+
+    @_indent_level.setter
+    def _indent_level(self, value: int):
+        current_log_state().indent_level = value
+
     def _get_color(self, color_name: str) -> str:
         # 在不支持颜色的环境中（如某些文件输出），返回空字符串
         if not sys.stdout.isatty():
@@ -0,0 +1,123 @@
+# starrail/utils/metrics.py
+"""
+引擎计数器注册表。
+
+MetricsRegistry 以 "指标名 -> 标签 -> 计数" 的形式记录引擎内部事件，
+例如每个角色的属性重算次数、乘区缓存命中、Buff 创建/失效、光锥与遗器钩子调用、
+各类效果执行次数、调度推进与行动次数。每场战斗持有独立的注册表并通过上下文变量绑定，
+可随时 snapshot，也可在批量运行的多个工作线程/进程之间 merge。
+
+未绑定注册表时 count() 只做一次上下文变量查询，几乎没有开销。
+"""
+import contextlib
+import functools
+from collections import Counter
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple, Union
+
+# 指标名称
+STAT_RECALCS = "stat_recalcs"
+CACHE_HITS = "multiplier_cache_hits"
+CACHE_MISSES = "multiplier_cache_misses"
+BUFFS_CREATED = "buffs_created"
+BUFFS_EXPIRED = "buffs_expired"
+HOOK_CALLS = "hook_calls"
+EFFECTS_EXECUTED = "effects_executed"
+SCHEDULER_TICKS = "scheduler_ticks"
+ACTIONS = "actions"
+
+
+class MetricsRegistry:
+    """按指标名与标签分组的计数器集合"""
+
+    def __init__(self):
+        self._counters: Dict[str, Counter] = {}
+
+    def count(self, name: str, label: str = "", amount: int = 1):
+        counter = self._counters.get(name)
+        if counter is None:
+            counter = self._counters[name] = Counter()
+        counter[label] += amount
+
+    def get(self, name: str, label: Optional[str] = None) -> int:
+        """label 为 None 时返回该指标所有标签的合计"""
+        counter = self._counters.get(name)
+        if counter is None:
+            return 0
+        return sum(counter.values()) if label is None else counter.get(label, 0)
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        """返回当前计数的独立副本"""
+        return {name: dict(counter) for name, counter in self._counters.items()}
+
+    def merge(self, other: Union['MetricsRegistry', Dict[str, Dict[str, int]]]):
+        """合并另一个注册表或其 snapshot"""
+        data = other.snapshot() if isinstance(other, MetricsRegistry) else other
+        for name, labels in data.items():
+            counter = self._counters.get(name)
+            if counter is None:
+                counter = self._counters[name] = Counter()
+            counter.update(labels)
+
+    def top(self, name: str, n: int = 10) -> List[Tuple[str, int]]:
+        counter = self._counters.get(name)
+        return counter.most_common(n) if counter else []
+
+    def report(self, top_n: int = 5) -> str:
+        """生成可读的计数报告，每个指标列出计数最高的若干标签"""
+        lines = []
+        for name in sorted(self._counters):
+            lines.append(f"📈 {name}: {self.get(name)}")
+            for label, value in self.top(name, top_n):
+                if label:
+                    lines.append(f"    {label}: {value}")
+        return "\n".join(lines)
+
+    def clear(self):
+        self._counters.clear()
+
+
+_current_registry: ContextVar[Optional[MetricsRegistry]] = ContextVar("starrail_metrics", default=None)
+
+
+def current_metrics() -> Optional[MetricsRegistry]:
+    return _current_registry.get()
+
+
+def count(name: str, label: str = "", amount: int = 1):
+    """在当前上下文绑定的注册表中计数，未绑定时忽略"""
+    registry = _current_registry.get()
+    if registry is not None:
+        registry.count(name, label, amount)
+
+
+@contextlib.contextmanager
+def metrics_scope(registry: MetricsRegistry):
+    """在当前上下文中绑定计数器注册表"""
+    token = _current_registry.set(registry)
+    try:
+        yield registry
+    finally:
+        _current_registry.reset(token)
+
+
+def counted_hook(func):
+    """
+    为事件钩子计数的装饰器，标签为 "运行时类名.钩子名"。
+    基类中有实际逻辑的钩子也直接用它装饰：子类继承时按子类计数，
+    子类重写后通过 super() 调用时不再重复计数（只有实例实际解析到的那一层计数）。
+    """
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        registry = _current_registry.get()
+        if registry is not None and getattr(type(self), func.__name__, None) is wrapper:
+            registry.count(HOOK_CALLS, f"{type(self).__name__}.{func.__name__}")
+        return func(self, *args, **kwargs)
+    return wrapper
+
+
+def count_overridden_hooks(cls, base):
+    """对子类中重写的 on_* 钩子包装计数（由基类的 __init_subclass__ 调用），基类中有实际逻辑的钩子用 counted_hook 装饰"""
+    for attr, value in list(vars(cls).items()):
+        if attr.startswith("on_") and callable(value) and hasattr(base, attr):
+            setattr(cls, attr, counted_hook(value))
@@ -0,0 +1,144 @@
+# starrail/utils/random_tape.py
+"""
+战斗随机数磁带。
+
+每场战斗持有一个 BattleRandom，按块预生成 NumPy 均匀随机数，并按游标逐个发放。
+暴击、目标选择与 AI 决策分别使用独立的随机流，互不干扰；
+已消耗的随机数可以保存到文件，用于精确重放同一场战斗，
+也便于后续实现对偶采样、分层采样等方差缩减技术。
+
+未设置 BattleRandom 的战斗保持原有行为，直接使用全局 random 模块。
+"""
+import random
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+
+STREAMS = ("crit", "target", "ai")
+DEFAULT_BLOCK_SIZE = 4096
+
+
+class TapeExhaustedError(RuntimeError):
+    """严格重放模式下磁带中的随机数已用尽（通常意味着战斗过程发生了偏离）"""
+
+
+class RandomTape:
+    """单一随机流：按块预生成均匀随机数，按游标取用"""
+
+    def __init__(self, generator: np.random.Generator, block_size: int = DEFAULT_BLOCK_SIZE,
+                 preset: Optional[Sequence[float]] = None, strict: bool = False, name: str = ""):
+        self.name = name
+        self.block_size = block_size
+        self.strict = strict
+        self._generator = generator
+        self._preset_length = len(preset) if preset is not None else 0
+        self._blocks: List[List[float]] = [list(map(float, preset))] if self._preset_length else []
+        self._block: List[float] = self._blocks[0] if self._blocks else []
+        self._pos = 0
+        self.consumed = 0
+
+    def _next_block(self) -> List[float]:
+        """生成新的一块均匀随机数，子类可覆盖以实现不同的采样方式"""
+        return self._generator.random(self.block_size).tolist()
+
+    def _refill(self):
+        if self.strict and self.consumed >= self._preset_length:
+            raise TapeExhaustedError(f"随机流 '{self.name}' 已用尽 ({self.consumed} 个)")
+        if self._preset_length and len(self._blocks) == 1:
+            # 预置序列即该种子随机流的前 _preset_length 个数，跳过它们以接续原随机流，而不是从头重复
+            self._generator.random(self._preset_length)
+        self._block = self._next_block()
+        self._blocks.append(self._block)
+        self._pos = 0
+
+    def next(self) -> float:
+        if self._pos >= len(self._block):
+            self._refill()
+        value = self._block[self._pos]
+        self._pos += 1
+        self.consumed += 1
+        return value
+
+    def consumed_values(self) -> np.ndarray:
+        """已经发放的全部随机数，按发放顺序排列"""
+        values = [v for block in self._blocks for v in block]
+        return np.asarray(values[:self.consumed], dtype=float)
+
+
+class BattleRandom:
+    """
+    单场战斗的随机数源，按用途划分为 crit / target / ai 三条独立随机流。
+    seed: 整数种子，各随机流由 SeedSequence 派生。
+    tapes: 预置的随机数序列（如从文件加载），优先于生成器使用。
+    strict: 为 True 时预置序列用尽即抛出 TapeExhaustedError，用于严格重放。
+    """
+
+    def __init__(self, seed: Optional[int] = None, block_size: int = DEFAULT_BLOCK_SIZE,
+                 tapes: Optional[Dict[str, Sequence[float]]] = None, strict: bool = False):
+        self.seed = seed
+        self.block_size = block_size
+        tapes = tapes or {}
+        children = np.random.SeedSequence(seed).spawn(len(STREAMS))
+        self.tapes: Dict[str, RandomTape] = {
+            name: self._create_tape(name, np.random.default_rng(child), tapes.get(name), strict)
+            for name, child in zip(STREAMS, children)
+        }
+
+    def _create_tape(self, name: str, generator: np.random.Generator, preset, strict: bool) -> RandomTape:
+        return RandomTape(generator, self.block_size, preset=preset, strict=strict, name=name)
+
+    def random(self, stream: str) -> float:
+        """从指定随机流取一个 [0, 1) 的均匀随机数"""
+        return self.tapes[stream].next()
+
+    def choice(self, stream: str, seq: Sequence, actor=None):
+        """从序列中等概率选择一个元素，actor 为做出选择的单位（供子类使用）"""
+        return seq[int(self.random(stream) * len(seq))]
+
+    def roll_crit(self, crit_rate: float, attacker=None) -> bool:
+        """暴击判定，attacker 为攻击者（供子类使用）"""
+        return self.random("crit") < crit_rate
+
+    def draws(self) -> Dict[str, int]:
+        """各随机流已消耗的随机数个数"""
+        return {name: tape.consumed for name, tape in self.tapes.items()}
+
+    def save(self, path: str):
+        """将已消耗的随机数保存为 .npz 文件，可用 BattleRandom.load 精确重放"""
+        arrays = {name: tape.consumed_values() for name, tape in self.tapes.items()}
+        np.savez_compressed(path, seed=np.array(-1 if self.seed is None else self.seed), **arrays)
+
+    @classmethod
+    def load(cls, path: str, strict: bool = True, block_size: int = DEFAULT_BLOCK_SIZE) -> 'BattleRandom':
+        """从 .npz 文件加载随机数磁带"""
+        with np.load(path) as data:
+            tapes = {name: data[name] for name in STREAMS if name in data}
+            seed = int(data['seed']) if 'seed' in data else -1
+        return cls(seed=None if seed < 0 else seed, block_size=block_size, tapes=tapes, strict=strict)
+
+
+def get_battle_random(context) -> Optional[BattleRandom]:
+    """获取战斗（或单位所在战斗）的 BattleRandom，未启用时返回 None"""
+    battle = getattr(context, '_battle_context', context)
+    return getattr(battle, 'rng', None)
+
+
+def roll_crit(context, crit_rate: float) -> bool:
+    """暴击判定：启用随机数磁带时使用 crit 随机流，否则使用全局 random"""
+    rng = get_battle_random(context)
+    if rng is None:
+        return random.random() < crit_rate
+    return rng.roll_crit(crit_rate, attacker=context)
+
+
+def random_uniform(context, stream: str) -> float:
+    rng = get_battle_random(context)
+    if rng is None:
+        return random.random()
+    return rng.random(stream)
+
+
+def random_choice(context, stream: str, seq: Sequence, actor=None):
+    rng = get_battle_random(context)
+    if rng is None:
+        return random.choice(seq)
+    return rng.choice(stream, seq, actor=actor)
@@ -0,0 +1,195 @@
+# starrail/utils/relic_importer.py
+"""
+fribbels 遗器存档的增量导入。
+
+每次导入把存档中的遗器精简为创建 Relic 所需的字段（名称、套装、部位、主属性、副属性的属性名与数值），
+丢弃 augmentedStats、强化次数分布等用不到的数据，并把精简结果与存档的大小/修改时间一起缓存到
+数据目录下的 .cache 中（见 file_cache）。再次导入时：
+    - 存档未变化：直接使用缓存的精简记录，不解析存档
+    - 存档已变化：解析存档，按遗器 ID 与上次导入比较，只对新增、删除与内容变化的遗器
+      创建/移除 Relic 并更新 RelicManager 的部位与套装索引，未变化的 Relic 对象保持不变
+watch 以轮询修改时间的方式监视存档，变化时自动增量导入。
+图形界面等不能阻塞的调用方可以用 stable_change 判断存档是否已写完，在后台线程中 read 解析，
+再回到自己的线程 apply 结果。
+"""
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from starrail.core.equipment_manager import RelicManager
+from starrail.utils.data_loader import DataInterner, _relic_from_item, iter_relic_items
+from starrail.utils.file_cache import cache_dir_for, file_signature, read_signed_cache, save_signed_cache
+
+SNAPSHOT_VERSION = 2
+
+
+def reduce_relic_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    """只保留 _relic_from_item 用到的字段，副属性只保留属性名与数值"""
+    reduced = {key: item[key] for key in ('id', 'name', 'set', 'part') if key in item}
+    main = item.get('main')
+    if isinstance(main, dict):
+        reduced['main'] = {key: main[key] for key in ('stat', 'value') if key in main}
+    for key in ('substats', 'sub_stats'):
+        if key in item:
+            reduced[key] = [{'stat': sub['stat'], 'value': sub['value']} for sub in item[key]
+                            if isinstance(sub, dict) and 'stat' in sub and 'value' in sub]
+            break
+    return reduced
+
+
+@dataclass
+class RelicChanges:
+    """一次导入相对上次导入的变化（遗器 ID 列表）"""
+    added: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+    def summary(self) -> str:
+        return f"新增 {len(self.added)} 件，删除 {len(self.removed)} 件，变化 {len(self.changed)} 件"
+
+
+def diff_relic_items(previous: Dict[str, Dict[str, Any]], current: Dict[str, Dict[str, Any]]) -> RelicChanges:
+    """按遗器 ID 比较两次导入的精简记录"""
+    return RelicChanges(
+        added=[relic_id for relic_id in current if relic_id not in previous],
+        removed=[relic_id for relic_id in previous if relic_id not in current],
+        changed=[relic_id for relic_id, item in current.items()
+                 if relic_id in previous and previous[relic_id] != item],
+    )
+
+
+class RelicImporter:
+    """
+    增量导入遗器存档。
+    path: fribbels-optimizer-save.json（或顶层即遗器数组的文件）；manager: 要更新的遗器管理器，
+    为 None 时首次导入后创建；cache_dir: 精简记录缓存目录，默认为存档所在目录下的 .cache。
+    """
+
+    def __init__(self, path: str, manager: Optional[RelicManager] = None, cache_dir: Optional[str] = None):
+        self.path = path
+        self.cache_dir = cache_dir_for(path, cache_dir)
+        self.manager = manager
+        self.interner = DataInterner()
+        self._items: Dict[str, Dict[str, Any]] = {}
+        self._signature: Optional[Dict[str, Any]] = None
+        self._pending: Optional[Dict[str, Any]] = None
+
+    @property
+    def relics(self) -> Dict[str, Any]:
+        return self.manager.relics if self.manager is not None else {}
+
+    @property
+    def snapshot_path(self) -> str:
+        return os.path.join(self.cache_dir, f"{os.path.basename(self.path)}.relics.snapshot.json")
+
+    def _file_signature(self) -> Dict[str, Any]:
+        return file_signature(self.path, SNAPSHOT_VERSION)
+
+    def _load_snapshot(self) -> Optional[Tuple[Dict[str, Any], List[Dict[str, Any]]]]:
+        """读取缓存的 (签名, 精简记录)；签名与存档不符时仍返回，作为首次导入时的“上次导入”"""
+        snapshot = read_signed_cache(self.snapshot_path)
+        if snapshot is None or snapshot[0].get("version") != SNAPSHOT_VERSION:
+            return None
+        return snapshot
+
+    def _save_snapshot(self, signature: Dict[str, Any], items: Dict[str, Dict[str, Any]]):
+        save_signed_cache(self.snapshot_path, signature, list(items.values()))
+
+    def _parse_file(self) -> Dict[str, Dict[str, Any]]:
+        """流式解析存档，每条记录读出后立即精简"""
+        return {item['id']: reduce_relic_item(item) for item in iter_relic_items(self.path)}
+
+    def refresh(self) -> RelicChanges:
+        """
+        检查存档并增量导入，返回相对上次导入的变化。
+        首次调用时“上次导入”为缓存的精简记录（没有缓存时视为空），并据此创建全部 Relic；
+        存档解析失败（例如正在被重写）时抛出 ValueError，已导入的数据保持不变。
+        """
+        signature = self._file_signature()
+        if signature == self._signature:
+            return RelicChanges()
+        first_import = self._signature is None
+        previous = self._items
+        items = None
+        if first_import:
+            snapshot = self._load_snapshot()
+            if snapshot is not None:
+                snapshot_signature, snapshot_items = snapshot
+                previous = {item['id']: item for item in snapshot_items}
+                if snapshot_signature == signature:
+                    items = previous
+        if items is None:
+            items = self._parse_file()
+            self._save_snapshot(signature, items)
+        return self._apply(signature, previous, items, first_import)
+
+    def stable_change(self) -> bool:
+        """
+        存档自上次导入后有变化，且大小与修改时间与上一次调用时相同（写入已完成）时返回 True。
+        存档正在被重写时连续两次检查的结果不同，会等到写入完成后的下一次检查。
+        """
+        signature = self._file_signature()
+        ready = signature != self._signature and signature == self._pending
+        self._pending = signature
+        return ready
+
+    def read(self) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+        """解析存档并更新缓存，不修改已导入的数据，可在后台线程中调用；结果交给 apply"""
+        signature = self._file_signature()
+        items = self._parse_file()
+        self._save_snapshot(signature, items)
+        return signature, items
+
+    def apply(self, signature: Dict[str, Any], items: Dict[str, Dict[str, Any]]) -> RelicChanges:
+        """把 read 的结果增量应用到遗器管理器，返回相对上次导入的变化"""
+        return self._apply(signature, self._items, items, self._signature is None)
+
+    def _apply(self, signature: Dict[str, Any], previous: Dict[str, Dict[str, Any]],
+               items: Dict[str, Dict[str, Any]], first_import: bool) -> RelicChanges:
+        changes = diff_relic_items(previous, items)
+
+        if first_import:
+            relics = {relic_id: _relic_from_item(item, self.interner) for relic_id, item in items.items()}
+            if self.manager is None:
+                self.manager = RelicManager(relics)
+            else:
+                for relic_id in list(self.manager.relics):
+                    if relic_id not in relics:
+                        self.manager.remove_relic(relic_id)
+                for relic in relics.values():
+                    self.manager.update_relic(relic)
+        else:
+            for relic_id in changes.removed:
+                self.manager.remove_relic(relic_id)
+            for relic_id in changes.changed:
+                self.manager.update_relic(_relic_from_item(items[relic_id], self.interner))
+            for relic_id in changes.added:
+                self.manager.add_relic(_relic_from_item(items[relic_id], self.interner))
+        self._items, self._signature = items, signature
+        return changes
+
+    def watch(self, interval: float = 1.0, on_change: Optional[Callable[[RelicChanges], None]] = None,
+              should_stop: Optional[Callable[[], bool]] = None, max_checks: Optional[int] = None):
+        """
+        每隔 interval 秒检查一次存档，有变化时增量导入并调用 on_change。
+        存档的大小与修改时间在连续两次检查之间不再变化（写入已完成）时才导入，
+        解析失败时跳过本次检查；should_stop 返回 True 或达到 max_checks 次检查后返回。
+        """
+        checks = 0
+        while not (should_stop and should_stop()):
+            changes = None
+            try:
+                if self.stable_change():
+                    changes = self.refresh()
+            except (OSError, ValueError) as e:
+                print(f"⚠️  遗器存档读取失败，稍后重试: {e}")
+            if changes and on_change:
+                on_change(changes)
+            checks += 1
+            if max_checks is not None and checks >= max_checks:
+                return
+            time.sleep(interval)
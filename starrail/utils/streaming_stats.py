@@ -0,0 +1,222 @@
+# starrail/utils/streaming_stats.py
+"""
+固定内存的流式统计。
+
+RunningStats 以 Welford 算法在线维护均值/方差与最小/最大值，
+QuantileSketch 以对数分桶的方式近似分位数（相对误差不超过 relative_accuracy），
+两者都支持 merge，可将多个工作进程的部分结果精确合并。
+DamageStatsAggregator 按 (攻击者, 技能类型, 元素) 分组维护伤害统计，
+可直接作为 Battle 的 "hit" 事件监听器使用。
+"""
+import math
+from typing import Dict, Iterator, Optional, Tuple
+
+
+class RunningStats:
+    """Welford 在线均值/方差，同时记录总和、最小值与最大值"""
+
+    __slots__ = ("count", "mean", "_m2", "total", "min", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other: 'RunningStats'):
+        """合并另一组统计（Chan 并行合并公式）"""
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.count, self.mean, self._m2 = other.count, other.mean, other._m2
+            self.total, self.min, self.max = other.total, other.min, other.max
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self._m2 += other._m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def variance(self) -> float:
+        """样本方差"""
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    def __getstate__(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
+
+class QuantileSketch:
+    """
+    对数分桶分位数草图：正值 x 落入编号 ceil(log_gamma(x)) 的桶，
+    gamma = (1 + a) / (1 - a)，返回的分位数相对误差不超过 a。
+    桶数只与数值的量级跨度有关，与样本数无关；相同精度的草图可按桶精确合并。
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, min_value: float = 1e-9):
+        self.relative_accuracy = relative_accuracy
+        self.min_value = min_value
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._buckets: Dict[int, int] = {}
+        self._zero_count = 0
+        self.count = 0
+
+    def add(self, value: float, count: int = 1):
+        self.count += count
+        if value <= self.min_value:
+            self._zero_count += count
+            return
+        key = math.ceil(math.log(value) / self._log_gamma)
+        self._buckets[key] = self._buckets.get(key, 0) + count
+
+    def merge(self, other: 'QuantileSketch'):
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("只能合并相同精度的分位数草图")
+        for key, count in other._buckets.items():
+            self._buckets[key] = self._buckets.get(key, 0) + count
+        self._zero_count += other._zero_count
+        self.count += other.count
+
+    def quantile(self, q: float) -> float:
+        """返回 q 分位数的近似值，没有样本时返回 nan"""
+        if self.count == 0:
+            return math.nan
+        rank = min(max(q, 0.0), 1.0) * (self.count - 1)
+        seen = self._zero_count
+        if rank < seen:
+            return 0.0
+        for key in sorted(self._buckets):
+            seen += self._buckets[key]
+            if rank < seen:
+                # 桶 (gamma^(k-1), gamma^k] 的代表值，相对误差不超过 relative_accuracy
+                return 2 * self._gamma ** key / (1 + self._gamma)
+        return 2 * self._gamma ** max(self._buckets) / (1 + self._gamma)
+
+    @property
+    def bucket_count(self) -> int:
+        return len(self._buckets)
+
+
+class DamageStats:
+    """单个分组的伤害统计"""
+
+    __slots__ = ("damage", "crits", "sketch")
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.damage = RunningStats()
+        self.crits = 0
+        self.sketch = QuantileSketch(relative_accuracy)
+
+    def add(self, damage: float, is_crit: bool = False):
+        self.damage.add(damage)
+        self.sketch.add(damage)
+        if is_crit:
+            self.crits += 1
+
+    def merge(self, other: 'DamageStats'):
+        self.damage.merge(other.damage)
+        self.sketch.merge(other.sketch)
+        self.crits += other.crits
+
+    def to_dict(self) -> Dict:
+        count = self.damage.count
+        if count == 0:
+            return {}
+        return {
+            "total_damage": self.damage.total,
+            "average_damage": self.damage.mean,
+            "damage_std": self.damage.std,
+            "max_damage": self.damage.max,
+            "min_damage": self.damage.min,
+            "p50_damage": self.sketch.quantile(0.5),
+            "p95_damage": self.sketch.quantile(0.95),
+            "critical_hits": self.crits,
+            "critical_rate": self.crits / count,
+            "damage_instances": count,
+        }
+
+    def __getstate__(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
+
+StatsKey = Tuple[str, str, Optional[str]]
+
+
+class DamageStatsAggregator:
+    """按 (攻击者, 技能类型, 元素) 分组的流式伤害统计，可作为 "hit" 事件监听器"""
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.relative_accuracy = relative_accuracy
+        self._groups: Dict[StatsKey, DamageStats] = {}
+
+    def record(self, attacker_name: str, skill_type: str, element: Optional[str], damage: float, is_crit: bool = False):
+        key = (attacker_name, skill_type, element)
+        stats = self._groups.get(key)
+        if stats is None:
+            stats = self._groups[key] = DamageStats(self.relative_accuracy)
+        stats.add(damage, is_crit)
+
+    def __call__(self, hit):
+        """接收 HitRecord"""
+        self.record(hit.attacker_name, hit.skill_type, hit.element, hit.final_damage, hit.is_crit)
+
+    def merge(self, other: 'DamageStatsAggregator'):
+        """合并另一个聚合器（如其他工作进程的部分结果）"""
+        for key, stats in other._groups.items():
+            mine = self._groups.get(key)
+            if mine is None:
+                mine = self._groups[key] = DamageStats(self.relative_accuracy)
+            mine.merge(stats)
+
+    def groups(self) -> Iterator[Tuple[StatsKey, DamageStats]]:
+        return iter(self._groups.items())
+
+    def combined(self, attacker_name: Optional[str] = None, skill_type: Optional[str] = None,
+                 element: Optional[str] = None) -> DamageStats:
+        """合并满足筛选条件的所有分组"""
+        result = DamageStats(self.relative_accuracy)
+        for (attacker, stype, elem), stats in self._groups.items():
+            if attacker_name is not None and attacker != attacker_name:
+                continue
+            if skill_type is not None and stype != skill_type:
+                continue
+            if element is not None and elem != element:
+                continue
+            result.merge(stats)
+        return result
+
+    def summary(self, attacker_name: Optional[str] = None, skill_type: Optional[str] = None,
+                element: Optional[str] = None) -> Dict:
+        return self.combined(attacker_name, skill_type, element).to_dict()
+
+    def clear(self):
+        self._groups.clear()